@@ -8,6 +8,18 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     brevo_api_key: str = os.getenv("BREVO_API_KEY", "")
     object_storage_bucket: str = os.getenv("DEFAULT_OBJECT_STORAGE_BUCKET_ID", "")
+    storage_endpoint_url: str = os.getenv("STORAGE_ENDPOINT_URL", "")
+    storage_max_connections: int = int(os.getenv("STORAGE_MAX_CONNECTIONS", "20"))
+    storage_retries: int = int(os.getenv("STORAGE_RETRIES", "3"))
+    pdf_compact: bool = os.getenv("PDF_COMPACT", "true").lower() == "true"
+    email_transport: str = os.getenv("EMAIL_TRANSPORT", "brevo")
+    email_concurrency: int = int(os.getenv("EMAIL_CONCURRENCY", "4"))
+    email_batch_size: int = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+    email_rate_per_second: float = float(os.getenv("EMAIL_RATE_PER_SECOND", "10"))
+    email_max_attempts: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    pdf_memory_cache_mb: int = int(os.getenv("PDF_MEMORY_CACHE_MB", "32"))
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", "2"))
+    export_workers: int = int(os.getenv("EXPORT_WORKERS", str(os.cpu_count() or 1)))
     
     class Config:
         env_file = ".env"
@@ -2,7 +2,13 @@ from app.models.user import User
 from app.models.invoice import Invoice, InvoiceLineItem, InvoiceStatus, ContextType
 from app.models.quote import Quote, QuoteLineItem, QuoteStatus
 from app.models.customer import Customer
-from app.models.email_log import EmailLog
+from app.models.email_log import EmailLog, EmailDeliveryStatus
 from app.models.project import Project, Milestone, ProjectStatus, MilestoneStatus, MilestoneType
 from app.models.receipt import PaymentReceipt, ReceiptStatus, PaymentMethod
 from app.models.audit_log import AuditLog, AuditAction
+from app.models.revenue_rollup import RevenueRollup, RollupKind
+from app.models.document_sequence import DocumentSequence, DocumentType
+from app.models.pdf_job import PdfJob, PdfJobStatus, PdfJobAction
+from app.models.pdf_cache import PdfCacheEntry, PdfCacheCounter
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.models.reminder_run import ReminderRun, ReminderRunStatus
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+import enum
+
+from app.database import Base
+
+class DocumentType(str, enum.Enum):
+    invoice = "invoice"
+    quote = "quote"
+    receipt = "receipt"
+    project = "project"
+
+class DocumentSequence(Base):
+    """Last number handed out per document type and year."""
+    __tablename__ = "document_sequences"
+    
+    doc_type = Column(String(20), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    last_value = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -8,6 +8,12 @@ from app.database import Base
 class EmailType(enum.Enum):
     invoice = "invoice"
     quote = "quote"
+    reminder = "reminder"
+
+class EmailDeliveryStatus(str, enum.Enum):
+    queued = "queued"
+    sent = "sent"
+    failed = "failed"
 
 class EmailLog(Base):
     __tablename__ = "email_logs"
@@ -21,6 +27,8 @@ class EmailLog(Base):
     message = Column(Text, nullable=False)
     pdf_url = Column(String)
     sent_at = Column(DateTime, default=datetime.utcnow)
+    delivery_status = Column(SQLEnum(EmailDeliveryStatus), default=EmailDeliveryStatus.queued, nullable=False)
+    delivery_error = Column(Text, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
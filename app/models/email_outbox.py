@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum, Index
+from datetime import datetime
+import enum
+
+from app.database import Base
+
+class OutboxStatus(str, enum.Enum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
+
+class EmailOutbox(Base):
+    """A rendered email waiting for (or done with) delivery by the email dispatcher."""
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # The dispatcher's claim query: due pending messages, oldest first
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    email_log_id = Column(Integer, ForeignKey("email_logs.id"), nullable=True)
+    reminder_run_id = Column(Integer, ForeignKey("reminder_runs.id"), nullable=True, index=True)
+    
+    sender_email = Column(String, nullable=False)
+    sender_name = Column(String, nullable=True)
+    recipient_email = Column(String, nullable=False)
+    recipient_name = Column(String, nullable=True)
+    subject = Column(String, nullable=False)
+    html_content = Column(Text, nullable=False)
+    # Stored PDF attached at send time
+    attachment_url = Column(String, nullable=True)
+    attachment_name = Column(String, nullable=True)
+    
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.pending, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
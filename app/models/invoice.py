@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -16,6 +16,16 @@ class ContextType(str, enum.Enum):
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Keyset pagination (ORDER BY id DESC) under the list filters
+        Index("ix_invoices_user_status_id", "user_id", "status", "id"),
+        Index("ix_invoices_status_id", "status", "id"),
+        Index("ix_invoices_customer_id_id", "customer_id", "id"),
+        Index("ix_invoices_project_id_id", "project_id", "id"),
+        Index("ix_invoices_issue_date_id", "issue_date", "id"),
+        # Overdue scan for payment reminders
+        Index("ix_invoices_status_due_date", "status", "due_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String, unique=True, nullable=False, index=True)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+
+from app.database import Base
+
+class PdfCacheEntry(Base):
+    """A rendered PDF, keyed by the hash of everything that goes into it."""
+    __tablename__ = "pdf_cache_entries"
+    __table_args__ = (
+        # Finding a document's superseded renders
+        Index("ix_pdf_cache_entries_document", "document_type", "document_id"),
+    )
+    
+    content_hash = Column(String(64), primary_key=True)
+    document_type = Column(String(20), nullable=False, index=True)
+    document_id = Column(Integer, nullable=False)
+    pdf_url = Column(String, nullable=False)
+    size_bytes = Column(Integer, nullable=True)
+    
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_hit_at = Column(DateTime, nullable=True)
+
+class PdfCacheCounter(Base):
+    """
+    Hit/miss totals per document type, shared by the web and worker processes.
+    served_ready/rendered_on_request count PDF requests (generate, download,
+    send) that found the final PDF already rendered versus had to wait for one.
+    """
+    __tablename__ = "pdf_cache_counters"
+    
+    document_type = Column(String(20), primary_key=True)
+    hits = Column(Integer, default=0, nullable=False)
+    misses = Column(Integer, default=0, nullable=False)
+    served_ready = Column(Integer, default=0, nullable=False)
+    rendered_on_request = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
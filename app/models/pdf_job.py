@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Enum, Index
+from datetime import datetime
+import enum
+
+from app.database import Base
+
+class PdfJobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class PdfJobAction(str, enum.Enum):
+    render = "render"
+    send_email = "send_email"
+
+class PdfJob(Base):
+    __tablename__ = "pdf_jobs"
+    __table_args__ = (
+        # Finding an in-flight job for a document, and resuming jobs on startup
+        Index("ix_pdf_jobs_document_status", "document_type", "document_id", "status"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_type = Column(String(20), nullable=False)
+    document_id = Column(Integer, nullable=False)
+    action = Column(Enum(PdfJobAction), default=PdfJobAction.render, nullable=False)
+    payload = Column(JSON, nullable=True)
+    # Content hash of the document when a render was requested
+    content_hash = Column(String(64), nullable=True)
+    
+    status = Column(Enum(PdfJobStatus), default=PdfJobStatus.queued, nullable=False, index=True)
+    pdf_url = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    
+    requested_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
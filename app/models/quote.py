@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -14,6 +14,14 @@ class QuoteStatus(str, enum.Enum):
 
 class Quote(Base):
     __tablename__ = "quotes"
+    __table_args__ = (
+        # Keyset pagination (ORDER BY id DESC) under the list filters
+        Index("ix_quotes_user_status_id", "user_id", "status", "id"),
+        Index("ix_quotes_status_id", "status", "id"),
+        Index("ix_quotes_customer_id_id", "customer_id", "id"),
+        Index("ix_quotes_project_id_id", "project_id", "id"),
+        Index("ix_quotes_issue_date_id", "issue_date", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     quote_number = Column(String, unique=True, nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -20,6 +20,14 @@ class PaymentMethod(str, enum.Enum):
 
 class PaymentReceipt(Base):
     __tablename__ = "payment_receipts"
+    __table_args__ = (
+        # Keyset pagination (ORDER BY created_at DESC, id DESC) under the list filters
+        Index("ix_payment_receipts_created_at_id", "created_at", "id"),
+        Index("ix_payment_receipts_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_payment_receipts_customer_created_at_id", "customer_id", "created_at", "id"),
+        Index("ix_payment_receipts_project_created_at_id", "project_id", "created_at", "id"),
+        Index("ix_payment_receipts_milestone_created_at_id", "milestone_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     receipt_number = Column(String, unique=True, nullable=False, index=True)
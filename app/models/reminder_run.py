@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, DateTime, Text, ForeignKey, JSON, Enum, Boolean
+from datetime import datetime
+import enum
+
+from app.database import Base
+
+class ReminderRunStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class ReminderRun(Base):
+    """One bulk payment-reminder run over overdue invoices, with its progress counters."""
+    __tablename__ = "reminder_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(Enum(ReminderRunStatus), default=ReminderRunStatus.queued, nullable=False)
+    dry_run = Column(Boolean, default=False, nullable=False)
+    as_of = Column(DateTime, nullable=False)
+    min_days_overdue = Column(Integer, default=0, nullable=False)
+    message = Column(Text, nullable=True)
+    
+    total = Column(Integer, default=0, nullable=False)
+    rendered = Column(Integer, default=0, nullable=False)
+    queued_emails = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    # Dry runs: the reminders that would be sent; real runs: per-invoice errors
+    preview = Column(JSON, nullable=True)
+    errors = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    
+    requested_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
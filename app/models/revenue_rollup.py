@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+import enum
+
+from app.database import Base
+
+class RollupKind(str, enum.Enum):
+    invoice = "invoice"
+    receipt = "receipt"
+
+class RevenueRollup(Base):
+    __tablename__ = "revenue_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "year", "month", "kind", name="uq_revenue_rollups_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    kind = Column(String, nullable=False, index=True)
+    
+    amount = Column(Float, default=0.0, nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
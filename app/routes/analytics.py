@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, extract
+from sqlalchemy.orm import Session
+from sqlalchemy import func, extract, case
 from datetime import datetime, date
 from typing import List, Optional
 from pydantic import BaseModel
@@ -9,8 +9,11 @@ from app.database import get_db
 from app.models.user import User
 from app.models.invoice import Invoice, InvoiceStatus
 from app.models.project import Project, ProjectStatus, Milestone
+from app.models.customer import Customer
 from app.models.receipt import PaymentReceipt, ReceiptStatus, PaymentMethod
 from app.auth import get_current_user
+from app.models.revenue_rollup import RollupKind
+from app.services.rollups import get_rollup_buckets
 
 router = APIRouter()
 
@@ -54,61 +57,60 @@ def get_analytics(
     month_names = ['January', 'February', 'March', 'April', 'May', 'June',
                    'July', 'August', 'September', 'October', 'November', 'December']
     
-    if current_user.role == "admin":
-        base_query = db.query(Invoice)
-    else:
-        base_query = db.query(Invoice).filter(Invoice.user_id == current_user.id)
+    rollup_user_id = None if current_user.role == "admin" else current_user.id
+    monthly_totals = get_rollup_buckets(db, RollupKind.invoice, rollup_user_id)
+    
+    total_issued_invoices = sum(count for count, total in monthly_totals.values())
+    total_issued_amount = sum(total for count, total in monthly_totals.values())
     
-    issued_invoices = base_query.filter(Invoice.status == InvoiceStatus.issued).all()
-    draft_invoices = base_query.filter(Invoice.status == InvoiceStatus.draft).all()
+    draft_query = db.query(
+        func.count(Invoice.id),
+        func.coalesce(func.sum(Invoice.total), 0.0)
+    ).filter(Invoice.status == InvoiceStatus.draft)
+    if rollup_user_id is not None:
+        draft_query = draft_query.filter(Invoice.user_id == rollup_user_id)
+    total_draft_invoices, total_draft_amount = draft_query.one()
+    total_draft_amount = total_draft_amount or 0.0
     
-    total_issued_invoices = len(issued_invoices)
-    total_issued_amount = sum(inv.total for inv in issued_invoices)
-    total_draft_invoices = len(draft_invoices)
-    total_draft_amount = sum(inv.total for inv in draft_invoices)
+    def period_total(year: int, month: Optional[int] = None) -> float:
+        return sum(
+            total for (y, m), (count, total) in monthly_totals.items()
+            if y == year and (month is None or m == month)
+        )
     
-    current_month_invoices = [inv for inv in issued_invoices 
-                              if inv.issue_date.year == current_year and inv.issue_date.month == current_month]
-    current_month_total = sum(inv.total for inv in current_month_invoices)
+    current_month_total = period_total(current_year, current_month)
     
     prev_month = current_month - 1 if current_month > 1 else 12
     prev_month_year = current_year if current_month > 1 else current_year - 1
-    previous_month_invoices = [inv for inv in issued_invoices 
-                               if inv.issue_date.year == prev_month_year and inv.issue_date.month == prev_month]
-    previous_month_total = sum(inv.total for inv in previous_month_invoices)
+    previous_month_total = period_total(prev_month_year, prev_month)
     
     if previous_month_total > 0:
         month_change_percent = ((current_month_total - previous_month_total) / previous_month_total) * 100
     else:
         month_change_percent = None
     
-    current_year_invoices = [inv for inv in issued_invoices if inv.issue_date.year == current_year]
-    current_year_total = sum(inv.total for inv in current_year_invoices)
-    
-    previous_year_invoices = [inv for inv in issued_invoices if inv.issue_date.year == current_year - 1]
-    previous_year_total = sum(inv.total for inv in previous_year_invoices)
+    current_year_total = period_total(current_year)
+    previous_year_total = period_total(current_year - 1)
     
     if previous_year_total > 0:
         year_change_percent = ((current_year_total - previous_year_total) / previous_year_total) * 100
     else:
         year_change_percent = None
     
-    years = set(inv.issue_date.year for inv in issued_invoices)
+    years = set(year for year, month in monthly_totals)
     if not years:
         years = {current_year}
     available_years = sorted(years, reverse=True)
     
     yearly_data = []
     for year in available_years:
-        year_invoices = [inv for inv in issued_invoices if inv.issue_date.year == year]
-        year_total = sum(inv.total for inv in year_invoices)
-        year_count = len(year_invoices)
-        
         monthly_data = []
+        year_total = 0.0
+        year_count = 0
         for month in range(1, 13):
-            month_invoices = [inv for inv in year_invoices if inv.issue_date.month == month]
-            month_total = sum(inv.total for inv in month_invoices)
-            month_count = len(month_invoices)
+            month_count, month_total = monthly_totals.get((year, month), (0, 0.0))
+            year_total += month_total
+            year_count += month_count
             monthly_data.append(MonthlyData(
                 month=month,
                 month_name=month_names[month - 1],
@@ -179,64 +181,98 @@ def get_project_analytics(
 ):
     """Get project-based analytics including revenue per project, top projects, and milestone progress."""
     
-    # Get all projects with their customers
-    projects = db.query(Project).options(joinedload(Project.customer)).all()
-    
-    total_projects = len(projects)
-    active_projects = len([p for p in projects if p.status == ProjectStatus.active])
-    closed_projects = len([p for p in projects if p.status == ProjectStatus.closed])
-    
-    # Calculate revenue per project
-    project_revenues = []
-    total_project_revenue = 0
-    
-    for project in projects:
-        # Get issued invoices linked to this project
-        invoices = db.query(Invoice).filter(
-            Invoice.project_id == project.id,
-            Invoice.status == InvoiceStatus.issued
-        ).all()
-        
-        invoiced_total = sum(inv.total for inv in invoices)
-        total_project_revenue += invoiced_total
-        
+    # Issued invoice totals per project and per milestone, aggregated in the database
+    project_invoices = db.query(
+        Invoice.project_id.label("project_id"),
+        func.sum(Invoice.total).label("invoiced_total"),
+        func.count(Invoice.id).label("invoice_count")
+    ).filter(
+        Invoice.project_id.isnot(None),
+        Invoice.status == InvoiceStatus.issued
+    ).group_by(Invoice.project_id).subquery()
+    
+    milestone_invoices = db.query(
+        Invoice.milestone_id.label("milestone_id"),
+        func.sum(Invoice.total).label("invoiced_total"),
+        func.count(Invoice.id).label("invoice_count")
+    ).filter(
+        Invoice.milestone_id.isnot(None),
+        Invoice.status == InvoiceStatus.issued
+    ).group_by(Invoice.milestone_id).subquery()
+    
+    invoiced_total_col = func.coalesce(project_invoices.c.invoiced_total, 0.0)
+    invoice_count_col = func.coalesce(project_invoices.c.invoice_count, 0)
+    
+    # Project counts and overall project revenue in a single pass
+    total_projects, active_projects, closed_projects, total_project_revenue = db.query(
+        func.count(Project.id),
+        func.count(case((Project.status == ProjectStatus.active, 1))),
+        func.count(case((Project.status == ProjectStatus.closed, 1))),
+        func.coalesce(func.sum(project_invoices.c.invoiced_total), 0.0)
+    ).outerjoin(project_invoices, project_invoices.c.project_id == Project.id).one()
+    
+    # Top 10 projects by invoiced total
+    top_rows = db.query(
+        Project.id,
+        Project.project_code,
+        Project.title,
+        Project.status,
+        Project.total_budget,
+        Customer.name,
+        Customer.company_name,
+        invoiced_total_col,
+        invoice_count_col
+    ).outerjoin(
+        Customer, Customer.id == Project.customer_id
+    ).outerjoin(
+        project_invoices, project_invoices.c.project_id == Project.id
+    ).order_by(invoiced_total_col.desc(), Project.id).limit(10).all()
+    
+    top_projects = []
+    for (project_id, project_code, title, project_status, total_budget,
+         customer_name, company_name, invoiced_total, invoice_count) in top_rows:
         budget_utilization = None
-        if project.total_budget and project.total_budget > 0:
-            budget_utilization = round((invoiced_total / project.total_budget) * 100, 1)
+        if total_budget and total_budget > 0:
+            budget_utilization = round((invoiced_total / total_budget) * 100, 1)
         
-        project_revenues.append(ProjectRevenueData(
-            project_id=project.id,
-            project_code=project.project_code,
-            title=project.title,
-            customer_name=project.customer.name if project.customer else None,
-            company_name=project.customer.company_name if project.customer else None,
-            status=project.status.value,
-            budget=project.total_budget or 0,
+        top_projects.append(ProjectRevenueData(
+            project_id=project_id,
+            project_code=project_code,
+            title=title,
+            customer_name=customer_name,
+            company_name=company_name,
+            status=project_status.value,
+            budget=total_budget or 0,
             invoiced_total=round(invoiced_total, 2),
-            invoice_count=len(invoices),
+            invoice_count=invoice_count,
             budget_utilization=budget_utilization
         ))
     
-    # Sort by invoiced_total descending and get top 10
-    top_projects = sorted(project_revenues, key=lambda x: x.invoiced_total, reverse=True)[:10]
+    # Milestone progress, sorted by project code and milestone number
+    milestone_rows = db.query(
+        Milestone.id,
+        Project.project_code,
+        Project.title,
+        Milestone.milestone_no,
+        Milestone.label,
+        Milestone.expected_amount,
+        func.coalesce(milestone_invoices.c.invoiced_total, 0.0),
+        func.coalesce(milestone_invoices.c.invoice_count, 0)
+    ).join(
+        Project, Project.id == Milestone.project_id
+    ).outerjoin(
+        milestone_invoices, milestone_invoices.c.milestone_id == Milestone.id
+    ).order_by(Project.project_code, func.coalesce(Milestone.milestone_no, 0), Milestone.id).all()
     
-    # Get milestone progress
-    milestones = db.query(Milestone).options(joinedload(Milestone.project)).all()
     milestone_progress = []
-    
-    for milestone in milestones:
-        # Get issued invoices linked to this milestone
-        invoices = db.query(Invoice).filter(
-            Invoice.milestone_id == milestone.id,
-            Invoice.status == InvoiceStatus.issued
-        ).all()
-        
-        invoiced_amount = sum(inv.total for inv in invoices)
+    for (milestone_id, project_code, project_title, milestone_no, label,
+         expected_amount, invoiced_amount, invoice_count) in milestone_rows:
+        expected_amount = expected_amount or 0.0
         
         # Determine status
-        if len(invoices) == 0:
+        if invoice_count == 0:
             status = "pending"
-        elif milestone.expected_amount > 0 and abs(invoiced_amount - milestone.expected_amount) <= 0.01:
+        elif expected_amount > 0 and abs(invoiced_amount - expected_amount) <= 0.01:
             status = "completed"
         elif invoiced_amount > 0:
             status = "partial"
@@ -244,20 +280,17 @@ def get_project_analytics(
             status = "pending"
         
         milestone_progress.append(MilestoneProgressData(
-            milestone_id=milestone.id,
-            project_code=milestone.project.project_code,
-            project_title=milestone.project.title,
-            milestone_no=milestone.milestone_no or 0,
-            label=milestone.label,
-            expected_amount=milestone.expected_amount,
+            milestone_id=milestone_id,
+            project_code=project_code,
+            project_title=project_title,
+            milestone_no=milestone_no or 0,
+            label=label,
+            expected_amount=expected_amount,
             invoiced_amount=round(invoiced_amount, 2),
-            invoice_count=len(invoices),
+            invoice_count=invoice_count,
             status=status
         ))
     
-    # Sort milestones by project code and milestone number
-    milestone_progress = sorted(milestone_progress, key=lambda x: (x.project_code, x.milestone_no))
-    
     return ProjectAnalyticsResponse(
         total_projects=total_projects,
         active_projects=active_projects,
@@ -305,41 +338,47 @@ def get_receipt_analytics(
     month_names = ['January', 'February', 'March', 'April', 'May', 'June',
                    'July', 'August', 'September', 'October', 'November', 'December']
     
-    if current_user.role == "admin":
-        base_query = db.query(PaymentReceipt)
-    else:
-        base_query = db.query(PaymentReceipt).filter(PaymentReceipt.user_id == current_user.id)
+    rollup_user_id = None if current_user.role == "admin" else current_user.id
+    monthly_totals = get_rollup_buckets(db, RollupKind.receipt, rollup_user_id)
     
-    issued_receipts = base_query.filter(PaymentReceipt.status == ReceiptStatus.issued).all()
-    draft_receipts = base_query.filter(PaymentReceipt.status == ReceiptStatus.draft).all()
+    total_issued_receipts = sum(count for count, total in monthly_totals.values())
+    total_issued_amount = sum(total for count, total in monthly_totals.values())
     
-    total_issued_receipts = len(issued_receipts)
-    total_issued_amount = sum(r.amount for r in issued_receipts)
-    total_draft_receipts = len(draft_receipts)
-    total_draft_amount = sum(r.amount for r in draft_receipts)
+    draft_query = db.query(
+        func.count(PaymentReceipt.id),
+        func.coalesce(func.sum(PaymentReceipt.amount), 0.0)
+    ).filter(PaymentReceipt.status == ReceiptStatus.draft)
+    if rollup_user_id is not None:
+        draft_query = draft_query.filter(PaymentReceipt.user_id == rollup_user_id)
+    total_draft_receipts, total_draft_amount = draft_query.one()
+    total_draft_amount = total_draft_amount or 0.0
     
-    current_month_receipts = [r for r in issued_receipts 
-                              if r.issued_at and r.issued_at.year == current_year and r.issued_at.month == current_month]
-    current_month_total = sum(r.amount for r in current_month_receipts)
+    current_month_total = monthly_totals.get((current_year, current_month), (0, 0.0))[1]
     
     prev_month = current_month - 1 if current_month > 1 else 12
     prev_month_year = current_year if current_month > 1 else current_year - 1
-    previous_month_receipts = [r for r in issued_receipts 
-                               if r.issued_at and r.issued_at.year == prev_month_year and r.issued_at.month == prev_month]
-    previous_month_total = sum(r.amount for r in previous_month_receipts)
+    previous_month_total = monthly_totals.get((prev_month_year, prev_month), (0, 0.0))[1]
     
     if previous_month_total > 0:
         month_change_percent = ((current_month_total - previous_month_total) / previous_month_total) * 100
     else:
         month_change_percent = None
     
+    method_query = db.query(
+        PaymentReceipt.payment_method,
+        func.count(PaymentReceipt.id),
+        func.coalesce(func.sum(PaymentReceipt.amount), 0.0)
+    ).filter(PaymentReceipt.status == ReceiptStatus.issued)
+    if rollup_user_id is not None:
+        method_query = method_query.filter(PaymentReceipt.user_id == rollup_user_id)
+    
     payment_method_counts = {}
-    for receipt in issued_receipts:
-        method = receipt.payment_method.value if receipt.payment_method else "other"
+    for payment_method, count, total in method_query.group_by(PaymentReceipt.payment_method).all():
+        method = payment_method.value if payment_method else "other"
         if method not in payment_method_counts:
             payment_method_counts[method] = {"count": 0, "total": 0}
-        payment_method_counts[method]["count"] += 1
-        payment_method_counts[method]["total"] += receipt.amount
+        payment_method_counts[method]["count"] += count
+        payment_method_counts[method]["total"] += total or 0.0
     
     payment_methods_breakdown = []
     for method, data in payment_method_counts.items():
@@ -355,10 +394,7 @@ def get_receipt_analytics(
     
     monthly_cashflow = []
     for month in range(1, 13):
-        month_receipts = [r for r in issued_receipts 
-                         if r.issued_at and r.issued_at.year == current_year and r.issued_at.month == month]
-        month_total = sum(r.amount for r in month_receipts)
-        month_count = len(month_receipts)
+        month_count, month_total = monthly_totals.get((current_year, month), (0, 0.0))
         monthly_cashflow.append(MonthlyReceiptData(
             month=month,
             month_name=month_names[month - 1],
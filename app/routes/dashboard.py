@@ -0,0 +1,146 @@
+from functools import reduce
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import String, and_, case, cast, func, literal, select, true, union_all
+from datetime import datetime, date
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.database import get_db
+from app.models.user import User
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.quote import Quote, QuoteStatus
+from app.models.receipt import PaymentReceipt, ReceiptStatus
+from app.models.project import Project, ProjectStatus
+from app.models.revenue_rollup import RevenueRollup, RollupKind
+from app.auth import get_current_user
+
+router = APIRouter()
+
+class RecentDocument(BaseModel):
+    id: int
+    document_type: str
+    number: str
+    client_name: Optional[str] = None
+    company_name: Optional[str] = None
+    status: str
+    amount: float
+    date: Optional[datetime] = None
+
+class DashboardSummaryResponse(BaseModel):
+    total_invoices: int
+    draft_invoices: int
+    total_quotes: int
+    draft_quotes: int
+    issued_receipts: int
+    draft_receipts: int
+    invoiced_this_year: float
+    invoiced_this_month: float
+    active_projects: int
+    total_projects: int
+    project_revenue: float
+    recent_invoices: List[RecentDocument]
+    recent_quotes: List[RecentDocument]
+    recent_receipts: List[RecentDocument]
+
+
+RECENT_SOURCES = [
+    ("recent_invoices", "invoice", Invoice, Invoice.invoice_number, Invoice.total, Invoice.issue_date),
+    ("recent_quotes", "quote", Quote, Quote.quote_number, Quote.total, Quote.issue_date),
+    ("recent_receipts", "receipt", PaymentReceipt, PaymentReceipt.receipt_number, PaymentReceipt.amount, PaymentReceipt.receipt_date),
+]
+
+
+def _for_user(stmt, model, user_id: Optional[int]):
+    return stmt if user_id is None else stmt.where(model.user_id == user_id)
+
+
+def _kpis(db: Session, user_id: Optional[int]) -> dict:
+    """Every headline number in one statement: one aggregate per table, cross joined."""
+    today = date.today()
+    invoices = _for_user(select(
+        func.count(Invoice.id).label("total_invoices"),
+        func.count(case((Invoice.status == InvoiceStatus.draft, 1))).label("draft_invoices")
+    ), Invoice, user_id).subquery()
+    quotes = _for_user(select(
+        func.count(Quote.id).label("total_quotes"),
+        func.count(case((Quote.status == QuoteStatus.draft, 1))).label("draft_quotes")
+    ), Quote, user_id).subquery()
+    receipts = _for_user(select(
+        func.count(PaymentReceipt.id).label("draft_receipts")
+    ).where(PaymentReceipt.status == ReceiptStatus.draft), PaymentReceipt, user_id).subquery()
+
+    this_year = and_(RevenueRollup.kind == RollupKind.invoice.value, RevenueRollup.year == today.year)
+    rollups = _for_user(select(
+        func.coalesce(func.sum(case((this_year, RevenueRollup.amount))), 0.0).label("invoiced_this_year"),
+        func.coalesce(func.sum(case((and_(this_year, RevenueRollup.month == today.month), RevenueRollup.amount))), 0.0)
+            .label("invoiced_this_month"),
+        func.coalesce(func.sum(case((RevenueRollup.kind == RollupKind.receipt.value, RevenueRollup.count))), 0)
+            .label("issued_receipts")
+    ), RevenueRollup, user_id).subquery()
+
+    projects = select(
+        func.count(Project.id).label("total_projects"),
+        func.count(case((Project.status == ProjectStatus.active, 1))).label("active_projects")
+    ).subquery()
+    project_revenue = select(
+        func.coalesce(func.sum(Invoice.total), 0.0).label("project_revenue")
+    ).where(Invoice.project_id.isnot(None), Invoice.status == InvoiceStatus.issued).subquery()
+
+    sections = [invoices, quotes, receipts, rollups, projects, project_revenue]
+    # Each section is a single row, so joining them on TRUE yields one row
+    joined = reduce(lambda left, right: left.join(right, true()), sections)
+    row = db.execute(select(*sections).select_from(joined)).one()
+    kpis = dict(row._mapping)
+    for key in ("invoiced_this_year", "invoiced_this_month", "project_revenue"):
+        kpis[key] = round(kpis[key] or 0.0, 2)
+    kpis["issued_receipts"] = int(kpis["issued_receipts"])
+    return kpis
+
+
+def _recent_documents(db: Session, user_id: Optional[int], limit: int) -> dict:
+    """The latest documents of each type in one UNION ALL of per-type top-N queries."""
+    parts = []
+    for key, document_type, model, number_col, amount_col, date_col in RECENT_SOURCES:
+        latest = _for_user(select(
+            literal(key).label("key"),
+            literal(document_type).label("document_type"),
+            model.id.label("id"),
+            number_col.label("number"),
+            model.client_name.label("client_name"),
+            model.company_name.label("company_name"),
+            # Each type has its own enum; compare as text across the union
+            cast(model.status, String).label("status"),
+            amount_col.label("amount"),
+            date_col.label("date")
+        ), model, user_id).order_by(model.id.desc()).limit(limit).subquery()
+        parts.append(select(latest))
+    rows = db.execute(union_all(*parts)).all()
+
+    result = {key: [] for key, *_ in RECENT_SOURCES}
+    for row in sorted(rows, key=lambda row: -row.id):
+        result[row.key].append(RecentDocument(
+            id=row.id,
+            document_type=row.document_type,
+            number=row.number,
+            client_name=row.client_name,
+            company_name=row.company_name,
+            status=row.status,
+            amount=row.amount or 0.0,
+            date=row.date
+        ))
+    return result
+
+
+@router.get("/summary", response_model=DashboardSummaryResponse)
+def get_dashboard_summary(
+    recent: int = Query(5, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Headline numbers and the most recent documents for the dashboard in one
+    payload, read with two statements on the request's session.
+    """
+    user_id = None if current_user.role == "admin" else current_user.id
+    return DashboardSummaryResponse(**_kpis(db, user_id), **_recent_documents(db, user_id, recent))
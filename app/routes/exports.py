@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+
+from app.database import get_db
+from app.models.user import User
+from app.auth import get_current_user
+from app.services.pdf_exports import EXPORT_SOURCES, select_export_documents, stream_pdf_bundle
+
+router = APIRouter()
+
+@router.get("/pdf-bundle")
+def export_pdf_bundle(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    doc_types: List[str] = Query(["invoice", "quote", "receipt"]),
+    customer_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream a ZIP with the PDFs of every issued document matching the filter.
+    doc_types may be repeated or comma separated (invoice, quote, receipt).
+    """
+    document_types = []
+    for value in doc_types:
+        document_types.extend(t.strip() for t in value.split(",") if t.strip())
+    
+    unknown = [t for t in document_types if t not in EXPORT_SOURCES]
+    if unknown or not document_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"doc_types must be a list of: {', '.join(EXPORT_SOURCES)}"
+        )
+    
+    documents = select_export_documents(
+        db,
+        list(dict.fromkeys(document_types)),
+        date_from=date_from,
+        date_to=date_to,
+        customer_id=customer_id,
+        user_id=None if current_user.role == "admin" else current_user.id
+    )
+    if not documents:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No issued documents match the filter")
+    
+    period = "_".join(d.strftime("%Y%m%d") for d in (date_from, date_to) if d) or "all"
+    return StreamingResponse(
+        stream_pdf_bundle(documents),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="documents_{period}.zip"',
+            "X-Document-Count": str(len(documents))
+        }
+    )
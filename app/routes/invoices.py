@@ -1,40 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Union
 from datetime import datetime
 
 from app.database import get_db
 from app.models.user import User
 from app.models.invoice import Invoice, InvoiceLineItem, InvoiceStatus
+from app.models.receipt import PaymentReceipt, ReceiptStatus
 from app.models.customer import Customer, CustomerStatus
-from app.models.email_log import EmailLog, EmailType
 from app.models.project import Project, Milestone
-from app.schemas import InvoiceCreate, InvoiceResponse, InvoiceUpdate, EmailRequest, CancelRequest
+from app.models.pdf_job import PdfJobAction
+from app.schemas import (
+    InvoiceCreate, InvoiceResponse, InvoiceUpdate, EmailRequest, CancelRequest, Page,
+    InvoiceSummary, ListView
+)
 from app.auth import get_current_user
-from app.utils.pdf_generator import generate_invoice_pdf
-from app.utils.email_sender import send_invoice_email
 from app.services.audit import log_action
+from app.services.numbering import generate_invoice_number
 from app.services.validation import get_customer_snapshot
+from app.services.rollups import record_invoice_issued, record_invoice_cancelled
+from app.services.pagination import decode_cursor, paginate
+from app.services.pdf_jobs import enqueue_pdf_job
+from app.services.email_outbox import queue_document_email
+from app.services.pdf_cache import lookup_cached_pdf, record_pdf_request
+from app.services.pdf_delivery import pdf_download_response
 
 router = APIRouter()
 
-def generate_invoice_number(db: Session) -> str:
-    """Generate year-based invoice number: INV-YYYY-NNNNNN"""
-    current_year = datetime.now().year
-    year_prefix = f"INV-{current_year}-"
-    
-    last_invoice = db.query(Invoice).filter(
-        Invoice.invoice_number.like(f"{year_prefix}%")
-    ).order_by(Invoice.id.desc()).first()
-    
-    if last_invoice:
-        try:
-            last_number = int(last_invoice.invoice_number.split('-')[2])
-            return f"{year_prefix}{last_number + 1:06d}"
-        except (IndexError, ValueError):
-            return f"{year_prefix}000001"
-    return f"{year_prefix}000001"
-
 def sync_customer(db: Session, client_name: str, company_name: str, client_email: str, 
                  telephone1: str, telephone2: str, client_address: str, 
                  client_reg_no: str, client_tax_id: str):
@@ -191,9 +184,6 @@ def create_invoice(
         )
         db.add(line_item)
     
-    db.commit()
-    db.refresh(new_invoice)
-    
     log_action(
         db,
         action="create",
@@ -205,18 +195,90 @@ def create_invoice(
         description=f"Created invoice {new_invoice.invoice_number}"
     )
     
+    db.commit()
+    db.refresh(new_invoice)
+    
     return new_invoice
 
-@router.get("", response_model=List[InvoiceResponse])
+SUMMARY_COLUMNS = (
+    Invoice.id,
+    Invoice.invoice_number,
+    Invoice.client_name,
+    Invoice.company_name,
+    Invoice.status,
+    Invoice.total,
+    Invoice.issue_date,
+)
+
+@router.get("", response_model=Union[Page[InvoiceResponse], Page[InvoiceSummary]])
 def get_invoices(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    status_filter: Optional[InvoiceStatus] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    customer_id: Optional[int] = None,
+    telephone1: Optional[str] = None,
+    project_id: Optional[int] = None,
+    without_receipt: bool = False,
+    q: Optional[str] = None,
+    view: ListView = ListView.full,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if current_user.role == "admin":
-        invoices = db.query(Invoice).order_by(Invoice.id.desc()).all()
+    """
+    List invoices newest first, one keyset page at a time (pass next_cursor back as cursor).
+    view=summary selects only the columns the list screen shows and skips line items.
+    customer_id and telephone1 together match invoices linked by either one.
+    without_receipt leaves out invoices that already have an issued receipt.
+    q searches number, client, company and telephone.
+    """
+    if view == ListView.summary:
+        query = db.query(*SUMMARY_COLUMNS)
     else:
-        invoices = db.query(Invoice).filter(Invoice.user_id == current_user.id).order_by(Invoice.id.desc()).all()
-    return invoices
+        query = db.query(Invoice).options(selectinload(Invoice.line_items))
+    
+    if current_user.role != "admin":
+        query = query.filter(Invoice.user_id == current_user.id)
+    if status_filter:
+        query = query.filter(Invoice.status == status_filter)
+    if date_from:
+        query = query.filter(Invoice.issue_date >= date_from)
+    if date_to:
+        query = query.filter(Invoice.issue_date <= date_to)
+    if customer_id and telephone1:
+        query = query.filter(or_(Invoice.customer_id == customer_id, Invoice.telephone1 == telephone1))
+    elif customer_id:
+        query = query.filter(Invoice.customer_id == customer_id)
+    elif telephone1:
+        query = query.filter(Invoice.telephone1 == telephone1)
+    if project_id:
+        query = query.filter(Invoice.project_id == project_id)
+    if without_receipt:
+        query = query.filter(~db.query(PaymentReceipt.id).filter(
+            PaymentReceipt.invoice_id == Invoice.id,
+            PaymentReceipt.status == ReceiptStatus.issued
+        ).exists())
+    if q:
+        search_pattern = f"%{q.strip()}%"
+        query = query.filter(
+            or_(
+                func.lower(Invoice.invoice_number).like(func.lower(search_pattern)),
+                func.lower(Invoice.client_name).like(func.lower(search_pattern)),
+                func.lower(Invoice.company_name).like(func.lower(search_pattern)),
+                Invoice.telephone1.like(search_pattern)
+            )
+        )
+    
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Invoice.id < last_id)
+    
+    invoices = query.order_by(Invoice.id.desc()).limit(limit + 1).all()
+    if view == ListView.summary:
+        invoices = [row._asdict() for row in invoices]
+        return paginate(invoices, limit, key=lambda row: (row["id"],))
+    return paginate(invoices, limit, key=lambda invoice: (invoice.id,))
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
 def get_invoice(
@@ -240,7 +302,8 @@ def update_invoice(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    # Row lock: concurrent status changes must not both update the rollups
+    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).with_for_update().first()
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
     
@@ -394,9 +457,10 @@ def update_invoice(
         tax_amount = subtotal_after_discount * ((invoice.tax or 0.0) / 100)
         invoice.total = subtotal_after_discount + tax_amount
     
+    if old_status == InvoiceStatus.draft and invoice.status == InvoiceStatus.issued:
+        record_invoice_issued(db, invoice)
+    
     invoice.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(invoice)
     
     log_action(
         db,
@@ -409,6 +473,12 @@ def update_invoice(
         description=f"{'Issued' if old_status == InvoiceStatus.draft and invoice.status == InvoiceStatus.issued else 'Updated'} invoice {invoice.invoice_number}"
     )
     
+    db.commit()
+    db.refresh(invoice)
+    
+    if old_status == InvoiceStatus.draft and invoice.status == InvoiceStatus.issued:
+        enqueue_pdf_job(db, "invoice", invoice.id, current_user.id)
+    
     return invoice
 
 @router.post("/{invoice_id}/issue", response_model=InvoiceResponse)
@@ -418,7 +488,8 @@ def issue_invoice(
     db: Session = Depends(get_db)
 ):
     """Issue a draft invoice (makes it immutable)."""
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    # Row lock: concurrent status changes must not both update the rollups
+    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).with_for_update().first()
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
     
@@ -468,8 +539,7 @@ def issue_invoice(
     invoice.issued_by = current_user.id
     invoice.pdf_url = None  # Clear cached PDF so it regenerates with correct "INVOICE" title
     
-    db.commit()
-    db.refresh(invoice)
+    record_invoice_issued(db, invoice)
     
     log_action(
         db,
@@ -482,6 +552,12 @@ def issue_invoice(
         description=f"Issued invoice {invoice.invoice_number}"
     )
     
+    db.commit()
+    db.refresh(invoice)
+    
+    # Issued content is final: render it now so send-email and downloads find it ready
+    enqueue_pdf_job(db, "invoice", invoice.id, current_user.id)
+    
     return invoice
 
 @router.delete("/{invoice_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -505,7 +581,6 @@ def delete_invoice(
     
     invoice_number = invoice.invoice_number
     db.delete(invoice)
-    db.commit()
     
     log_action(
         db,
@@ -517,6 +592,8 @@ def delete_invoice(
         entity_number=invoice_number,
         description=f"Deleted draft invoice {invoice_number}"
     )
+    
+    db.commit()
 
 @router.post("/{invoice_id}/cancel", response_model=InvoiceResponse)
 def cancel_invoice(
@@ -525,7 +602,8 @@ def cancel_invoice(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    # Row lock: concurrent status changes must not both update the rollups
+    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).with_for_update().first()
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
     
@@ -549,12 +627,10 @@ def cancel_invoice(
     invoice.cancelled_by = current_user.id
     invoice.cancel_reason = cancel_data.reason
     
-    # Generate and lock the cancelled PDF immediately
-    pdf_url = generate_invoice_pdf(invoice, db)
-    invoice.pdf_url = pdf_url
+    record_invoice_cancelled(db, invoice)
     
-    db.commit()
-    db.refresh(invoice)
+    # The cancelled PDF is rendered and locked by a background job
+    invoice.pdf_url = None
     
     log_action(
         db,
@@ -567,14 +643,21 @@ def cancel_invoice(
         description=f"Cancelled invoice {invoice.invoice_number}: {cancel_data.reason}"
     )
     
+    db.commit()
+    db.refresh(invoice)
+    
+    enqueue_pdf_job(db, "invoice", invoice.id, current_user.id)
+    
     return invoice
 
-@router.post("/{invoice_id}/generate-pdf")
+@router.post("/{invoice_id}/generate-pdf", status_code=status.HTTP_202_ACCEPTED)
 def generate_pdf(
     invoice_id: int,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    """Queue a PDF render; poll GET /api/pdf-jobs/{job_id} for the pdf_url."""
     invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
@@ -583,28 +666,32 @@ def generate_pdf(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
     # For cancelled invoices, always return existing PDF (preserve immutability)
-    if invoice.status == InvoiceStatus.cancelled:
-        if invoice.pdf_url:
-            return {"message": "PDF retrieved successfully", "pdf_url": invoice.pdf_url}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cancelled invoice PDF not available. Contact support."
-            )
+    if invoice.status == InvoiceStatus.cancelled and invoice.pdf_url:
+        response.status_code = status.HTTP_200_OK
+        return {"message": "PDF retrieved successfully", "pdf_url": invoice.pdf_url}
     
-    pdf_url = generate_invoice_pdf(invoice, db)
-    invoice.pdf_url = pdf_url
-    db.commit()
+    pdf_url = lookup_cached_pdf(db, "invoice", invoice)
+    record_pdf_request("invoice", ready=bool(pdf_url))
+    if pdf_url:
+        invoice.pdf_url = pdf_url
+        db.commit()
+        response.status_code = status.HTTP_200_OK
+        return {"message": "PDF retrieved successfully", "pdf_url": pdf_url}
     
-    return {"message": "PDF generated successfully", "pdf_url": pdf_url}
+    job = enqueue_pdf_job(db, "invoice", invoice.id, current_user.id)
+    
+    return {"message": "PDF generation queued", "job_id": job.id, "status": job.status.value}
 
-@router.post("/{invoice_id}/send-email")
-def send_email(
+@router.get("/{invoice_id}/pdf")
+def download_pdf(
     invoice_id: int,
-    email_data: EmailRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    persist: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    """Render the invoice in memory and stream it back; persist=true also stores it in the background."""
     invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
@@ -612,44 +699,43 @@ def send_email(
     if current_user.role != "admin" and invoice.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
-    if not invoice.pdf_url:
-        pdf_url = generate_invoice_pdf(invoice, db)
-        invoice.pdf_url = pdf_url
-        db.commit()
+    return pdf_download_response(db, "invoice", invoice, request, background_tasks, persist)
+
+@router.post("/{invoice_id}/send-email", status_code=status.HTTP_202_ACCEPTED)
+def send_email(
+    invoice_id: int,
+    email_data: EmailRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue the email; the job renders the PDF first if the invoice has none."""
+    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    if not invoice:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
     
-    send_invoice_email(invoice, email_data.recipient_email, email_data.message or "")
+    if current_user.role != "admin" and invoice.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
-    customer = None
-    if invoice.telephone1:
-        customer = db.query(Customer).filter(Customer.telephone1 == invoice.telephone1).first()
+    payload = {
+        "recipient_email": email_data.recipient_email,
+        "subject": email_data.subject,
+        "message": email_data.message or "",
+        "username": current_user.username
+    }
     
-    email_log = EmailLog(
-        email_type=EmailType.invoice,
-        document_id=invoice.id,
-        document_number=invoice.invoice_number,
-        recipient_email=email_data.recipient_email,
-        subject=email_data.subject,
-        message=email_data.message or "",
-        pdf_url=invoice.pdf_url,
-        user_id=current_user.id,
-        customer_id=customer.id if customer else None,
-        telephone1=invoice.telephone1,
-        client_name=invoice.client_name,
-        company_name=invoice.company_name,
-        total_amount=invoice.total
-    )
-    db.add(email_log)
-    db.commit()
+    # pdf_url is cleared on every edit, so a stored PDF is current: queue the email now
+    if invoice.pdf_url:
+        record_pdf_request("invoice", ready=True)
+        email_log = queue_document_email(db, "invoice", invoice, payload, current_user.id)
+        return {"message": "Email queued", "email_log_id": email_log.id, "status": email_log.delivery_status.value}
     
-    log_action(
+    job = enqueue_pdf_job(
         db,
-        action="send_email",
-        user_id=current_user.id,
-        username=current_user.username,
-        entity_type="invoice",
-        entity_id=invoice.id,
-        entity_number=invoice.invoice_number,
-        description=f"Sent invoice {invoice.invoice_number} to {email_data.recipient_email}"
+        "invoice",
+        invoice.id,
+        current_user.id,
+        action=PdfJobAction.send_email,
+        payload=payload
     )
     
-    return {"message": "Email sent successfully"}
+    return {"message": "Email queued", "job_id": job.id, "status": job.status.value}
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.database import get_db
+from app.models.user import User
+from app.models.pdf_job import PdfJob
+from app.schemas import PdfJobResponse, PdfCacheStats
+from app.auth import get_current_user
+from app.services.pdf_jobs import FINISHED_STATUSES, wait_for_job
+from app.services.pdf_cache import DOCUMENT_MODELS, get_cache_stats
+
+router = APIRouter()
+
+@router.get("/cache-stats", response_model=List[PdfCacheStats])
+def get_pdf_cache_stats(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Render cache hit/miss counters per document type."""
+    return get_cache_stats(db)
+
+@router.get("/{job_id}", response_model=PdfJobResponse)
+def get_pdf_job(
+    job_id: int,
+    wait: float = Query(0, ge=0, le=30),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Status of a background PDF job. With wait > 0 the request blocks for up to
+    that many seconds (at most MAX_JOB_WAIT_SECONDS) until the job has
+    completed or failed.
+    """
+    job = db.query(PdfJob).filter(PdfJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PDF job not found")
+    
+    # Jobs are shared between requests for the same content, so access follows
+    # the document rather than whoever queued the job
+    if current_user.role != "admin":
+        model = DOCUMENT_MODELS[job.document_type]
+        document = db.query(model.user_id).filter(model.id == job.document_id).first()
+        if document is None or document.user_id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    
+    if wait and job.status not in FINISHED_STATUSES:
+        # Give the request's connection back to the pool while waiting
+        db.close()
+        job = wait_for_job(job_id, wait)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PDF job not found")
+    
+    return job
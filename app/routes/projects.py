@@ -15,28 +15,10 @@ from app.schemas import (
     MilestoneCreate, MilestoneResponse, MilestoneUpdate
 )
 from app.auth import get_current_user
+from app.services.numbering import generate_project_code
 
 router = APIRouter()
 
-def generate_project_code(db: Session) -> str:
-    current_year = datetime.utcnow().year
-    year_prefix = f"PRJ-{current_year}-"
-    
-    last_project = db.query(Project).filter(
-        Project.project_code.like(f"{year_prefix}%")
-    ).order_by(Project.project_code.desc()).first()
-    
-    if last_project:
-        try:
-            last_number = int(last_project.project_code.split("-")[-1])
-            new_number = last_number + 1
-        except (ValueError, IndexError):
-            new_number = 1
-    else:
-        new_number = 1
-    
-    return f"{year_prefix}{new_number:06d}"
-
 def create_milestone_with_validation(db: Session, project_id: int, milestone_data: MilestoneCreate) -> Milestone:
     """Create a milestone with proper validation and auto-numbering."""
     milestone_type = milestone_data.milestone_type
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session, selectinload, noload
+from typing import List, Optional, Union
 from datetime import datetime
 
 from app.database import get_db
@@ -8,50 +9,23 @@ from app.models.user import User
 from app.models.quote import Quote, QuoteLineItem, QuoteStatus
 from app.models.invoice import Invoice, InvoiceLineItem, InvoiceStatus
 from app.models.customer import Customer, CustomerStatus
-from app.models.email_log import EmailLog, EmailType
-from app.schemas import QuoteCreate, QuoteResponse, QuoteUpdate, EmailRequest, InvoiceResponse, CancelRequest
+from app.models.pdf_job import PdfJobAction
+from app.schemas import (
+    QuoteCreate, QuoteResponse, QuoteUpdate, EmailRequest, InvoiceResponse, CancelRequest, Page,
+    QuoteSummary, ListView
+)
 from app.auth import get_current_user
-from app.utils.pdf_generator import generate_quote_pdf
-from app.utils.email_sender import send_quote_email
 from app.services.audit import log_action
+from app.services.numbering import generate_quote_number, generate_invoice_number
 from app.services.validation import get_customer_snapshot
+from app.services.pagination import decode_cursor, paginate
+from app.services.pdf_jobs import enqueue_pdf_job
+from app.services.email_outbox import queue_document_email
+from app.services.pdf_cache import lookup_cached_pdf, record_pdf_request
+from app.services.pdf_delivery import pdf_download_response
 
 router = APIRouter()
 
-def generate_quote_number(db: Session) -> str:
-    """Generate year-based quote number: QUO-YYYY-NNNNNN"""
-    current_year = datetime.now().year
-    year_prefix = f"QUO-{current_year}-"
-    
-    last_quote = db.query(Quote).filter(
-        Quote.quote_number.like(f"{year_prefix}%")
-    ).order_by(Quote.id.desc()).first()
-    
-    if last_quote:
-        try:
-            last_number = int(last_quote.quote_number.split('-')[2])
-            return f"{year_prefix}{last_number + 1:06d}"
-        except (IndexError, ValueError):
-            return f"{year_prefix}000001"
-    return f"{year_prefix}000001"
-
-def generate_invoice_number(db: Session) -> str:
-    """Generate year-based invoice number: INV-YYYY-NNNNNN"""
-    current_year = datetime.now().year
-    year_prefix = f"INV-{current_year}-"
-    
-    last_invoice = db.query(Invoice).filter(
-        Invoice.invoice_number.like(f"{year_prefix}%")
-    ).order_by(Invoice.id.desc()).first()
-    
-    if last_invoice:
-        try:
-            last_number = int(last_invoice.invoice_number.split('-')[2])
-            return f"{year_prefix}{last_number + 1:06d}"
-        except (IndexError, ValueError):
-            return f"{year_prefix}000001"
-    return f"{year_prefix}000001"
-
 @router.post("", response_model=QuoteResponse, status_code=status.HTTP_201_CREATED)
 def create_quote(
     quote_data: QuoteCreate,
@@ -111,9 +85,6 @@ def create_quote(
         )
         db.add(line_item)
     
-    db.commit()
-    db.refresh(new_quote)
-    
     log_action(
         db,
         action="create",
@@ -125,18 +96,82 @@ def create_quote(
         description=f"Created quote {new_quote.quote_number}"
     )
     
+    db.commit()
+    db.refresh(new_quote)
+    
     return new_quote
 
-@router.get("", response_model=List[QuoteResponse])
+SUMMARY_COLUMNS = (
+    Quote.id,
+    Quote.quote_number,
+    Quote.client_name,
+    Quote.company_name,
+    Quote.status,
+    Quote.total,
+    Quote.issue_date,
+)
+
+@router.get("", response_model=Union[Page[QuoteResponse], Page[QuoteSummary]])
 def get_quotes(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    status_filter: Optional[QuoteStatus] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    customer_id: Optional[int] = None,
+    project_id: Optional[int] = None,
+    q: Optional[str] = None,
+    include_line_items: bool = False,
+    view: ListView = ListView.full,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if current_user.role == "admin":
-        quotes = db.query(Quote).order_by(Quote.id.desc()).all()
+    """
+    List quotes newest first, one keyset page at a time (pass next_cursor back as cursor).
+    Line items are only loaded (in one selectin query) when include_line_items is set;
+    otherwise they come back empty and can be fetched with GET /api/quotes/{id}.
+    view=summary selects only the columns the list screen shows.
+    q searches number, client, company and telephone.
+    """
+    if view == ListView.summary:
+        query = db.query(*SUMMARY_COLUMNS)
+    elif include_line_items:
+        query = db.query(Quote).options(selectinload(Quote.line_items))
     else:
-        quotes = db.query(Quote).filter(Quote.user_id == current_user.id).order_by(Quote.id.desc()).all()
-    return quotes
+        query = db.query(Quote).options(noload(Quote.line_items))
+    
+    if current_user.role != "admin":
+        query = query.filter(Quote.user_id == current_user.id)
+    if status_filter:
+        query = query.filter(Quote.status == status_filter)
+    if date_from:
+        query = query.filter(Quote.issue_date >= date_from)
+    if date_to:
+        query = query.filter(Quote.issue_date <= date_to)
+    if customer_id:
+        query = query.filter(Quote.customer_id == customer_id)
+    if project_id:
+        query = query.filter(Quote.project_id == project_id)
+    if q:
+        search_pattern = f"%{q.strip()}%"
+        query = query.filter(
+            or_(
+                func.lower(Quote.quote_number).like(func.lower(search_pattern)),
+                func.lower(Quote.client_name).like(func.lower(search_pattern)),
+                func.lower(Quote.company_name).like(func.lower(search_pattern)),
+                Quote.telephone1.like(search_pattern)
+            )
+        )
+    
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Quote.id < last_id)
+    
+    quotes = query.order_by(Quote.id.desc()).limit(limit + 1).all()
+    if view == ListView.summary:
+        quotes = [row._asdict() for row in quotes]
+        return paginate(quotes, limit, key=lambda row: (row["id"],))
+    return paginate(quotes, limit, key=lambda quote: (quote.id,))
 
 @router.get("/{quote_id}", response_model=QuoteResponse)
 def get_quote(
@@ -251,8 +286,6 @@ def update_quote(
         quote.total = subtotal_after_discount + tax_amount
     
     quote.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(quote)
     
     log_action(
         db,
@@ -265,6 +298,12 @@ def update_quote(
         description=f"{'Issued' if old_status == QuoteStatus.draft and quote.status == QuoteStatus.issued else 'Updated'} quote {quote.quote_number}"
     )
     
+    db.commit()
+    db.refresh(quote)
+    
+    if old_status == QuoteStatus.draft and quote.status == QuoteStatus.issued:
+        enqueue_pdf_job(db, "quote", quote.id, current_user.id)
+    
     return quote
 
 @router.post("/{quote_id}/issue", response_model=QuoteResponse)
@@ -310,9 +349,6 @@ def issue_quote(
     quote.issued_by = current_user.id
     quote.pdf_url = None  # Clear cached PDF so it regenerates with correct "QUOTATION" title
     
-    db.commit()
-    db.refresh(quote)
-    
     log_action(
         db,
         action="issue",
@@ -324,6 +360,12 @@ def issue_quote(
         description=f"Issued quote {quote.quote_number}"
     )
     
+    db.commit()
+    db.refresh(quote)
+    
+    # Issued content is final: render it now so send-email and downloads find it ready
+    enqueue_pdf_job(db, "quote", quote.id, current_user.id)
+    
     return quote
 
 @router.delete("/{quote_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -347,7 +389,6 @@ def delete_quote(
     
     quote_number = quote.quote_number
     db.delete(quote)
-    db.commit()
     
     log_action(
         db,
@@ -359,6 +400,8 @@ def delete_quote(
         entity_number=quote_number,
         description=f"Deleted draft quote {quote_number}"
     )
+    
+    db.commit()
 
 @router.post("/{quote_id}/cancel", response_model=QuoteResponse)
 def cancel_quote(
@@ -391,12 +434,8 @@ def cancel_quote(
     quote.cancelled_by = current_user.id
     quote.cancel_reason = cancel_data.reason
     
-    # Generate and lock the cancelled PDF immediately
-    pdf_url = generate_quote_pdf(quote, db)
-    quote.pdf_url = pdf_url
-    
-    db.commit()
-    db.refresh(quote)
+    # The cancelled PDF is rendered and locked by a background job
+    quote.pdf_url = None
     
     log_action(
         db,
@@ -409,6 +448,11 @@ def cancel_quote(
         description=f"Cancelled quote {quote.quote_number}: {cancel_data.reason}"
     )
     
+    db.commit()
+    db.refresh(quote)
+    
+    enqueue_pdf_job(db, "quote", quote.id, current_user.id)
+    
     return quote
 
 @router.post("/{quote_id}/convert-to-invoice", response_model=InvoiceResponse)
@@ -487,9 +531,6 @@ def convert_to_invoice(
     quote.status = QuoteStatus.invoiced
     quote.converted_to_invoice_id = new_invoice.id
     
-    db.commit()
-    db.refresh(new_invoice)
-    
     log_action(
         db,
         action="convert",
@@ -512,14 +553,19 @@ def convert_to_invoice(
         description=f"Created invoice {new_invoice.invoice_number} from quote {quote.quote_number}"
     )
     
+    db.commit()
+    db.refresh(new_invoice)
+    
     return new_invoice
 
-@router.post("/{quote_id}/generate-pdf")
+@router.post("/{quote_id}/generate-pdf", status_code=status.HTTP_202_ACCEPTED)
 def generate_pdf(
     quote_id: int,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    """Queue a PDF render; poll GET /api/pdf-jobs/{job_id} for the pdf_url."""
     quote = db.query(Quote).filter(Quote.id == quote_id).first()
     if not quote:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quote not found")
@@ -528,28 +574,32 @@ def generate_pdf(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
     # For cancelled quotes, always return existing PDF (preserve immutability)
-    if quote.status == QuoteStatus.cancelled:
-        if quote.pdf_url:
-            return {"message": "PDF retrieved successfully", "pdf_url": quote.pdf_url}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cancelled quote PDF not available. Contact support."
-            )
+    if quote.status == QuoteStatus.cancelled and quote.pdf_url:
+        response.status_code = status.HTTP_200_OK
+        return {"message": "PDF retrieved successfully", "pdf_url": quote.pdf_url}
     
-    pdf_url = generate_quote_pdf(quote, db)
-    quote.pdf_url = pdf_url
-    db.commit()
+    pdf_url = lookup_cached_pdf(db, "quote", quote)
+    record_pdf_request("quote", ready=bool(pdf_url))
+    if pdf_url:
+        quote.pdf_url = pdf_url
+        db.commit()
+        response.status_code = status.HTTP_200_OK
+        return {"message": "PDF retrieved successfully", "pdf_url": pdf_url}
     
-    return {"message": "PDF generated successfully", "pdf_url": pdf_url}
+    job = enqueue_pdf_job(db, "quote", quote.id, current_user.id)
+    
+    return {"message": "PDF generation queued", "job_id": job.id, "status": job.status.value}
 
-@router.post("/{quote_id}/send-email")
-def send_email(
+@router.get("/{quote_id}/pdf")
+def download_pdf(
     quote_id: int,
-    email_data: EmailRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    persist: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    """Render the quote in memory and stream it back; persist=true also stores it in the background."""
     quote = db.query(Quote).filter(Quote.id == quote_id).first()
     if not quote:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quote not found")
@@ -557,44 +607,43 @@ def send_email(
     if current_user.role != "admin" and quote.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
-    if not quote.pdf_url:
-        pdf_url = generate_quote_pdf(quote, db)
-        quote.pdf_url = pdf_url
-        db.commit()
+    return pdf_download_response(db, "quote", quote, request, background_tasks, persist)
+
+@router.post("/{quote_id}/send-email", status_code=status.HTTP_202_ACCEPTED)
+def send_email(
+    quote_id: int,
+    email_data: EmailRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue the email; the job renders the PDF first if the quote has none."""
+    quote = db.query(Quote).filter(Quote.id == quote_id).first()
+    if not quote:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quote not found")
     
-    send_quote_email(quote, email_data.recipient_email, email_data.message or "")
+    if current_user.role != "admin" and quote.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
-    customer = None
-    if quote.telephone1:
-        customer = db.query(Customer).filter(Customer.telephone1 == quote.telephone1).first()
+    payload = {
+        "recipient_email": email_data.recipient_email,
+        "subject": email_data.subject,
+        "message": email_data.message or "",
+        "username": current_user.username
+    }
     
-    email_log = EmailLog(
-        email_type=EmailType.quote,
-        document_id=quote.id,
-        document_number=quote.quote_number,
-        recipient_email=email_data.recipient_email,
-        subject=email_data.subject,
-        message=email_data.message or "",
-        pdf_url=quote.pdf_url,
-        user_id=current_user.id,
-        customer_id=customer.id if customer else None,
-        telephone1=quote.telephone1,
-        client_name=quote.client_name,
-        company_name=quote.company_name,
-        total_amount=quote.total
-    )
-    db.add(email_log)
-    db.commit()
+    # pdf_url is cleared on every edit, so a stored PDF is current: queue the email now
+    if quote.pdf_url:
+        record_pdf_request("quote", ready=True)
+        email_log = queue_document_email(db, "quote", quote, payload, current_user.id)
+        return {"message": "Email queued", "email_log_id": email_log.id, "status": email_log.delivery_status.value}
     
-    log_action(
+    job = enqueue_pdf_job(
         db,
-        action="send_email",
-        user_id=current_user.id,
-        username=current_user.username,
-        entity_type="quote",
-        entity_id=quote.id,
-        entity_number=quote.quote_number,
-        description=f"Sent quote {quote.quote_number} to {email_data.recipient_email}"
+        "quote",
+        quote.id,
+        current_user.id,
+        action=PdfJobAction.send_email,
+        payload=payload
     )
     
-    return {"message": "Email sent successfully"}
+    return {"message": "Email queued", "job_id": job.id, "status": job.status.value}
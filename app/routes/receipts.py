@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from typing import List
+from sqlalchemy import func, extract, tuple_
+from typing import List, Optional, Union
 from datetime import datetime
 
 from app.database import get_db
-from app.models import PaymentReceipt, ReceiptStatus, User, Customer, Invoice
+from app.models import PaymentReceipt, ReceiptStatus, PaymentMethod, User, Customer, Invoice
 from app.models.customer import CustomerStatus
 from app.models.invoice import ContextType
 from app.models.project import Milestone, MilestoneStatus
-from app.schemas import ReceiptCreate, ReceiptUpdate, ReceiptResponse, CancelRequest
+from app.schemas import (
+    ReceiptCreate, ReceiptUpdate, ReceiptResponse, CancelRequest, Page, ReceiptSummary, ListView
+)
 from app.auth import get_current_user
 from app.services.validation import (
     validate_document_context,
@@ -18,6 +20,12 @@ from app.services.validation import (
     validate_document_immutability
 )
 from app.services.audit import log_action
+from app.services.numbering import generate_receipt_number
+from app.services.rollups import record_receipt_issued, record_receipt_cancelled
+from app.services.pagination import decode_cursor, paginate
+from app.services.pdf_jobs import enqueue_pdf_job
+from app.services.pdf_cache import lookup_cached_pdf, record_pdf_request
+from app.services.pdf_delivery import pdf_download_response
 
 router = APIRouter()
 
@@ -48,34 +56,42 @@ def update_milestone_status(db: Session, milestone_id: int, payment_date: dateti
             milestone.paid_date = payment_date
 
 
-def generate_receipt_number(db: Session) -> str:
-    """Generate year-based receipt number: REC-YYYY-NNNNNN"""
-    current_year = datetime.utcnow().year
-    
-    last_receipt = db.query(PaymentReceipt).filter(
-        PaymentReceipt.receipt_number.like(f"REC-{current_year}-%")
-    ).order_by(PaymentReceipt.receipt_number.desc()).first()
-    
-    if last_receipt:
-        last_number = int(last_receipt.receipt_number.split("-")[-1])
-        new_number = last_number + 1
-    else:
-        new_number = 1
-    
-    return f"REC-{current_year}-{new_number:06d}"
+# created_at is not shown in the summary but is part of the cursor key
+SUMMARY_COLUMNS = (
+    PaymentReceipt.id,
+    PaymentReceipt.receipt_number,
+    PaymentReceipt.client_name,
+    PaymentReceipt.company_name,
+    PaymentReceipt.status,
+    PaymentReceipt.amount,
+    PaymentReceipt.receipt_date,
+    PaymentReceipt.created_at,
+)
 
 
-@router.get("/", response_model=List[ReceiptResponse])
+@router.get("/", response_model=Union[Page[ReceiptResponse], Page[ReceiptSummary]])
 async def get_receipts(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
     status: ReceiptStatus = None,
     customer_id: int = None,
+    project_id: int = None,
+    milestone_id: int = None,
+    payment_method: PaymentMethod = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    view: ListView = ListView.full,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all payment receipts with optional filtering."""
-    query = db.query(PaymentReceipt)
+    """
+    Get payment receipts newest first, paginated by a (created_at, id) cursor, with optional filtering.
+    view=summary selects only the columns the list screen shows.
+    """
+    if view == ListView.summary:
+        query = db.query(*SUMMARY_COLUMNS)
+    else:
+        query = db.query(PaymentReceipt)
     
     if status:
         query = query.filter(PaymentReceipt.status == status)
@@ -83,8 +99,34 @@ async def get_receipts(
     if customer_id:
         query = query.filter(PaymentReceipt.customer_id == customer_id)
     
-    receipts = query.order_by(PaymentReceipt.created_at.desc()).offset(skip).limit(limit).all()
-    return receipts
+    if project_id:
+        query = query.filter(PaymentReceipt.project_id == project_id)
+    
+    if milestone_id:
+        query = query.filter(PaymentReceipt.milestone_id == milestone_id)
+    
+    if payment_method:
+        query = query.filter(PaymentReceipt.payment_method == payment_method)
+    
+    if date_from:
+        query = query.filter(PaymentReceipt.receipt_date >= date_from)
+    
+    if date_to:
+        query = query.filter(PaymentReceipt.receipt_date <= date_to)
+    
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, datetime, int)
+        query = query.filter(
+            tuple_(PaymentReceipt.created_at, PaymentReceipt.id) < tuple_(last_created_at, last_id)
+        )
+    
+    receipts = query.order_by(
+        PaymentReceipt.created_at.desc(), PaymentReceipt.id.desc()
+    ).limit(limit + 1).all()
+    if view == ListView.summary:
+        receipts = [row._asdict() for row in receipts]
+        return paginate(receipts, limit, key=lambda row: (row["created_at"], row["id"]))
+    return paginate(receipts, limit, key=lambda receipt: (receipt.created_at, receipt.id))
 
 
 @router.get("/{receipt_id}", response_model=ReceiptResponse)
@@ -148,8 +190,7 @@ async def create_receipt(
         receipt.client_tax_id = receipt_data.client_tax_id
     
     db.add(receipt)
-    db.commit()
-    db.refresh(receipt)
+    db.flush()
     
     log_action(
         db,
@@ -162,6 +203,9 @@ async def create_receipt(
         description=f"Created payment receipt {receipt.receipt_number}"
     )
     
+    db.commit()
+    db.refresh(receipt)
+    
     return receipt
 
 
@@ -205,9 +249,6 @@ async def update_receipt(
         if field in update_data:
             setattr(receipt, field, update_data[field])
     
-    db.commit()
-    db.refresh(receipt)
-    
     log_action(
         db,
         action="update",
@@ -219,17 +260,21 @@ async def update_receipt(
         description=f"Updated payment receipt {receipt.receipt_number}"
     )
     
+    db.commit()
+    db.refresh(receipt)
+    
     return receipt
 
 
 @router.post("/{receipt_id}/issue", response_model=ReceiptResponse)
-async def issue_receipt(
+def issue_receipt(
     receipt_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Issue a payment receipt (makes it immutable)."""
-    receipt = db.query(PaymentReceipt).filter(PaymentReceipt.id == receipt_id).first()
+    # Row lock: concurrent status changes must not both update the rollups
+    receipt = db.query(PaymentReceipt).filter(PaymentReceipt.id == receipt_id).with_for_update().first()
     if not receipt:
         raise HTTPException(status_code=404, detail="Receipt not found")
     
@@ -246,15 +291,15 @@ async def issue_receipt(
     receipt.issued_at = datetime.utcnow()
     receipt.issued_by = current_user.id
     
+    record_receipt_issued(db, receipt)
+    
     milestone_id = receipt.milestone_id
     payment_date = receipt.receipt_date or datetime.utcnow()
     
-    db.commit()
-    db.refresh(receipt)
-    
     if milestone_id:
+        # The session does not autoflush: write the new status before summing receipts
+        db.flush()
         update_milestone_status(db, milestone_id, payment_date)
-        db.commit()
     
     log_action(
         db,
@@ -267,36 +312,70 @@ async def issue_receipt(
         description=f"Issued payment receipt {receipt.receipt_number}"
     )
     
+    db.commit()
+    db.refresh(receipt)
+    
+    # Issued content is final: render it now so send-email and downloads find it ready
+    enqueue_pdf_job(db, "receipt", receipt.id, current_user.id)
+    
     return receipt
 
 
-@router.post("/{receipt_id}/generate-pdf")
-async def generate_receipt_pdf_endpoint(
+@router.post("/{receipt_id}/generate-pdf", status_code=202)
+def generate_receipt_pdf_endpoint(
     receipt_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Generate a PDF for a payment receipt."""
-    from app.utils.pdf_generator import generate_receipt_pdf
-    
+    """Queue a PDF render for a payment receipt; poll GET /api/pdf-jobs/{job_id} for the pdf_url."""
     receipt = db.query(PaymentReceipt).filter(PaymentReceipt.id == receipt_id).first()
     if not receipt:
         raise HTTPException(status_code=404, detail="Receipt not found")
     
-    pdf_url = generate_receipt_pdf(receipt, db)
+    pdf_url = lookup_cached_pdf(db, "receipt", receipt)
+    record_pdf_request("receipt", ready=bool(pdf_url))
+    if pdf_url:
+        receipt.pdf_url = pdf_url
+        db.commit()
+        response.status_code = 200
+        return {"message": "PDF retrieved successfully", "pdf_url": pdf_url}
+    
+    job = enqueue_pdf_job(db, "receipt", receipt.id, current_user.id)
+    
+    return {"message": "PDF generation queued", "job_id": job.id, "status": job.status.value}
+
+
+@router.get("/{receipt_id}/pdf")
+def download_receipt_pdf(
+    receipt_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    persist: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Render the receipt in memory and stream it back; persist=true also stores it in the background.
+    A plain def so the render runs in the threadpool instead of blocking the event loop.
+    """
+    receipt = db.query(PaymentReceipt).filter(PaymentReceipt.id == receipt_id).first()
+    if not receipt:
+        raise HTTPException(status_code=404, detail="Receipt not found")
     
-    return {"pdf_url": pdf_url}
+    return pdf_download_response(db, "receipt", receipt, request, background_tasks, persist)
 
 
 @router.post("/{receipt_id}/cancel", response_model=ReceiptResponse)
-async def cancel_receipt(
+def cancel_receipt(
     receipt_id: int,
     cancel_request: CancelRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Cancel a payment receipt (void)."""
-    receipt = db.query(PaymentReceipt).filter(PaymentReceipt.id == receipt_id).first()
+    # Row lock: concurrent status changes must not both update the rollups
+    receipt = db.query(PaymentReceipt).filter(PaymentReceipt.id == receipt_id).with_for_update().first()
     if not receipt:
         raise HTTPException(status_code=404, detail="Receipt not found")
     
@@ -314,14 +393,14 @@ async def cancel_receipt(
     receipt.cancelled_by = current_user.id
     receipt.cancel_reason = cancel_request.reason
     
-    milestone_id = receipt.milestone_id
+    record_receipt_cancelled(db, receipt)
     
-    db.commit()
-    db.refresh(receipt)
+    milestone_id = receipt.milestone_id
     
     if milestone_id:
+        # The session does not autoflush: write the new status before summing receipts
+        db.flush()
         update_milestone_status(db, milestone_id)
-        db.commit()
     
     log_action(
         db,
@@ -334,6 +413,9 @@ async def cancel_receipt(
         description=f"Cancelled payment receipt {receipt.receipt_number}: {cancel_request.reason}"
     )
     
+    db.commit()
+    db.refresh(receipt)
+    
     return receipt
 
 
@@ -352,7 +434,6 @@ async def delete_receipt(
     
     receipt_number = receipt.receipt_number
     db.delete(receipt)
-    db.commit()
     
     log_action(
         db,
@@ -365,4 +446,6 @@ async def delete_receipt(
         description=f"Deleted draft payment receipt {receipt_number}"
     )
     
+    db.commit()
+    
     return {"message": "Receipt deleted successfully"}
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.models.reminder_run import ReminderRun
+from app.schemas import ReminderRunRequest, ReminderRunResponse
+from app.auth import get_current_user
+from app.services.reminders import start_reminder_run, delivery_progress
+
+router = APIRouter()
+
+@router.post("/overdue", response_model=ReminderRunResponse, status_code=status.HTTP_202_ACCEPTED)
+def send_overdue_reminders(
+    request: ReminderRunRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Start a payment-reminder run over all overdue invoices. With dry_run the
+    run only lists the reminders it would send. Poll GET /runs/{id} for progress.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can send payment reminders")
+    
+    return start_reminder_run(
+        db,
+        current_user.id,
+        dry_run=request.dry_run,
+        min_days_overdue=request.min_days_overdue,
+        message=request.message
+    )
+
+@router.get("/runs/{run_id}", response_model=ReminderRunResponse)
+def get_reminder_run(
+    run_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Progress of a reminder run, including outbox delivery counts."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    
+    run = db.query(ReminderRun).filter(ReminderRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reminder run not found")
+    
+    response = ReminderRunResponse.model_validate(run)
+    if not run.dry_run:
+        response.delivery = delivery_progress(db, run.id)
+    return response
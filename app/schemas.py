@@ -1,11 +1,24 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional, Generic, TypeVar
 from datetime import datetime
+import enum
 from app.models.user import UserRole
 from app.models.invoice import InvoiceStatus, ContextType
 from app.models.quote import QuoteStatus
 from app.models.project import ProjectStatus, MilestoneStatus, MilestoneType
 from app.models.receipt import ReceiptStatus, PaymentMethod
+from app.models.pdf_job import PdfJobStatus, PdfJobAction
+from app.models.reminder_run import ReminderRunStatus
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+class ListView(str, enum.Enum):
+    full = "full"
+    summary = "summary"
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -154,6 +167,15 @@ class InvoiceResponse(InvoiceBase):
     class Config:
         from_attributes = True
 
+class InvoiceSummary(BaseModel):
+    id: int
+    invoice_number: str
+    client_name: Optional[str] = None
+    company_name: Optional[str] = None
+    status: InvoiceStatus
+    total: float
+    issue_date: Optional[datetime] = None
+
 class CancelRequest(BaseModel):
     reason: str
 
@@ -223,6 +245,15 @@ class QuoteResponse(QuoteBase):
     class Config:
         from_attributes = True
 
+class QuoteSummary(BaseModel):
+    id: int
+    quote_number: str
+    client_name: Optional[str] = None
+    company_name: Optional[str] = None
+    status: QuoteStatus
+    total: float
+    issue_date: Optional[datetime] = None
+
 class EmailRequest(BaseModel):
     recipient_email: EmailStr
     subject: str
@@ -238,6 +269,8 @@ class EmailLogResponse(BaseModel):
     message: str
     pdf_url: Optional[str] = None
     sent_at: datetime
+    delivery_status: str
+    delivery_error: Optional[str] = None
     user_id: Optional[int] = None
     customer_id: Optional[int] = None
     telephone1: Optional[str] = None
@@ -390,6 +423,15 @@ class ReceiptResponse(ReceiptBase):
     class Config:
         from_attributes = True
 
+class ReceiptSummary(BaseModel):
+    id: int
+    receipt_number: str
+    client_name: Optional[str] = None
+    company_name: Optional[str] = None
+    status: ReceiptStatus
+    amount: float
+    receipt_date: Optional[datetime] = None
+
 class AuditLogResponse(BaseModel):
     id: int
     user_id: Optional[int] = None
@@ -407,3 +449,58 @@ class AuditLogResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class PdfJobResponse(BaseModel):
+    id: int
+    document_type: str
+    document_id: int
+    action: PdfJobAction
+    status: PdfJobStatus
+    pdf_url: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class PdfCacheStats(BaseModel):
+    document_type: str
+    hits: int
+    misses: int
+    hit_rate: float
+    entries: int
+    avg_size_bytes: Optional[int] = None
+    stored_bytes: int
+    served_ready: int
+    rendered_on_request: int
+    on_request_rate: float
+
+class ReminderRunRequest(BaseModel):
+    dry_run: bool = False
+    min_days_overdue: int = Field(0, ge=0)
+    message: Optional[str] = None
+
+class ReminderRunResponse(BaseModel):
+    id: int
+    status: ReminderRunStatus
+    dry_run: bool
+    as_of: datetime
+    min_days_overdue: int
+    message: Optional[str] = None
+    total: int
+    rendered: int
+    queued_emails: int
+    skipped: int
+    failed: int
+    preview: Optional[List[dict]] = None
+    errors: Optional[List[str]] = None
+    error: Optional[str] = None
+    delivery: Optional[dict] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -24,6 +24,9 @@ def log_action(
     """
     Log an action to the audit trail.
     
+    The entry is added to the caller's session and committed with the change
+    it records, so the caller must commit afterwards.
+    
     Actions: login, logout, create, update, delete, issue, cancel, send_email, generate_pdf, convert
     """
     audit_entry = AuditLog(
@@ -42,6 +45,5 @@ def log_action(
     )
     
     db.add(audit_entry)
-    db.commit()
     
     return audit_entry
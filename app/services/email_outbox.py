@@ -0,0 +1,319 @@
+"""
+Outbound email queue.
+
+Sending a document email writes an email_logs row (delivery_status=queued)
+and an email_outbox row holding the rendered message, and returns. A
+dispatcher thread in the web process claims due messages in batches with
+SELECT ... FOR UPDATE SKIP LOCKED (so several server processes can run one
+each), sends them through the configured transport on a bounded thread pool,
+and records the outcome on both rows. Failed sends are retried with
+exponential backoff until EMAIL_MAX_ATTEMPTS; the log is then marked failed.
+The document PDF is attached at send time from load_pdf_bytes, which serves
+recently stored PDFs from memory before going to the storage backend.
+"""
+
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.customer import Customer
+from app.models.email_log import EmailLog, EmailType, EmailDeliveryStatus
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.services.audit import log_action
+from app.utils.email_sender import OutgoingEmail, EmailDeliveryError, invoice_email, quote_email, get_email_transport
+from app.utils.pdf_generator import load_pdf_bytes
+
+logger = logging.getLogger(__name__)
+
+EMAIL_BUILDERS = {
+    "invoice": (EmailType.invoice, "invoice_number", invoice_email),
+    "quote": (EmailType.quote, "quote_number", quote_email),
+}
+
+# Seconds between polls when nothing woke the dispatcher
+POLL_INTERVAL = 5
+RETRY_BASE = timedelta(seconds=30)
+RETRY_MAX = timedelta(hours=1)
+# A message still "sending" after this belongs to a dispatcher that died
+STALE_SENDING_AFTER = timedelta(minutes=10)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter: ~30s, 1m, 2m, 4m ... capped at an hour."""
+    delay = min(RETRY_BASE * (2 ** (attempts - 1)), RETRY_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def queue_email(
+    db: Session,
+    log: EmailLog,
+    email: OutgoingEmail,
+    attachment_url: str = None,
+    attachment_name: str = None
+) -> EmailLog:
+    """
+    Persist the log and its outbox message, then wake the dispatcher. The PDF
+    at attachment_url is attached when the message is sent. Commits the session.
+    """
+    log.delivery_status = EmailDeliveryStatus.queued
+    db.add(log)
+    db.flush()
+
+    db.add(EmailOutbox(
+        email_log_id=log.id,
+        sender_email=email.sender_email,
+        sender_name=email.sender_name,
+        recipient_email=email.recipient_email,
+        recipient_name=email.recipient_name,
+        subject=email.subject,
+        html_content=email.html_content,
+        attachment_url=attachment_url,
+        attachment_name=attachment_name,
+        status=OutboxStatus.pending,
+        next_attempt_at=datetime.utcnow()
+    ))
+    db.commit()
+    db.refresh(log)
+
+    wake_email_dispatcher()
+    return log
+
+
+def queue_document_email(db: Session, document_type: str, document, payload: dict, user_id: int = None) -> EmailLog:
+    """
+    Queue the invoice or quote email described by payload (recipient_email,
+    subject, message, username). The document must already have a pdf_url.
+    The audit entry is committed together with the queued message.
+    """
+    if document_type not in EMAIL_BUILDERS:
+        raise ValueError(f"Emailing {document_type} documents is not supported")
+
+    email_type, number_field, build_email = EMAIL_BUILDERS[document_type]
+    document_number = getattr(document, number_field)
+    recipient_email = payload["recipient_email"]
+    message = payload.get("message") or ""
+
+    log_action(
+        db,
+        action="send_email",
+        user_id=user_id,
+        username=payload.get("username"),
+        entity_type=document_type,
+        entity_id=document.id,
+        entity_number=document_number,
+        description=f"Queued {document_type} {document_number} email to {recipient_email}"
+    )
+
+    customer = None
+    if document.telephone1:
+        customer = db.query(Customer).filter(Customer.telephone1 == document.telephone1).first()
+
+    return queue_email(db, EmailLog(
+        email_type=email_type,
+        document_id=document.id,
+        document_number=document_number,
+        recipient_email=recipient_email,
+        subject=payload.get("subject") or "",
+        message=message,
+        pdf_url=document.pdf_url,
+        user_id=user_id,
+        customer_id=customer.id if customer else None,
+        telephone1=document.telephone1,
+        client_name=document.client_name,
+        company_name=document.company_name,
+        total_amount=document.total
+    ), build_email(document, recipient_email, message), document.pdf_url, f"{document_number}.pdf")
+
+
+def _claim_batch(limit: int) -> list:
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        rows = db.query(EmailOutbox).filter(
+            or_(
+                (EmailOutbox.status == OutboxStatus.pending) & (EmailOutbox.next_attempt_at <= now),
+                (EmailOutbox.status == OutboxStatus.sending) & (EmailOutbox.claimed_at < now - STALE_SENDING_AFTER)
+            )
+        ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(limit).with_for_update(skip_locked=True).all()
+
+        for row in rows:
+            row.status = OutboxStatus.sending
+            row.claimed_at = now
+        db.commit()
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
+def deliver(outbox_id: int, transport=None):
+    """Send one claimed message and record the outcome on the outbox row and its log."""
+    transport = transport or get_email_transport()
+    db = SessionLocal()
+    try:
+        item = db.query(EmailOutbox).filter(EmailOutbox.id == outbox_id).first()
+        if item is None or item.status != OutboxStatus.sending:
+            return
+
+        error, retryable, provider_message_id = None, True, None
+        try:
+            attachments = ()
+            if item.attachment_url:
+                data = load_pdf_bytes(item.attachment_url)
+                if data is None:
+                    raise EmailDeliveryError(f"Attachment {item.attachment_url} not found", retryable=False)
+                attachments = ((item.attachment_name or "document.pdf", data),)
+
+            provider_message_id = transport.send(OutgoingEmail(
+                sender_email=item.sender_email,
+                sender_name=item.sender_name,
+                recipient_email=item.recipient_email,
+                recipient_name=item.recipient_name,
+                subject=item.subject,
+                html_content=item.html_content,
+                attachments=attachments
+            ))
+        except EmailDeliveryError as e:
+            error, retryable = str(e), e.retryable
+        except Exception as e:
+            error = str(e)
+
+        now = datetime.utcnow()
+        item.attempts += 1
+        log = db.query(EmailLog).filter(EmailLog.id == item.email_log_id).first() if item.email_log_id else None
+
+        if error is None:
+            item.status = OutboxStatus.sent
+            item.sent_at = now
+            item.provider_message_id = provider_message_id
+            item.last_error = None
+            if log:
+                log.delivery_status = EmailDeliveryStatus.sent
+                log.delivery_error = None
+                log.sent_at = now
+        elif retryable and item.attempts < settings.email_max_attempts:
+            item.status = OutboxStatus.pending
+            item.next_attempt_at = now + retry_delay(item.attempts)
+            item.last_error = error
+            if log:
+                log.delivery_error = error
+        else:
+            item.status = OutboxStatus.failed
+            item.last_error = error
+            if log:
+                log.delivery_status = EmailDeliveryStatus.failed
+                log.delivery_error = error
+        db.commit()
+    finally:
+        db.close()
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second (bursts up to `rate`); 0 disables it."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._capacity = max(rate, 1)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class EmailDispatcher:
+    """
+    Background thread draining email_outbox with at most `concurrency` sends
+    in flight and no more than EMAIL_RATE_PER_SECOND sends started per second.
+    """
+
+    def __init__(self, transport=None, concurrency: int = None, batch_size: int = None, rate: float = None):
+        self.transport = transport or get_email_transport()
+        self.batch_size = batch_size or settings.email_batch_size
+        self._limiter = RateLimiter(settings.email_rate_per_second if rate is None else rate)
+        self._pool = ThreadPoolExecutor(
+            max_workers=concurrency or settings.email_concurrency,
+            thread_name_prefix="email-send"
+        )
+        self._wake = Event()
+        self._stop = Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = Thread(target=self._run, name="email-dispatcher", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._pool.shutdown(wait=True)
+
+    def dispatch_once(self) -> int:
+        """Claim one batch of due messages and send them. Returns the number claimed."""
+        outbox_ids = _claim_batch(self.batch_size)
+        futures = []
+        for outbox_id in outbox_ids:
+            self._limiter.acquire()
+            futures.append(self._pool.submit(deliver, outbox_id, self.transport))
+        wait(futures)
+        return len(outbox_ids)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.dispatch_once()
+            except Exception:
+                logger.exception("Email dispatcher failed to process a batch")
+                claimed = 0
+            # A full batch means more may be due; otherwise sleep until woken or the next poll
+            if claimed < self.batch_size:
+                self._wake.wait(POLL_INTERVAL)
+                self._wake.clear()
+
+
+_dispatcher = None
+
+
+def start_email_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = EmailDispatcher()
+        _dispatcher.start()
+
+
+def stop_email_dispatcher():
+    """Stop after in-flight sends finish; unsent messages stay in the outbox."""
+    global _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.stop()
+        _dispatcher = None
+
+
+def wake_email_dispatcher():
+    # No-op in processes without a dispatcher (PDF workers); the web process polls
+    if _dispatcher is not None:
+        _dispatcher.wake()
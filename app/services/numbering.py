@@ -0,0 +1,105 @@
+"""
+Document number allocation.
+
+Numbers have the form PREFIX-YYYY-NNNNNN and are handed out from the
+document_sequences table, one row per (doc type, year). Each allocation is a
+single UPDATE ... RETURNING that increments the row in place, so it costs the
+same however many documents exist. The row stays locked until the caller's
+transaction ends: concurrent creates queue up behind it instead of reading the
+same "last" number, and a rolled-back create gives its number back, which keeps
+the sequence gap-free.
+
+Callers must allocate inside the transaction that inserts the document and
+commit (or roll back) promptly.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import func, update
+from datetime import datetime
+
+from app.models.document_sequence import DocumentSequence, DocumentType
+from app.models.invoice import Invoice
+from app.models.quote import Quote
+from app.models.receipt import PaymentReceipt
+from app.models.project import Project
+
+PREFIXES = {
+    DocumentType.invoice: "INV",
+    DocumentType.quote: "QUO",
+    DocumentType.receipt: "REC",
+    DocumentType.project: "PRJ",
+}
+
+NUMBER_COLUMNS = {
+    DocumentType.invoice: Invoice.invoice_number,
+    DocumentType.quote: Quote.quote_number,
+    DocumentType.receipt: PaymentReceipt.receipt_number,
+    DocumentType.project: Project.project_code,
+}
+
+
+def _existing_max(db: Session, doc_type: DocumentType, year: int) -> int:
+    """
+    Highest number already used for doc_type/year. Only runs the first time a
+    (doc type, year) row is created, so sequences pick up after existing data.
+    """
+    prefix = f"{PREFIXES[doc_type]}-{year}-"
+    column = NUMBER_COLUMNS[doc_type]
+    numbers = db.query(column).filter(column.like(f"{prefix}%")).all()
+    
+    highest = 0
+    for (number,) in numbers:
+        try:
+            highest = max(highest, int(number.split("-")[-1]))
+        except (ValueError, IndexError):
+            continue
+    return highest
+
+
+def next_value(db: Session, doc_type: DocumentType, year: int) -> int:
+    """Atomically allocate the next number for doc_type/year. Does not commit."""
+    increment = update(DocumentSequence).where(
+        DocumentSequence.doc_type == doc_type.value,
+        DocumentSequence.year == year
+    ).values(
+        last_value=DocumentSequence.last_value + 1,
+        updated_at=datetime.utcnow()
+    ).returning(DocumentSequence.last_value).execution_options(synchronize_session=False)
+    
+    value = db.execute(increment).scalar()
+    if value is None:
+        seed = insert(DocumentSequence).values(
+            doc_type=doc_type.value,
+            year=year,
+            last_value=_existing_max(db, doc_type, year)
+        ).on_conflict_do_nothing(index_elements=["doc_type", "year"])
+        db.execute(seed)
+        value = db.execute(increment).scalar()
+    return value
+
+
+def allocate_number(db: Session, doc_type: DocumentType, year: int = None) -> str:
+    """Allocate the next PREFIX-YYYY-NNNNNN number for doc_type."""
+    year = year or datetime.utcnow().year
+    return f"{PREFIXES[doc_type]}-{year}-{next_value(db, doc_type, year):06d}"
+
+
+def generate_invoice_number(db: Session) -> str:
+    """Generate year-based invoice number: INV-YYYY-NNNNNN"""
+    return allocate_number(db, DocumentType.invoice)
+
+
+def generate_quote_number(db: Session) -> str:
+    """Generate year-based quote number: QUO-YYYY-NNNNNN"""
+    return allocate_number(db, DocumentType.quote)
+
+
+def generate_receipt_number(db: Session) -> str:
+    """Generate year-based receipt number: REC-YYYY-NNNNNN"""
+    return allocate_number(db, DocumentType.receipt)
+
+
+def generate_project_code(db: Session) -> str:
+    """Generate year-based project code: PRJ-YYYY-NNNNNN"""
+    return allocate_number(db, DocumentType.project)
@@ -0,0 +1,50 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+A cursor is an opaque URL-safe token wrapping the sort key of the last row of
+the previous page, e.g. [id] or [created_at, id]. Pages are fetched with
+WHERE (key) < (cursor) ORDER BY key DESC LIMIT n, so every page costs the
+same regardless of how deep the client has paged.
+"""
+
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row into an opaque cursor token."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> list:
+    """
+    Decode a cursor produced by encode_cursor.
+    types gives the expected type of each key part (int, str or datetime).
+    Raises HTTPException 400 if the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor has wrong shape")
+        return [
+            datetime.fromisoformat(value) if expected is datetime else expected(value)
+            for value, expected in zip(values, types)
+        ]
+    except (ValueError, TypeError, UnicodeError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate(rows: list, limit: int, key) -> dict:
+    """
+    Split a result fetched with LIMIT limit + 1 into a page.
+    key(row) returns the tuple of sort values used to build the next cursor.
+    """
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = encode_cursor(*key(items[-1])) if has_more and items else None
+    return {"items": items, "next_cursor": next_cursor}
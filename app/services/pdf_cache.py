@@ -0,0 +1,478 @@
+"""
+Content-addressed PDF cache.
+
+A PDF is fully determined by the document fields the templates print plus the
+template version. Those fields are hashed; the hash names the stored file
+(<kind>_<number>_<hash>.pdf) and keys a pdf_cache_entries row pointing at it.
+Rendering the same content again - re-opening an unchanged draft, reverting an
+edit, re-issuing a request after pdf_url was cleared - returns the stored file
+instead of running ReportLab. Hit/miss totals per document type are kept in
+pdf_cache_counters.
+
+Only the latest render of each document is kept: storing a new hash deletes
+the entries and files of the document's earlier content, except a file still
+waiting to go out as an email attachment.
+
+Renders of the same content are single-flight: threads in one process share a
+single in-flight render, and a Postgres advisory lock on the hash makes other
+processes wait and then pick the stored file up from the cache.
+
+Counters are kept in memory and added to pdf_cache_counters (and the entries'
+hit_count) by a background thread every COUNTER_FLUSH_SECONDS and at process
+exit, so cache hits never write to the database and the per-type counter rows
+are not contended.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import Future
+from datetime import datetime
+from threading import Lock, Thread
+
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import bindparam, func, text
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.pdf_cache import PdfCacheEntry, PdfCacheCounter
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.models.invoice import Invoice
+from app.models.quote import Quote
+from app.models.receipt import PaymentReceipt
+from app.utils.pdf_generator import (
+    TEMPLATE_VERSION, build_invoice_pdf, build_quote_pdf, build_receipt_pdf, store_pdf_bytes, delete_pdf_bytes
+)
+from app.utils.storage import local_path
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_MODELS = {
+    "invoice": Invoice,
+    "quote": Quote,
+    "receipt": PaymentReceipt,
+}
+
+BUILDERS = {
+    "invoice": build_invoice_pdf,
+    "quote": build_quote_pdf,
+    "receipt": build_receipt_pdf,
+}
+
+NUMBER_FIELDS = {
+    "invoice": "invoice_number",
+    "quote": "quote_number",
+    "receipt": "receipt_number",
+}
+
+CLIENT_FIELDS = (
+    "client_name", "company_name", "client_email", "telephone1", "telephone2",
+    "client_address", "client_reg_no", "client_tax_id",
+)
+
+
+def _line_items(document) -> list:
+    return [
+        [item.description, item.quantity, item.unit_price, getattr(item, "discount", None), item.total]
+        for item in document.line_items
+    ]
+
+
+def _invoice_fields(invoice) -> dict:
+    return {
+        "number": invoice.invoice_number,
+        "status": invoice.status.value,
+        "cancelled": invoice.cancelled_at is not None,
+        "issue_date": invoice.issue_date,
+        "source_quote_number": invoice.source_quote_number,
+        "client": [getattr(invoice, field) for field in CLIENT_FIELDS],
+        "line_items": _line_items(invoice),
+        "totals": [invoice.subtotal, invoice.discount, invoice.tax, invoice.total],
+        "notes": invoice.notes,
+    }
+
+
+def _quote_fields(quote) -> dict:
+    return {
+        "number": quote.quote_number,
+        "status": quote.status.value,
+        "cancelled": quote.cancelled_at is not None,
+        "issue_date": quote.issue_date,
+        "valid_until": quote.valid_until,
+        "client": [getattr(quote, field) for field in CLIENT_FIELDS],
+        "line_items": _line_items(quote),
+        "totals": [quote.subtotal, quote.discount, quote.tax, quote.total],
+        "notes": quote.notes,
+    }
+
+
+def _receipt_fields(receipt) -> dict:
+    return {
+        "number": receipt.receipt_number,
+        "status": receipt.status.value,
+        "receipt_date": receipt.receipt_date,
+        "payment_method": receipt.payment_method,
+        "payment_reference": receipt.payment_reference,
+        "client": [receipt.client_name, receipt.company_name, receipt.telephone1],
+        "invoice_id": receipt.invoice_id,
+        "amount": receipt.amount,
+        "notes": receipt.notes,
+    }
+
+
+FIELD_EXTRACTORS = {
+    "invoice": _invoice_fields,
+    "quote": _quote_fields,
+    "receipt": _receipt_fields,
+}
+
+
+def content_hash(document_type: str, document) -> str:
+    """sha256 of the printed fields of a document and the template version."""
+    fields = FIELD_EXTRACTORS[document_type](document)
+    fields["document_type"] = document_type
+    fields["template_version"] = TEMPLATE_VERSION
+    fields["compact"] = settings.pdf_compact
+    raw = json.dumps(fields, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Concurrent calls with the same key run fn once and all get its result."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+
+    def do(self, key, fn) -> tuple:
+        """Return (result, shared); shared is True for callers that waited on another's call."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+# Keys are ("url", digest) for stored renders and ("bytes", digest) for
+# in-memory ones, so callers never receive the other kind of result
+pdf_renders = SingleFlight()
+
+
+def lock_render(db: Session, digest: str):
+    """Block other processes rendering the same content until this transaction ends."""
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": int(digest[:15], 16)})
+
+
+# How often buffered counters are written to the database
+COUNTER_FLUSH_SECONDS = 10
+
+COUNTER_FIELDS = ("hits", "misses", "served_ready", "rendered_on_request")
+
+
+class PdfCounters:
+    """Counter deltas buffered in this process until the next flush."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._types = {}
+        self._entry_hits = Counter()
+        self._last_hit_at = {}
+        self._thread = None
+
+    def add(self, document_type: str, **deltas):
+        with self._lock:
+            self._types.setdefault(document_type, Counter()).update(deltas)
+            self._start()
+
+    def hit_entry(self, digest: str):
+        with self._lock:
+            self._entry_hits[digest] += 1
+            self._last_hit_at[digest] = datetime.utcnow()
+            self._start()
+
+    def _start(self):
+        # Started on first use so worker processes flush their own counts
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="pdf-counters", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(COUNTER_FLUSH_SECONDS)
+            self.flush()
+
+    def _take(self):
+        with self._lock:
+            pending = (self._types, self._entry_hits, self._last_hit_at)
+            self._types, self._entry_hits, self._last_hit_at = {}, Counter(), {}
+        return pending
+
+    def _restore(self, types: dict, entry_hits: Counter, last_hit_at: dict):
+        with self._lock:
+            for document_type, deltas in types.items():
+                self._types.setdefault(document_type, Counter()).update(deltas)
+            self._entry_hits.update(entry_hits)
+            for digest, hit_at in last_hit_at.items():
+                self._last_hit_at[digest] = max(hit_at, self._last_hit_at.get(digest, hit_at))
+
+    def flush(self):
+        """Write the buffered deltas; on failure they are kept for the next flush."""
+        types, entry_hits, last_hit_at = self._take()
+        if not types and not entry_hits:
+            return
+        db = SessionLocal()
+        try:
+            for document_type, deltas in sorted(types.items()):
+                _add_counts(db, document_type, deltas)
+            if entry_hits:
+                entries = PdfCacheEntry.__table__
+                db.execute(
+                    entries.update().where(entries.c.content_hash == bindparam("digest")).values(
+                        hit_count=entries.c.hit_count + bindparam("hits"),
+                        last_hit_at=bindparam("hit_at")
+                    ),
+                    [
+                        {"digest": digest, "hits": hits, "hit_at": last_hit_at[digest]}
+                        for digest, hits in sorted(entry_hits.items())
+                    ]
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._restore(types, entry_hits, last_hit_at)
+            logger.exception("Could not write PDF cache counters")
+        finally:
+            db.close()
+
+
+def _add_counts(db: Session, document_type: str, deltas: Counter):
+    values = {field: deltas.get(field, 0) for field in COUNTER_FIELDS}
+    stmt = insert(PdfCacheCounter).values(
+        document_type=document_type,
+        updated_at=datetime.utcnow(),
+        **values
+    )
+    set_ = {field: getattr(PdfCacheCounter, field) + getattr(stmt.excluded, field) for field in COUNTER_FIELDS}
+    set_["updated_at"] = stmt.excluded.updated_at
+    db.execute(stmt.on_conflict_do_update(index_elements=["document_type"], set_=set_))
+
+
+pdf_counters = PdfCounters()
+atexit.register(pdf_counters.flush)
+
+
+def flush_pdf_counters():
+    """Write this process's buffered counters now."""
+    pdf_counters.flush()
+
+
+def _file_missing(pdf_url: str) -> bool:
+    """Locally stored PDFs can be cleaned up from disk; treat those as misses."""
+    path = local_path(pdf_url)
+    return path is not None and not os.path.exists(path)
+
+
+def lookup_cached_pdf(db: Session, document_type: str, document, digest: str = None, count: bool = True) -> str:
+    """
+    Return the stored pdf_url for the document's current content, or None.
+    A hit is counted here unless count is False (callers that may still fall
+    back to rendering count it with count_hit); misses are counted when the
+    render is stored. Does not commit.
+    """
+    digest = digest or content_hash(document_type, document)
+    entry = db.query(PdfCacheEntry).filter(PdfCacheEntry.content_hash == digest).first()
+    if entry is None:
+        return None
+    if _file_missing(entry.pdf_url):
+        db.delete(entry)
+        return None
+
+    pdf_counters.hit_entry(digest)
+    if count:
+        pdf_counters.add(document_type, hits=1)
+    return entry.pdf_url
+
+
+def cache_filename(document_type: str, document, digest: str) -> str:
+    number = getattr(document, NUMBER_FIELDS[document_type])
+    return f"{document_type}_{number}_{digest[:16]}.pdf"
+
+
+def count_hit(document_type: str):
+    """Count a render served from the cache."""
+    pdf_counters.add(document_type, hits=1)
+
+
+def count_miss(document_type: str):
+    """Count a render that could not be served from the cache."""
+    pdf_counters.add(document_type, misses=1)
+
+
+def record_pdf_request(document_type: str, ready: bool):
+    """
+    Count a user-facing PDF request as served from an already rendered PDF or
+    as having to wait for a render.
+    """
+    if ready:
+        pdf_counters.add(document_type, served_ready=1)
+    else:
+        pdf_counters.add(document_type, rendered_on_request=1)
+
+
+def remember_pdf(
+    db: Session,
+    document_type: str,
+    document_id: int,
+    digest: str,
+    pdf_url: str,
+    size_bytes: int = None
+) -> list:
+    """
+    Record a stored render under its content hash and drop the entries of the
+    document's earlier content. Returns the URLs of the dropped renders; pass
+    them to discard_pdfs once the transaction has committed. Does not commit.
+    """
+    stmt = insert(PdfCacheEntry).values(
+        content_hash=digest,
+        document_type=document_type,
+        document_id=document_id,
+        pdf_url=pdf_url,
+        size_bytes=size_bytes,
+        hit_count=0,
+        created_at=datetime.utcnow()
+    ).on_conflict_do_update(
+        index_elements=["content_hash"],
+        set_={"pdf_url": pdf_url, "size_bytes": size_bytes}
+    )
+    db.execute(stmt)
+
+    model = DOCUMENT_MODELS[document_type]
+    superseded = db.query(PdfCacheEntry).filter(
+        PdfCacheEntry.document_type == document_type,
+        PdfCacheEntry.document_id == document_id,
+        PdfCacheEntry.content_hash != digest,
+        # The document may already point at newer content than this render
+        PdfCacheEntry.pdf_url.notin_(
+            db.query(model.pdf_url).filter(model.id == document_id, model.pdf_url.isnot(None))
+        ),
+        ~db.query(EmailOutbox.id).filter(
+            EmailOutbox.attachment_url == PdfCacheEntry.pdf_url,
+            EmailOutbox.status.in_([OutboxStatus.pending, OutboxStatus.sending])
+        ).exists()
+    ).all()
+    for entry in superseded:
+        db.delete(entry)
+    return [entry.pdf_url for entry in superseded]
+
+
+def discard_pdfs(pdf_urls: list):
+    """Delete the files of superseded renders. Failures only leave an orphaned file behind."""
+    for pdf_url in pdf_urls:
+        try:
+            delete_pdf_bytes(pdf_url)
+        except Exception:
+            logger.exception("Could not delete superseded PDF %s", pdf_url)
+
+
+def attach_pdf(db: Session, document_type: str, document_id: int, digest: str, pdf_url: str):
+    """
+    Point the document at pdf_url if its content still hashes to digest, and
+    return it; returns None when it was edited or cancelled since the render.
+    Locks the document row until the caller commits.
+    """
+    model = DOCUMENT_MODELS[document_type]
+    document = db.query(model).filter(model.id == document_id).with_for_update().populate_existing().first()
+    if document is None or content_hash(document_type, document) != digest:
+        return None
+    document.pdf_url = pdf_url
+    return document
+
+
+def render_cached(db: Session, document_type: str, document) -> str:
+    """Return the PDF for the document's current content, rendering only on a miss. Commits."""
+    digest = content_hash(document_type, document)
+    pdf_url = lookup_cached_pdf(db, document_type, document, digest)
+    if pdf_url:
+        db.commit()
+        return pdf_url
+
+    def render() -> str:
+        lock_render(db, digest)
+        # Another process may have stored it while we waited for the lock
+        stored_url = lookup_cached_pdf(db, document_type, document, digest)
+        if stored_url:
+            db.commit()
+            return stored_url
+
+        data = BUILDERS[document_type](document, db)
+        stored_url = store_pdf_bytes(data, cache_filename(document_type, document, digest))
+
+        superseded = remember_pdf(db, document_type, document.id, digest, stored_url, len(data))
+        db.commit()
+        count_miss(document_type)
+        discard_pdfs(superseded)
+        return stored_url
+
+    pdf_url, _ = pdf_renders.do(("url", digest), render)
+    return pdf_url
+
+
+def get_cache_stats(db: Session) -> list:
+    """
+    Hit/miss counters, stored entries and their sizes, and ready/on-request
+    totals per document type. Other processes' counts can lag by up to
+    COUNTER_FLUSH_SECONDS.
+    """
+    flush_pdf_counters()
+    entries = {
+        row.document_type: row for row in db.query(
+            PdfCacheEntry.document_type,
+            func.count(PdfCacheEntry.content_hash).label("entries"),
+            func.avg(PdfCacheEntry.size_bytes).label("avg_size_bytes"),
+            func.coalesce(func.sum(PdfCacheEntry.size_bytes), 0).label("stored_bytes")
+        ).group_by(PdfCacheEntry.document_type).all()
+    }
+    counters = {row.document_type: row for row in db.query(PdfCacheCounter).all()}
+
+    stats = []
+    for document_type in BUILDERS:
+        counter = counters.get(document_type)
+        hits = counter.hits if counter else 0
+        misses = counter.misses if counter else 0
+        lookups = hits + misses
+        served_ready = counter.served_ready if counter else 0
+        rendered_on_request = counter.rendered_on_request if counter else 0
+        requests = served_ready + rendered_on_request
+        stored = entries.get(document_type)
+        stats.append({
+            "document_type": document_type,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": stored.entries if stored else 0,
+            "avg_size_bytes": round(stored.avg_size_bytes) if stored and stored.avg_size_bytes else None,
+            "stored_bytes": int(stored.stored_bytes) if stored else 0,
+            "served_ready": served_ready,
+            "rendered_on_request": rendered_on_request,
+            "on_request_rate": round(rendered_on_request / requests, 4) if requests else 0.0
+        })
+    return stats
@@ -0,0 +1,93 @@
+"""
+Direct PDF downloads.
+
+GET /api/{invoices|quotes|receipts}/{id}/pdf renders the document into a
+BytesIO and returns the bytes with Content-Length and an ETag (the content
+hash), so the hot path never writes to or re-reads from disk. If the render
+cache already holds this content, the stored copy is served instead. With
+persist=true the bytes are written to storage, and pdf_url updated, by a
+background task after the response has been sent.
+"""
+
+from fastapi import BackgroundTasks, Request
+from fastapi.responses import Response, FileResponse, RedirectResponse
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.services.pdf_cache import (
+    BUILDERS, NUMBER_FIELDS, pdf_renders,
+    content_hash, lookup_cached_pdf, cache_filename, count_miss, remember_pdf, record_pdf_request, attach_pdf,
+    discard_pdfs
+)
+from app.utils.pdf_generator import store_pdf_bytes
+from app.utils.storage import local_path
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def persist_pdf(document_type: str, document_id: int, digest: str, filename: str, data: bytes):
+    """Store already-rendered bytes and point the document at them (background task)."""
+    pdf_url = store_pdf_bytes(data, filename)
+
+    db = SessionLocal()
+    try:
+        superseded = remember_pdf(db, document_type, document_id, digest, pdf_url, len(data))
+        # Skipped if the document was edited while the bytes were being stored
+        attach_pdf(db, document_type, document_id, digest, pdf_url)
+        db.commit()
+        discard_pdfs(superseded)
+    finally:
+        db.close()
+
+
+def pdf_download_response(
+    db: Session,
+    document_type: str,
+    document,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    persist: bool = False
+) -> Response:
+    digest = content_hash(document_type, document)
+    etag = f'"{digest}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    number = getattr(document, NUMBER_FIELDS[document_type])
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'inline; filename="{number}.pdf"'
+    }
+
+    cached_url = lookup_cached_pdf(db, document_type, document, digest)
+    if cached_url:
+        record_pdf_request(document_type, ready=True)
+        db.commit()
+        path = local_path(cached_url)
+        if path:
+            return FileResponse(path, media_type="application/pdf", headers=headers)
+        return RedirectResponse(cached_url, status_code=307, headers={"ETag": etag})
+
+    # Simultaneous downloads of the same content (double clicks, several
+    # tabs) share one render
+    data, shared = pdf_renders.do(("bytes", digest), lambda: BUILDERS[document_type](document, db))
+    record_pdf_request(document_type, ready=False)
+    if not shared:
+        count_miss(document_type)
+    db.commit()
+
+    if persist and not shared:
+        background_tasks.add_task(
+            persist_pdf, document_type, document.id, digest,
+            cache_filename(document_type, document, digest), data
+        )
+
+    headers["Content-Length"] = str(len(data))
+    return Response(content=data, media_type="application/pdf", headers=headers)
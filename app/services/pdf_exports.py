@@ -0,0 +1,206 @@
+"""
+Bulk PDF export.
+
+Issued documents matching a filter are written into a ZIP that is streamed to
+the client as it is built. Each PDF comes from the render cache when it holds
+the document's current content; otherwise it is rendered and stored in the
+cache for next time. Exports use a process pool of their own (EXPORT_WORKERS,
+one per core by default), so a large export uses all cores without queueing
+ahead of the interactive PDF jobs in the PDF worker pool.
+Only a small window of PDFs is in flight at once, so memory stays bounded
+whatever the size of the export.
+"""
+
+import io
+import multiprocessing
+import zipfile
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from threading import Lock
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.quote import Quote, QuoteStatus
+from app.models.receipt import PaymentReceipt, ReceiptStatus
+from app.services.pdf_cache import (
+    DOCUMENT_MODELS, BUILDERS,
+    content_hash, lookup_cached_pdf, cache_filename, count_hit, count_miss, remember_pdf, lock_render, discard_pdfs
+)
+from app.utils.pdf_generator import store_pdf_bytes, load_pdf_bytes
+
+ExportDocument = namedtuple("ExportDocument", ["document_type", "document_id", "number"])
+
+EXPORT_SOURCES = {
+    "invoice": (Invoice, Invoice.invoice_number, Invoice.issue_date, [InvoiceStatus.issued]),
+    "quote": (Quote, Quote.quote_number, Quote.issue_date, [QuoteStatus.issued, QuoteStatus.invoiced]),
+    "receipt": (PaymentReceipt, PaymentReceipt.receipt_number, PaymentReceipt.receipt_date, [ReceiptStatus.issued]),
+}
+
+FOLDERS = {
+    "invoice": "invoices",
+    "quote": "quotes",
+    "receipt": "receipts",
+}
+
+# PDFs rendered or loaded ahead of the one being written into the ZIP
+EXPORT_WINDOW = 8
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_export_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: workers must not inherit the parent's DB connections or threads
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.export_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def shutdown_export_workers():
+    """Stop the export pool; unfinished exports are abandoned with their downloads."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def select_export_documents(
+    db: Session,
+    document_types: list,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    customer_id: int = None,
+    user_id: int = None
+) -> list:
+    """Issued documents matching the filter, ordered by type, then date and id."""
+    documents = []
+    for document_type in document_types:
+        model, number_col, date_col, statuses = EXPORT_SOURCES[document_type]
+        query = db.query(model.id, number_col).filter(model.status.in_(statuses))
+        if user_id is not None:
+            query = query.filter(model.user_id == user_id)
+        if customer_id:
+            query = query.filter(model.customer_id == customer_id)
+        if date_from:
+            query = query.filter(date_col >= date_from)
+        if date_to:
+            query = query.filter(date_col <= date_to)
+
+        documents.extend(
+            ExportDocument(document_type, document_id, number)
+            for document_id, number in query.order_by(date_col, model.id).all()
+        )
+    return documents
+
+
+def export_pdf_bytes(document_type: str, document_id: int) -> bytes:
+    """
+    Worker entry point: the PDF bytes for a document's current content, from
+    the cache when possible, otherwise rendered and added to the cache.
+    """
+    db = SessionLocal()
+    try:
+        model = DOCUMENT_MODELS[document_type]
+        document = db.query(model).filter(model.id == document_id).first()
+        if document is None:
+            raise ValueError(f"{document_type.capitalize()} {document_id} not found")
+
+        digest = content_hash(document_type, document)
+        pdf_url = lookup_cached_pdf(db, document_type, document, digest)
+        if pdf_url:
+            data = load_pdf_bytes(pdf_url)
+            if data is not None:
+                db.commit()
+                return data
+            db.rollback()
+
+        # Another worker may have stored it while we waited for the lock
+        lock_render(db, digest)
+        pdf_url = lookup_cached_pdf(db, document_type, document, digest, count=False)
+        data = load_pdf_bytes(pdf_url) if pdf_url else None
+        if data is not None:
+            db.commit()
+            count_hit(document_type)
+            return data
+
+        data = BUILDERS[document_type](document, db)
+        pdf_url = store_pdf_bytes(data, cache_filename(document_type, document, digest))
+        superseded = remember_pdf(db, document_type, document.id, digest, pdf_url, len(data))
+        db.commit()
+        count_miss(document_type)
+        discard_pdfs(superseded)
+        return data
+    finally:
+        db.close()
+
+
+class _ZipStream(io.RawIOBase):
+    """Unseekable sink for zipfile; whatever has been written is drained after each entry."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_pdf_bundle(documents: list):
+    """Yield the ZIP archive chunk by chunk while PDFs are produced in the export pool."""
+    executor = get_export_executor()
+    sink = _ZipStream()
+    errors = []
+
+    remaining = iter(documents)
+    pending = deque(
+        (doc, executor.submit(export_pdf_bytes, doc.document_type, doc.document_id))
+        for doc in islice(remaining, EXPORT_WINDOW)
+    )
+
+    try:
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+            while pending:
+                doc, future = pending.popleft()
+                try:
+                    archive.writestr(f"{FOLDERS[doc.document_type]}/{doc.number}.pdf", future.result())
+                except Exception as e:
+                    errors.append(f"{doc.number}: {e}")
+
+                next_doc = next(remaining, None)
+                if next_doc is not None:
+                    pending.append((
+                        next_doc,
+                        executor.submit(export_pdf_bytes, next_doc.document_type, next_doc.document_id)
+                    ))
+
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+            if errors:
+                archive.writestr("errors.txt", "\n".join(errors) + "\n")
+
+        yield sink.drain()
+    finally:
+        # Client went away mid-download: drop renders that have not started
+        for _, future in pending:
+            future.cancel()
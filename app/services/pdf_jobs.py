@@ -0,0 +1,246 @@
+"""
+Background PDF rendering.
+
+ReportLab rendering is CPU-bound, so PDFs are built in a pool of worker
+processes instead of inside the request. Every job is persisted in pdf_jobs
+before it is handed to the pool; the endpoints answer 202 with the job id and
+clients poll GET /api/pdf-jobs/{id} (optionally with ?wait=) for the result.
+Jobs that were queued or running when the server stopped are resubmitted on
+startup.
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from threading import Lock
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.pdf_job import PdfJob, PdfJobStatus, PdfJobAction
+from app.services.email_outbox import queue_document_email
+from app.services.pdf_cache import DOCUMENT_MODELS, content_hash, render_cached, record_pdf_request, attach_pdf
+
+ACTIVE_STATUSES = (PdfJobStatus.queued, PdfJobStatus.running)
+FINISHED_STATUSES = (PdfJobStatus.completed, PdfJobStatus.failed)
+# A status request holds a server thread while it waits, so waits are kept
+# short; clients poll again until the job finishes
+MAX_JOB_WAIT_SECONDS = 5
+JOB_POLL_SECONDS = 0.2
+
+# A running job older than this is assumed to belong to a worker that died
+STALE_RUNNING_AFTER = timedelta(minutes=10)
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: workers must not inherit the parent's DB connections or threads
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.pdf_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def shutdown_pdf_workers():
+    """Stop the worker pool. Unfinished jobs stay in pdf_jobs and are resumed on startup."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _mark_failed(job_id: int, error: str):
+    db = SessionLocal()
+    try:
+        db.query(PdfJob).filter(
+            PdfJob.id == job_id,
+            PdfJob.status.in_(ACTIVE_STATUSES)
+        ).update({
+            PdfJob.status: PdfJobStatus.failed,
+            PdfJob.error: error,
+            PdfJob.finished_at: datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _submit(job_id: int):
+    def on_done(future):
+        error = future.exception()
+        if error is None:
+            return
+        if isinstance(error, BrokenProcessPool):
+            # A worker died mid-render; the next submit starts a fresh pool
+            global _executor
+            with _executor_lock:
+                _executor = None
+        _mark_failed(job_id, f"Worker error: {error}")
+
+    try:
+        future = get_pdf_executor().submit(run_pdf_job, job_id)
+    except (BrokenProcessPool, RuntimeError) as e:
+        _mark_failed(job_id, f"Could not start PDF worker: {e}")
+        return
+    future.add_done_callback(on_done)
+
+
+def enqueue_pdf_job(
+    db: Session,
+    document_type: str,
+    document_id: int,
+    user_id: int = None,
+    action: PdfJobAction = PdfJobAction.render,
+    payload: dict = None
+) -> PdfJob:
+    """
+    Persist a job and hand it to the worker pool. A render request for a
+    document that already has a render of the same content queued or running
+    returns that job, so concurrent callers share one render; a request after
+    an edit or cancel gets a job of its own. Commits the session.
+    """
+    digest = None
+    if action == PdfJobAction.render:
+        model = DOCUMENT_MODELS[document_type]
+        document = db.query(model).filter(model.id == document_id).first()
+        digest = content_hash(document_type, document) if document else None
+
+        # Serialise concurrent enqueues for the document so only one job is created
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"pdf_job:{document_type}:{document_id}"}
+        )
+        in_flight = db.query(PdfJob).filter(
+            PdfJob.document_type == document_type,
+            PdfJob.document_id == document_id,
+            PdfJob.action == PdfJobAction.render,
+            PdfJob.content_hash == digest,
+            PdfJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(PdfJob.id.desc()).first()
+        if in_flight:
+            db.commit()
+            return in_flight
+
+    job = PdfJob(
+        document_type=document_type,
+        document_id=document_id,
+        action=action,
+        payload=payload,
+        content_hash=digest,
+        status=PdfJobStatus.queued,
+        requested_by=user_id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _submit(job.id)
+    return job
+
+
+def wait_for_job(job_id: int, timeout: float) -> PdfJob:
+    """
+    Poll until the job finishes or timeout seconds have passed. A connection is
+    only checked out for each status read, not for the whole wait. Returns the
+    last read of the job, detached from its session.
+    """
+    deadline = time.monotonic() + min(timeout, MAX_JOB_WAIT_SECONDS)
+    while True:
+        db = SessionLocal()
+        try:
+            job = db.query(PdfJob).filter(PdfJob.id == job_id).first()
+        finally:
+            db.close()
+        if job is None or job.status in FINISHED_STATUSES or time.monotonic() >= deadline:
+            return job
+        time.sleep(JOB_POLL_SECONDS)
+
+
+def resume_pdf_jobs() -> int:
+    """Resubmit jobs left queued, or stuck running, by a previous server process."""
+    db = SessionLocal()
+    try:
+        stale_before = datetime.utcnow() - STALE_RUNNING_AFTER
+        db.query(PdfJob).filter(
+            PdfJob.status == PdfJobStatus.running,
+            PdfJob.started_at < stale_before
+        ).update({PdfJob.status: PdfJobStatus.queued}, synchronize_session=False)
+        db.commit()
+
+        job_ids = [
+            job_id for (job_id,) in db.query(PdfJob.id).filter(
+                PdfJob.status == PdfJobStatus.queued
+            ).order_by(PdfJob.id).all()
+        ]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        _submit(job_id)
+    return len(job_ids)
+
+
+def run_pdf_job(job_id: int):
+    """Worker entry point: claim the job, render (and queue the email), record the outcome."""
+    db = SessionLocal()
+    try:
+        claimed = db.query(PdfJob).filter(
+            PdfJob.id == job_id,
+            PdfJob.status == PdfJobStatus.queued
+        ).update({
+            PdfJob.status: PdfJobStatus.running,
+            PdfJob.started_at: datetime.utcnow(),
+            PdfJob.attempts: PdfJob.attempts + 1
+        }, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return
+
+        job = db.query(PdfJob).filter(PdfJob.id == job_id).first()
+        try:
+            model = DOCUMENT_MODELS[job.document_type]
+            document = db.query(model).filter(model.id == job.document_id).first()
+            if document is None:
+                raise ValueError(f"{job.document_type.capitalize()} {job.document_id} not found")
+
+            ready = bool(document.pdf_url)
+            if job.action == PdfJobAction.render or not document.pdf_url:
+                digest = content_hash(job.document_type, document)
+                pdf_url = render_cached(db, job.document_type, document)
+                # An edit or cancel that landed during the render cleared
+                # pdf_url and queued its own job; leave its pdf_url alone
+                current = attach_pdf(db, job.document_type, job.document_id, digest, pdf_url)
+                db.commit()
+                if current is None and job.action == PdfJobAction.send_email:
+                    raise ValueError(f"{job.document_type.capitalize()} changed while its PDF was rendering; send it again")
+                document = current or document
+                job.pdf_url = pdf_url
+            else:
+                job.pdf_url = document.pdf_url
+
+            if job.action == PdfJobAction.send_email:
+                record_pdf_request(job.document_type, ready=ready)
+                queue_document_email(db, job.document_type, document, job.payload or {}, job.requested_by)
+
+            job.status = PdfJobStatus.completed
+        except Exception as e:
+            db.rollback()
+            job = db.query(PdfJob).filter(PdfJob.id == job_id).first()
+            job.status = PdfJobStatus.failed
+            job.error = str(e)
+
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,260 @@
+"""
+Bulk payment reminders for overdue invoices.
+
+A run finds every issued invoice past its due date with an outstanding balance
+and a client email in a single query (backed by ix_invoices_status_due_date).
+Invoices without a stored PDF are rendered in parallel in the PDF worker
+pool. Email logs and outbox messages are then written in multi-row batches;
+delivery goes through the rate-limited email dispatcher. Runs execute in a
+background thread and record their progress on the reminder_runs row. A dry
+run only records which reminders would be sent.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.receipt import PaymentReceipt, ReceiptStatus
+from app.models.email_log import EmailLog, EmailType, EmailDeliveryStatus
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.models.reminder_run import ReminderRun, ReminderRunStatus
+from app.services.audit import log_action
+from app.services.email_outbox import wake_email_dispatcher
+from app.services.pdf_cache import content_hash, render_cached, attach_pdf
+from app.services.pdf_jobs import get_pdf_executor
+from app.utils.email_sender import reminder_email
+
+# Invoices reminded (and not failed) within this window are skipped
+REMINDER_COOLDOWN = timedelta(days=7)
+# Email logs and outbox rows written per INSERT batch
+QUEUE_CHUNK = 200
+# Progress is committed after this many renders
+PROGRESS_EVERY = 20
+
+_run_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reminder-run")
+
+
+def find_overdue_invoices(db: Session, as_of: datetime, min_days_overdue: int = 0) -> list:
+    """Issued invoices due before as_of - min_days_overdue with an unpaid balance and a client email."""
+    paid = select(func.coalesce(func.sum(PaymentReceipt.amount), 0.0)).where(
+        PaymentReceipt.invoice_id == Invoice.id,
+        PaymentReceipt.status == ReceiptStatus.issued
+    ).correlate(Invoice).scalar_subquery()
+    outstanding = (func.coalesce(Invoice.total, 0.0) - paid).label("outstanding")
+
+    return db.query(
+        Invoice.id,
+        Invoice.invoice_number,
+        Invoice.customer_id,
+        Invoice.client_name,
+        Invoice.company_name,
+        Invoice.client_email,
+        Invoice.telephone1,
+        Invoice.total,
+        Invoice.due_date,
+        Invoice.pdf_url,
+        outstanding
+    ).filter(
+        Invoice.status == InvoiceStatus.issued,
+        Invoice.due_date < as_of - timedelta(days=min_days_overdue),
+        Invoice.client_email.isnot(None),
+        Invoice.client_email != "",
+        outstanding > 0.005
+    ).order_by(Invoice.due_date, Invoice.id).all()
+
+
+def _recently_reminded(db: Session, invoice_ids: list, as_of: datetime) -> set:
+    if not invoice_ids:
+        return set()
+    return {
+        document_id for (document_id,) in db.query(EmailLog.document_id).filter(
+            EmailLog.email_type == EmailType.reminder,
+            EmailLog.document_id.in_(invoice_ids),
+            EmailLog.delivery_status != EmailDeliveryStatus.failed,
+            EmailLog.sent_at >= as_of - REMINDER_COOLDOWN
+        ).distinct()
+    }
+
+
+def render_invoice_pdf(invoice_id: int) -> str:
+    """Worker entry point: make sure the invoice has a stored PDF and return its URL."""
+    db = SessionLocal()
+    try:
+        invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+        if invoice is None:
+            raise ValueError(f"Invoice {invoice_id} not found")
+        digest = content_hash("invoice", invoice)
+        pdf_url = render_cached(db, "invoice", invoice)
+        # An edit or cancel during the render leaves the new content's PDF alone
+        if attach_pdf(db, "invoice", invoice_id, digest, pdf_url) is None:
+            raise ValueError(f"Invoice {invoice_id} changed while its PDF was rendering")
+        db.commit()
+        return pdf_url
+    finally:
+        db.close()
+
+
+def start_reminder_run(
+    db: Session,
+    user_id: int,
+    dry_run: bool = False,
+    min_days_overdue: int = 0,
+    message: str = None
+) -> ReminderRun:
+    """Persist a run and start it in the background. Commits the session."""
+    run = ReminderRun(
+        status=ReminderRunStatus.queued,
+        dry_run=dry_run,
+        as_of=datetime.utcnow(),
+        min_days_overdue=min_days_overdue,
+        message=message,
+        requested_by=user_id
+    )
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+
+    _run_executor.submit(run_reminders, run.id)
+    return run
+
+
+def _days_overdue(row, as_of: datetime) -> int:
+    return max((as_of - row.due_date).days, 1)
+
+
+def _queue_reminders(db: Session, run: ReminderRun, rows: list, pdf_urls: dict):
+    for start in range(0, len(rows), QUEUE_CHUNK):
+        chunk = rows[start:start + QUEUE_CHUNK]
+        emails = [
+            reminder_email(row, row.client_email, row.outstanding, _days_overdue(row, run.as_of), run.message)
+            for row in chunk
+        ]
+        logs = [
+            EmailLog(
+                email_type=EmailType.reminder,
+                document_id=row.id,
+                document_number=row.invoice_number,
+                recipient_email=row.client_email,
+                subject=email.subject,
+                message=run.message or "",
+                pdf_url=pdf_urls.get(row.id, row.pdf_url),
+                delivery_status=EmailDeliveryStatus.queued,
+                user_id=run.requested_by,
+                customer_id=row.customer_id,
+                telephone1=row.telephone1,
+                client_name=row.client_name,
+                company_name=row.company_name,
+                total_amount=row.total
+            )
+            for row, email in zip(chunk, emails)
+        ]
+        # One multi-row INSERT ... RETURNING for the logs, one for the outbox
+        db.add_all(logs)
+        db.flush()
+        now = datetime.utcnow()
+        db.add_all([
+            EmailOutbox(
+                email_log_id=log.id,
+                reminder_run_id=run.id,
+                sender_email=email.sender_email,
+                sender_name=email.sender_name,
+                recipient_email=email.recipient_email,
+                recipient_name=email.recipient_name,
+                subject=email.subject,
+                html_content=email.html_content,
+                attachment_url=log.pdf_url,
+                attachment_name=f"{log.document_number}.pdf",
+                status=OutboxStatus.pending,
+                next_attempt_at=now
+            )
+            for log, email in zip(logs, emails)
+        ])
+        run.queued_emails += len(chunk)
+        db.commit()
+        wake_email_dispatcher()
+
+
+def run_reminders(run_id: int):
+    db = SessionLocal()
+    try:
+        run = db.query(ReminderRun).filter(ReminderRun.id == run_id).first()
+        run.status = ReminderRunStatus.running
+        run.started_at = datetime.utcnow()
+        db.commit()
+
+        try:
+            rows = find_overdue_invoices(db, run.as_of, run.min_days_overdue)
+            reminded = _recently_reminded(db, [row.id for row in rows], run.as_of)
+            run.total = len(rows)
+            run.skipped = len(reminded)
+            rows = [row for row in rows if row.id not in reminded]
+
+            if run.dry_run:
+                run.preview = [
+                    {
+                        "invoice_id": row.id,
+                        "invoice_number": row.invoice_number,
+                        "client_email": row.client_email,
+                        "outstanding": round(row.outstanding, 2),
+                        "days_overdue": _days_overdue(row, run.as_of),
+                        "has_pdf": bool(row.pdf_url)
+                    }
+                    for row in rows
+                ]
+            else:
+                pdf_urls, errors = {}, []
+                executor = get_pdf_executor()
+                futures = {
+                    executor.submit(render_invoice_pdf, row.id): row
+                    for row in rows if not row.pdf_url
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    row = futures[future]
+                    try:
+                        pdf_urls[row.id] = future.result()
+                        run.rendered += 1
+                    except Exception as e:
+                        errors.append(f"{row.invoice_number}: {e}")
+                        run.failed += 1
+                    if done % PROGRESS_EVERY == 0:
+                        db.commit()
+                run.errors = errors or None
+                db.commit()
+
+                sendable = [row for row in rows if row.pdf_url or row.id in pdf_urls]
+                _queue_reminders(db, run, sendable, pdf_urls)
+
+                log_action(
+                    db,
+                    action="send_reminders",
+                    user_id=run.requested_by,
+                    entity_type="reminder_run",
+                    entity_id=run.id,
+                    description=f"Queued {run.queued_emails} payment reminders for overdue invoices"
+                )
+
+            run.status = ReminderRunStatus.completed
+        except Exception as e:
+            db.rollback()
+            run = db.query(ReminderRun).filter(ReminderRun.id == run_id).first()
+            run.status = ReminderRunStatus.failed
+            run.error = str(e)
+
+        run.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def delivery_progress(db: Session, run_id: int) -> dict:
+    """Outbox message counts by status for a run."""
+    counts = dict(
+        db.query(EmailOutbox.status, func.count(EmailOutbox.id))
+        .filter(EmailOutbox.reminder_run_id == run_id)
+        .group_by(EmailOutbox.status).all()
+    )
+    return {status.value: counts.get(status, 0) for status in OutboxStatus}
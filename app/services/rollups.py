@@ -0,0 +1,221 @@
+"""
+Monthly revenue rollups.
+
+Issued invoice and receipt totals are kept per (user_id, year, month, kind) in
+the revenue_rollups table. The rows are adjusted in the same transaction as the
+status change that affects them, so the analytics endpoints can read a handful
+of rollup rows instead of scanning the document tables. The live updates and
+the rebuild place a document in the same period (PERIOD_COLUMNS), so a rebuild
+never moves totals between months.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import func, extract, text
+from datetime import datetime
+
+from app.models.revenue_rollup import RevenueRollup, RollupKind
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.receipt import PaymentReceipt, ReceiptStatus
+
+
+def apply_rollup(
+    db: Session,
+    kind: RollupKind,
+    user_id: int,
+    period: datetime,
+    amount: float,
+    count: int
+):
+    """
+    Atomically add amount/count to the rollup bucket for the given period.
+    Runs inside the caller's transaction; nothing is committed here.
+    """
+    stmt = insert(RevenueRollup).values(
+        user_id=user_id,
+        year=period.year,
+        month=period.month,
+        kind=kind.value,
+        amount=amount or 0.0,
+        count=count,
+        updated_at=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_revenue_rollups_bucket",
+        set_={
+            "amount": RevenueRollup.amount + stmt.excluded.amount,
+            "count": RevenueRollup.count + stmt.excluded.count,
+            "updated_at": stmt.excluded.updated_at
+        }
+    )
+    db.execute(stmt)
+
+
+# The first non-null column dates the document: invoices by their issue date,
+# receipts by when they were issued; created_at is always set
+PERIOD_COLUMNS = {
+    RollupKind.invoice: (Invoice.issue_date, Invoice.issued_at, Invoice.created_at),
+    RollupKind.receipt: (PaymentReceipt.issued_at, PaymentReceipt.created_at),
+}
+
+
+def period_expression(kind: RollupKind):
+    """SQL form of document_period, for aggregating in the database."""
+    return func.coalesce(*PERIOD_COLUMNS[kind])
+
+
+def document_period(kind: RollupKind, document) -> datetime:
+    for column in PERIOD_COLUMNS[kind]:
+        value = getattr(document, column.key)
+        if value is not None:
+            return value
+    raise ValueError(f"{kind.value.capitalize()} {document.id} has no date to report it under")
+
+
+def invoice_period(invoice: Invoice) -> datetime:
+    return document_period(RollupKind.invoice, invoice)
+
+
+def receipt_period(receipt: PaymentReceipt) -> datetime:
+    return document_period(RollupKind.receipt, receipt)
+
+
+def record_invoice_issued(db: Session, invoice: Invoice):
+    apply_rollup(db, RollupKind.invoice, invoice.user_id, invoice_period(invoice), invoice.total, 1)
+
+
+def record_invoice_cancelled(db: Session, invoice: Invoice):
+    apply_rollup(db, RollupKind.invoice, invoice.user_id, invoice_period(invoice), -(invoice.total or 0.0), -1)
+
+
+def record_receipt_issued(db: Session, receipt: PaymentReceipt):
+    apply_rollup(db, RollupKind.receipt, receipt.user_id, receipt_period(receipt), receipt.amount, 1)
+
+
+def record_receipt_cancelled(db: Session, receipt: PaymentReceipt):
+    apply_rollup(db, RollupKind.receipt, receipt.user_id, receipt_period(receipt), -(receipt.amount or 0.0), -1)
+
+
+def get_rollup_buckets(db: Session, kind: RollupKind, user_id: int = None) -> dict:
+    """
+    Return {(year, month): (count, amount)} for the given kind.
+    When user_id is None the buckets of all users are summed (admin view).
+    """
+    query = db.query(
+        RevenueRollup.year,
+        RevenueRollup.month,
+        func.sum(RevenueRollup.count),
+        func.sum(RevenueRollup.amount)
+    ).filter(RevenueRollup.kind == kind.value)
+
+    if user_id is not None:
+        query = query.filter(RevenueRollup.user_id == user_id)
+
+    rows = query.group_by(RevenueRollup.year, RevenueRollup.month).all()
+    return {
+        (row[0], row[1]): (int(row[2] or 0), row[3] or 0.0)
+        for row in rows
+        if row[2]
+    }
+
+
+def _scan_source(db: Session, kind: RollupKind, model, status_value, amount_column, batch_size: int) -> dict:
+    """Aggregate issued documents in primary-key batches."""
+    totals = {}
+    period = period_expression(kind)
+    year_col = extract('year', period)
+    month_col = extract('month', period)
+
+    last_id = 0
+    max_id = db.query(func.max(model.id)).scalar() or 0
+    while last_id < max_id:
+        upper_id = last_id + batch_size
+        rows = db.query(
+            model.user_id,
+            year_col,
+            month_col,
+            func.count(model.id),
+            func.coalesce(func.sum(amount_column), 0.0)
+        ).filter(
+            model.id > last_id,
+            model.id <= upper_id,
+            model.status == status_value
+        ).group_by(model.user_id, year_col, month_col).all()
+
+        for user_id, year, month, count, amount in rows:
+            key = (user_id, int(year), int(month))
+            prev_count, prev_amount = totals.get(key, (0, 0.0))
+            totals[key] = (prev_count + count, prev_amount + (amount or 0.0))
+
+        last_id = upper_id
+
+    return totals
+
+
+def rebuild_rollups(db: Session, batch_size: int = 5000) -> dict:
+    """
+    Reconcile revenue_rollups against the invoices and payment_receipts tables.
+    Source rows are aggregated in id batches; only buckets that differ are
+    rewritten. Commits once at the end and returns a summary of the changes.
+    """
+    expected = {}
+    sources = [
+        (RollupKind.invoice, Invoice, InvoiceStatus.issued, Invoice.total),
+        (RollupKind.receipt, PaymentReceipt, ReceiptStatus.issued, PaymentReceipt.amount),
+    ]
+    for kind, model, status_value, amount_column in sources:
+        for (user_id, year, month), value in _scan_source(
+            db, kind, model, status_value, amount_column, batch_size
+        ).items():
+            expected[(user_id, year, month, kind.value)] = value
+
+    existing = {
+        (row.user_id, row.year, row.month, row.kind): row
+        for row in db.query(RevenueRollup).all()
+    }
+
+    summary = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    for key, (count, amount) in expected.items():
+        row = existing.pop(key, None)
+        if row is None:
+            user_id, year, month, kind = key
+            db.add(RevenueRollup(
+                user_id=user_id, year=year, month=month, kind=kind,
+                amount=amount, count=count
+            ))
+            summary["created"] += 1
+        elif row.count != count or abs((row.amount or 0.0) - amount) > 0.005:
+            row.count = count
+            row.amount = amount
+            summary["updated"] += 1
+        else:
+            summary["unchanged"] += 1
+
+    for row in existing.values():
+        db.delete(row)
+        summary["deleted"] += 1
+
+    db.commit()
+    return summary
+
+
+def backfill_rollups_if_empty(db: Session) -> dict:
+    """
+    Build the rollups on startup when the table is empty but documents have
+    already been issued (fresh table on an existing database). Returns the
+    rebuild summary, or None when nothing needed doing.
+    """
+    # Several server processes may start at once; only one rebuilds
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('revenue_rollups_backfill'))"))
+    if db.query(RevenueRollup.id).first() is not None:
+        db.commit()
+        return None
+    has_documents = (
+        db.query(Invoice.id).filter(Invoice.status == InvoiceStatus.issued).first() is not None
+        or db.query(PaymentReceipt.id).filter(PaymentReceipt.status == ReceiptStatus.issued).first() is not None
+    )
+    if not has_documents:
+        db.commit()
+        return None
+    return rebuild_rollups(db)
@@ -1,88 +1,212 @@
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
+from collections import namedtuple
+from string import Template
+import base64
+import html
+from threading import Lock
 from typing import Optional
 from app.config import settings
 
-def send_invoice_email(invoice, recipient_email: str, custom_message: Optional[str] = None):
-    if not settings.brevo_api_key:
-        print("Brevo API key not configured. Email not sent.")
-        return
-    
-    configuration = sib_api_v3_sdk.Configuration()
-    configuration.api_key['api-key'] = settings.brevo_api_key
-    
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-    
-    subject = f"Invoice {invoice.invoice_number}"
-    
-    html_content = f"""
+OutgoingEmail = namedtuple(
+    "OutgoingEmail",
+    ["sender_email", "sender_name", "recipient_email", "recipient_name", "subject", "html_content", "attachments"],
+    defaults=((),)
+)
+
+class EmailDeliveryError(Exception):
+    """A send that failed; retryable is False when trying again cannot help."""
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+# Parsed once at import; each send only substitutes the escaped values
+INVOICE_TEMPLATE = Template("""
     <html>
     <body>
-        <h2>Invoice {invoice.invoice_number}</h2>
-        <p>Dear {invoice.client_name},</p>
+        <h2>Invoice $number</h2>
+        <p>Dear $client_name,</p>
         <p>Please find attached your invoice.</p>
-        {f'<p>{custom_message}</p>' if custom_message else ''}
-        <p><strong>Total Amount:</strong> ${invoice.total:.2f}</p>
-        <p><strong>Due Date:</strong> {invoice.due_date.strftime('%Y-%m-%d')}</p>
+        $message_block
+        <p><strong>Total Amount:</strong> $$$total</p>
+        <p><strong>Due Date:</strong> $due_date</p>
         <p>Thank you for your business!</p>
     </body>
     </html>
-    """
-    
-    sender = {"email": "noreply@yourdomain.com", "name": "Invoice System"}
-    to = [{"email": recipient_email, "name": invoice.client_name}]
-    
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=to,
-        sender=sender,
-        subject=subject,
-        html_content=html_content
-    )
-    
-    try:
-        api_response = api_instance.send_transac_email(send_smtp_email)
-        print(f"Email sent successfully: {api_response}")
-    except ApiException as e:
-        print(f"Exception when calling Brevo API: {e}")
-
-def send_quote_email(quote, recipient_email: str, custom_message: Optional[str] = None):
-    if not settings.brevo_api_key:
-        print("Brevo API key not configured. Email not sent.")
-        return
-    
-    configuration = sib_api_v3_sdk.Configuration()
-    configuration.api_key['api-key'] = settings.brevo_api_key
-    
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-    
-    subject = f"Quote {quote.quote_number}"
-    
-    html_content = f"""
+    """)
+
+QUOTE_TEMPLATE = Template("""
     <html>
     <body>
-        <h2>Quote {quote.quote_number}</h2>
-        <p>Dear {quote.client_name},</p>
+        <h2>Quote $number</h2>
+        <p>Dear $client_name,</p>
         <p>Please find attached your quote.</p>
-        {f'<p>{custom_message}</p>' if custom_message else ''}
-        <p><strong>Total Amount:</strong> ${quote.total:.2f}</p>
-        <p><strong>Valid Until:</strong> {quote.valid_until.strftime('%Y-%m-%d')}</p>
+        $message_block
+        <p><strong>Total Amount:</strong> $$$total</p>
+        <p><strong>Valid Until:</strong> $valid_until</p>
         <p>We look forward to working with you!</p>
     </body>
     </html>
-    """
-    
-    sender = {"email": "noreply@yourdomain.com", "name": "Quote System"}
-    to = [{"email": recipient_email, "name": quote.client_name}]
-    
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=to,
-        sender=sender,
-        subject=subject,
-        html_content=html_content
+    """)
+
+REMINDER_TEMPLATE = Template("""
+    <html>
+    <body>
+        <h2>Payment Reminder</h2>
+        <p>Dear $client_name,</p>
+        <p>Our records show that invoice $number is $days_overdue overdue.</p>
+        $message_block
+        <p><strong>Amount Outstanding:</strong> $$$outstanding</p>
+        <p><strong>Due Date:</strong> $due_date</p>
+        <p>If you have already paid, please disregard this message.</p>
+    </body>
+    </html>
+    """)
+
+def _message_block(custom_message: Optional[str]) -> str:
+    return f"<p>{html.escape(custom_message)}</p>" if custom_message else ""
+
+def _date(value) -> str:
+    return value.strftime('%Y-%m-%d') if value else "-"
+
+def invoice_email(invoice, recipient_email: str, custom_message: Optional[str] = None, attachments=()) -> OutgoingEmail:
+    return OutgoingEmail(
+        sender_email="noreply@yourdomain.com",
+        sender_name="Invoice System",
+        recipient_email=recipient_email,
+        recipient_name=invoice.client_name,
+        subject=f"Invoice {invoice.invoice_number}",
+        html_content=INVOICE_TEMPLATE.substitute(
+            number=html.escape(invoice.invoice_number),
+            client_name=html.escape(invoice.client_name or ""),
+            message_block=_message_block(custom_message),
+            total=f"{invoice.total:.2f}",
+            due_date=_date(invoice.due_date)
+        ),
+        attachments=attachments
+    )
+
+def quote_email(quote, recipient_email: str, custom_message: Optional[str] = None, attachments=()) -> OutgoingEmail:
+    return OutgoingEmail(
+        sender_email="noreply@yourdomain.com",
+        sender_name="Quote System",
+        recipient_email=recipient_email,
+        recipient_name=quote.client_name,
+        subject=f"Quote {quote.quote_number}",
+        html_content=QUOTE_TEMPLATE.substitute(
+            number=html.escape(quote.quote_number),
+            client_name=html.escape(quote.client_name or ""),
+            message_block=_message_block(custom_message),
+            total=f"{quote.total:.2f}",
+            valid_until=_date(quote.valid_until)
+        ),
+        attachments=attachments
+    )
+
+def reminder_email(invoice, recipient_email: str, outstanding: float, days_overdue: int, custom_message: Optional[str] = None, attachments=()) -> OutgoingEmail:
+    return OutgoingEmail(
+        sender_email="noreply@yourdomain.com",
+        sender_name="Invoice System",
+        recipient_email=recipient_email,
+        recipient_name=invoice.client_name,
+        subject=f"Payment reminder: Invoice {invoice.invoice_number}",
+        html_content=REMINDER_TEMPLATE.substitute(
+            number=html.escape(invoice.invoice_number),
+            client_name=html.escape(invoice.client_name or ""),
+            days_overdue=f"{days_overdue} day{'s' if days_overdue != 1 else ''}",
+            message_block=_message_block(custom_message),
+            outstanding=f"{outstanding:.2f}",
+            due_date=_date(invoice.due_date)
+        ),
+        attachments=attachments
     )
-    
-    try:
-        api_response = api_instance.send_transac_email(send_smtp_email)
-        print(f"Email sent successfully: {api_response}")
-    except ApiException as e:
-        print(f"Exception when calling Brevo API: {e}")
+
+class BrevoTransport:
+    """Sends through the Brevo transactional email API."""
+
+    def __init__(self):
+        self._api = None
+        self._lock = Lock()
+
+    @property
+    def api(self):
+        # One ApiClient per process: its urllib3 pool keeps connections, and
+        # their TLS sessions, alive between sends
+        if self._api is None:
+            with self._lock:
+                if self._api is None:
+                    configuration = sib_api_v3_sdk.Configuration()
+                    configuration.api_key['api-key'] = settings.brevo_api_key
+                    configuration.connection_pool_maxsize = settings.email_concurrency
+                    self._api = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+        return self._api
+
+    def close(self):
+        with self._lock:
+            if self._api is not None:
+                self._api.api_client.rest_client.pool_manager.clear()
+                self._api = None
+
+    def send(self, email: OutgoingEmail) -> str:
+        if not settings.brevo_api_key:
+            raise EmailDeliveryError("Brevo API key not configured", retryable=False)
+
+        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+            to=[{"email": email.recipient_email, "name": email.recipient_name}],
+            sender={"email": email.sender_email, "name": email.sender_name},
+            subject=email.subject,
+            html_content=email.html_content,
+            attachment=[
+                sib_api_v3_sdk.SendSmtpEmailAttachment(name=name, content=base64.b64encode(data).decode("ascii"))
+                for name, data in email.attachments
+            ] or None
+        )
+
+        try:
+            api_response = self.api.send_transac_email(send_smtp_email)
+        except ApiException as e:
+            # Rate limiting and server errors are worth another attempt; a rejected request is not
+            retryable = e.status is None or e.status == 429 or e.status >= 500
+            raise EmailDeliveryError(f"Brevo API error {e.status}: {e.reason}", retryable=retryable)
+        return getattr(api_response, "message_id", None)
+
+class FakeTransport:
+    """
+    Records emails instead of sending them (EMAIL_TRANSPORT=fake) for local
+    runs and tests. fail_next makes the next N sends raise a retryable error.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.fail_next = 0
+        self._lock = Lock()
+
+    def send(self, email: OutgoingEmail) -> str:
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                raise EmailDeliveryError("Simulated transport failure")
+            self.sent.append(email)
+            return f"fake-{len(self.sent)}"
+
+    def close(self):
+        pass
+
+_transport = None
+_transport_lock = Lock()
+
+def get_email_transport():
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = FakeTransport() if settings.email_transport == "fake" else BrevoTransport()
+    return _transport
+
+def close_email_transport():
+    """Drop the transport and its pooled connections (on shutdown)."""
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+            _transport = None
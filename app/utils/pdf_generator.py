@@ -1,61 +1,94 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.lib.utils import ImageReader
+from PIL import Image as PILImage
 from datetime import datetime
+from io import BytesIO
+from threading import Lock
+from collections import OrderedDict
+from bisect import bisect_right
+from itertools import accumulate
+import copy
 import os
-import boto3
 from sqlalchemy.orm import Session
 import html
 
 from app.config import settings
+from app.utils.storage import store_bytes, load_bytes, delete_bytes
 
-def upload_to_s3(file_path: str, object_name: str) -> str:
-    bucket_id = settings.object_storage_bucket
-    if not bucket_id:
-        return f"/pdfs/{object_name}"
-    
-    try:
-        s3_client = boto3.client('s3')
-        s3_client.upload_file(file_path, bucket_id, object_name)
-        return f"https://{bucket_id}.s3.amazonaws.com/{object_name}"
-    except Exception as e:
-        print(f"Error uploading to S3: {e}")
-        return f"/pdfs/{object_name}"
-
-def generate_invoice_pdf(invoice, db: Session) -> str:
-    os.makedirs("pdfs", exist_ok=True)
-    filename = f"invoice_{invoice.invoice_number}.pdf"
-    filepath = os.path.join("pdfs", filename)
-    
-    doc = SimpleDocTemplate(filepath, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    logo_path = "static/logo.png"
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=2.5*inch, height=0.9*inch)
-        elements.append(logo)
-        elements.append(Spacer(1, 0.2*inch))
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1b7ca8'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Change title based on status
-    if invoice.status.value == "draft":
-        title_text = "INVOICE DRAFT"
-        elements.append(Paragraph(title_text, title_style))
-    elif invoice.status.value == "cancelled" and invoice.cancelled_at is not None:
-        # Use red title for cancelled invoices (with verified metadata)
-        cancelled_title_style = ParagraphStyle(
+# Bump whenever the layout changes so cached PDFs are rendered again
+TEMPLATE_VERSION = "5"
+
+LOGO_PATH = "static/logo.png"
+LOGO_WIDTH = 2.5*inch
+LOGO_HEIGHT = 0.9*inch
+# Compact mode resamples the logo to its printed size at this resolution
+# instead of embedding the full-size source image
+COMPACT_LOGO_DPI = 200
+BRAND_COLOR = colors.HexColor('#1b7ca8')
+
+# Documents with more line items than this use long-document mode:
+# single-line descriptions are drawn as plain cells instead of Paragraphs
+LONG_DOCUMENT_ROWS = 22
+
+
+def _downscale_logo(data: bytes) -> bytes:
+    size = (round(LOGO_WIDTH / inch * COMPACT_LOGO_DPI), round(LOGO_HEIGHT / inch * COMPACT_LOGO_DPI))
+    with PILImage.open(BytesIO(data)) as source:
+        if source.width <= size[0] and source.height <= size[1]:
+            return data
+        resized = source.resize(size, PILImage.LANCZOS)
+    output = BytesIO()
+    resized.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+class SharedImage(Flowable):
+    """
+    Draws one process-wide ImageReader. The image is decoded once per process,
+    and canvas.drawImage embeds it as a single XObject per document however
+    often it is drawn.
+    """
+
+    def __init__(self, reader: ImageReader, width: float, height: float):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+        self.hAlign = 'CENTER'
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height, mask='auto')
+
+
+class TemplateResources:
+    """
+    Styles, table styles, logo bytes and the parsed company footer shared by
+    every document. Built once per process by get_template_resources(); the
+    per-render flowables are created from these.
+    """
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        self.normal = styles['Normal']
+
+        self.title = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=BRAND_COLOR,
+            spaceAfter=30,
+            alignment=TA_CENTER
+        )
+        self.cancelled_title = ParagraphStyle(
             'CancelledTitleStyle',
             parent=styles['Heading1'],
             fontSize=24,
@@ -63,38 +96,351 @@ def generate_invoice_pdf(invoice, db: Session) -> str:
             spaceAfter=30,
             alignment=TA_CENTER
         )
-        elements.append(Paragraph("CANCELLED INVOICE", cancelled_title_style))
-    else:
-        title_text = "INVOICE"
-        elements.append(Paragraph(title_text, title_style))
+        # Paragraph style for wrapping line item descriptions
+        self.description = ParagraphStyle(
+            'DescriptionStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            leading=12,
+            wordWrap='CJK'
+        )
+        self.bill_to_header = ParagraphStyle(
+            'BillToHeader',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=BRAND_COLOR,
+            spaceAfter=10
+        )
+        self.amount = ParagraphStyle(
+            'AmountStyle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            textColor=colors.HexColor('#155a7a'),
+            spaceAfter=20,
+            alignment=TA_CENTER
+        )
+        self.footer_company = ParagraphStyle(
+            'FooterCompany',
+            parent=styles['Normal'],
+            fontSize=11,
+            textColor=BRAND_COLOR,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+        self.footer_info = ParagraphStyle(
+            'FooterInfo',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.HexColor('#555555'),
+            alignment=TA_CENTER,
+            leading=12
+        )
+
+        self.info_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ])
+        self.client_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+        self.invoice_items_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), BRAND_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ])
+        self.quote_items_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), BRAND_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ])
+        self.totals_table_style = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, colors.black),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ])
+        self.footer_line_style = TableStyle([
+            ('LINEABOVE', (0, 0), (-1, 0), 1, BRAND_COLOR),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+        ])
+
+        self.logo_bytes = None
+        self.logo_reader = None
+        if os.path.exists(LOGO_PATH):
+            with open(LOGO_PATH, "rb") as f:
+                self.logo_bytes = f.read()
+            if settings.pdf_compact:
+                self.logo_bytes = _downscale_logo(self.logo_bytes)
+                self.logo_reader = ImageReader(BytesIO(self.logo_bytes))
+
+        # Company details, parsed once; each render gets shallow copies
+        self.footer_paragraphs = [
+            Paragraph("IT PAL TECHNOLOGY SOLUTIONS LTD", self.footer_company),
+            Spacer(1, 0.05*inch),
+            Paragraph("Reg. No.: HE482919 / T.I.C: 60254066D", self.footer_info),
+            Paragraph("IBAN: LT41 3250 0726 5105 4093 &nbsp;&nbsp;|&nbsp;&nbsp; BIC: REVOLT21 &nbsp;&nbsp;|&nbsp;&nbsp; BANK: Revolut Bank UAB", self.footer_info),
+            Paragraph("Tel: +357-97652017 &nbsp;&nbsp;|&nbsp;&nbsp; Email: finance@itpalsolutions.com &nbsp;&nbsp;|&nbsp;&nbsp; Website: www.itpalsolutions.com", self.footer_info),
+        ]
+
+    def logo(self):
+        if self.logo_bytes is None:
+            return None
+        if self.logo_reader is not None:
+            return SharedImage(self.logo_reader, LOGO_WIDTH, LOGO_HEIGHT)
+        return Image(BytesIO(self.logo_bytes), width=LOGO_WIDTH, height=LOGO_HEIGHT)
+
+    def footer(self) -> list:
+        """Separator line and company details closing every document."""
+        footer_line_table = Table([[""]], colWidths=[7*inch])
+        footer_line_table.setStyle(self.footer_line_style)
+        return [Spacer(1, 0.5*inch), footer_line_table] + [copy.copy(f) for f in self.footer_paragraphs]
+
+
+_resources = None
+_resources_lock = Lock()
+
+def get_template_resources() -> TemplateResources:
+    global _resources
+    if _resources is None:
+        with _resources_lock:
+            if _resources is None:
+                _resources = TemplateResources()
+    return _resources
+
+
+def _title(res: TemplateResources, text: str, cancelled: bool = False) -> Paragraph:
+    return Paragraph(text, res.cancelled_title if cancelled else res.title)
+
+
+def _info_table(res: TemplateResources, info_data: list) -> Table:
+    info_table = Table(info_data, colWidths=[1.5*inch, 2*inch, 1.5*inch, 2*inch])
+    info_table.setStyle(res.info_table_style)
+    return info_table
+
+
+def _two_column_table(res: TemplateResources, heading: str, left_column: list, right_column: list) -> Table:
+    data = [[heading, ""]]
+    max_rows = max(len(left_column), len(right_column))
+    for i in range(max_rows):
+        left_text = left_column[i] if i < len(left_column) else ""
+        right_text = right_column[i] if i < len(right_column) else ""
+        data.append([left_text, right_text])
+
+    client_table = Table(data, colWidths=[3.5*inch, 3.5*inch])
+    client_table.setStyle(res.client_table_style)
+    return client_table
+
+
+def _totals_table(res: TemplateResources, totals_data: list) -> Table:
+    totals_table = Table(totals_data, colWidths=[5.5*inch, 1.5*inch])
+    totals_table.setStyle(res.totals_table_style)
+    return totals_table
+
+
+def _description_cell(res: TemplateResources, description: str, width: float, long_document: bool):
+    # A Paragraph per row dominates the cost of long tables; text that fits on
+    # one line renders the same as a plain cell
+    if long_document and "\n" not in description and stringWidth(description, "Helvetica", 10) <= width - 12:
+        return description
+    # Escape HTML special characters to prevent ReportLab parsing errors
+    return Paragraph(html.escape(description), res.description)
+
+
+class LineItemTables(Flowable):
+    """
+    Line items drawn as one table per page, each starting with the header row.
+    Row heights are measured once; at a page break split() cuts off as many
+    rows as fit in the space left in the frame and hands the rest on. A single
+    Table would be re-wrapped and re-split on every page, which is quadratic
+    in the number of rows.
+    """
+
+    def __init__(self, header: list, rows: list, col_widths: list, style: TableStyle,
+                 start: int = 0, offsets: list = None):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.col_widths = col_widths
+        self.style = style
+        self.start = start
+        self.hAlign = 'CENTER'
+        if offsets is None:
+            measured = self._table(0, len(rows))
+            measured.wrap(sum(col_widths), 0)
+            # offsets[i] is the height of the header plus rows[:i]
+            offsets = list(accumulate(measured._rowHeights))
+        self.offsets = offsets
+
+    def _table(self, start: int, end: int) -> Table:
+        table = Table([self.header] + self.rows[start:end], colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(self.style)
+        return table
+
+    def _height(self, end: int) -> float:
+        return self.offsets[0] + self.offsets[end] - self.offsets[self.start]
+
+    def wrap(self, availWidth, availHeight):
+        self.width = sum(self.col_widths)
+        self.height = self._height(len(self.rows))
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        # Rows whose bottom edge still fits below the header
+        limit = availHeight - self.offsets[0] + self.offsets[self.start]
+        end = bisect_right(self.offsets, limit, lo=self.start + 1) - 1
+        if end <= self.start:
+            return []
+        return [
+            self._table(self.start, end),
+            LineItemTables(self.header, self.rows, self.col_widths, self.style, end, self.offsets)
+        ]
+
+    def draw(self):
+        table = self._table(self.start, len(self.rows))
+        table.wrapOn(self.canv, self.width, self.height)
+        table.drawOn(self.canv, 0, 0)
+
+
+def render_document_bytes(title: Paragraph, body: list) -> bytes:
+    """
+    Shared renderer: logo, title, the layout-specific body and the company
+    footer, built in memory.
+    """
+    res = get_template_resources()
+    buffer = BytesIO()
+    # Always Flate-compress page content streams, whatever rl_config says
+    doc = SimpleDocTemplate(buffer, pagesize=letter, pageCompression=1)
+    elements = []
+
+    logo = res.logo()
+    if logo is not None:
+        elements.append(logo)
+        elements.append(Spacer(1, 0.2*inch))
+
+    elements.append(title)
     elements.append(Spacer(1, 0.2*inch))
-    
+    elements.extend(body)
+    elements.extend(res.footer())
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+class RecentPdfs:
+    """Byte-bounded LRU of PDFs recently stored or loaded in this process, keyed by URL."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def get(self, pdf_url: str) -> bytes:
+        with self._lock:
+            data = self._entries.get(pdf_url)
+            if data is not None:
+                self._entries.move_to_end(pdf_url)
+            return data
+
+    def put(self, pdf_url: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(pdf_url, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[pdf_url] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def discard(self, pdf_url: str):
+        with self._lock:
+            data = self._entries.pop(pdf_url, None)
+            if data is not None:
+                self._size -= len(data)
+
+
+recent_pdfs = RecentPdfs(settings.pdf_memory_cache_mb * 1024 * 1024)
+
+
+def store_pdf_bytes(data: bytes, filename: str) -> str:
+    """Persist rendered bytes to the configured storage backend and return the URL."""
+    pdf_url = store_bytes(filename, data, "application/pdf")
+    recent_pdfs.put(pdf_url, data)
+    return pdf_url
+
+
+def load_pdf_bytes(pdf_url: str) -> bytes:
+    """
+    Read back a PDF written by store_pdf_bytes, from memory when it was stored
+    or loaded recently, otherwise from the storage backend. Returns None if it
+    is gone.
+    """
+    data = recent_pdfs.get(pdf_url)
+    if data is None:
+        data = load_bytes(pdf_url)
+        if data is not None:
+            recent_pdfs.put(pdf_url, data)
+    return data
+
+
+def delete_pdf_bytes(pdf_url: str):
+    """Remove a stored PDF from the storage backend and the in-process cache."""
+    recent_pdfs.discard(pdf_url)
+    delete_bytes(pdf_url)
+
+
+def invoice_layout(invoice, res: TemplateResources) -> tuple:
+    # Change title based on status
+    if invoice.status.value == "draft":
+        title = _title(res, "INVOICE DRAFT")
+    elif invoice.status.value == "cancelled" and invoice.cancelled_at is not None:
+        # Use red title for cancelled invoices (with verified metadata)
+        title = _title(res, "CANCELLED INVOICE", cancelled=True)
+    else:
+        title = _title(res, "INVOICE")
+
+    body = []
+
     # Remove status from PDF, only show Invoice Number and Issue Date
     info_data = [
         ["Invoice Number:", invoice.invoice_number, "Issue Date:", invoice.issue_date.strftime("%d-%m-%Y")]
     ]
-    
+
     # Add quote reference if invoice was converted from a quote
     if hasattr(invoice, 'source_quote_number') and invoice.source_quote_number:
         info_data.append(["Quote Reference:", invoice.source_quote_number, "", ""])
-    
-    info_table = Table(info_data, colWidths=[1.5*inch, 2*inch, 1.5*inch, 2*inch])
-    info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    
-    elements.append(info_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
+
+    body.append(_info_table(res, info_data))
+    body.append(Spacer(1, 0.3*inch))
+
     # Build dynamic Bill To section - only show filled fields
     bill_to_fields = []
-    
+
     # Always include client name (mandatory)
     bill_to_fields.append(f"Client Name: {invoice.client_name}")
-    
+
     # Add optional fields only if they have values
     if invoice.company_name:
         bill_to_fields.append(f"Company Name: {invoice.company_name}")
@@ -110,87 +456,48 @@ def generate_invoice_pdf(invoice, db: Session) -> str:
         bill_to_fields.append(f"T.I.C.: {invoice.client_tax_id}")
     if invoice.client_address:
         bill_to_fields.append(f"Address: {invoice.client_address}")
-    
+
     # Distribute fields across two columns for better space utilization
     mid_point = (len(bill_to_fields) + 1) // 2
-    left_column = bill_to_fields[:mid_point]
-    right_column = bill_to_fields[mid_point:]
-    
-    # Create two-column table for Bill To
-    bill_to_data = [["Bill To:", ""]]
-    max_rows = max(len(left_column), len(right_column))
-    for i in range(max_rows):
-        left_text = left_column[i] if i < len(left_column) else ""
-        right_text = right_column[i] if i < len(right_column) else ""
-        bill_to_data.append([left_text, right_text])
-    
-    client_table = Table(bill_to_data, colWidths=[3.5*inch, 3.5*inch])
-    client_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    
-    elements.append(client_table)
-    elements.append(Spacer(1, 0.2*inch))
-    
+    body.append(_two_column_table(res, "Bill To:", bill_to_fields[:mid_point], bill_to_fields[mid_point:]))
+    body.append(Spacer(1, 0.2*inch))
+
     # Check if any line item has a discount
     has_line_item_discount = any(item.discount > 0 for item in invoice.line_items)
-    
-    # Create a paragraph style for description wrapping
-    desc_style = ParagraphStyle(
-        'DescriptionStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12,
-        wordWrap='CJK'
-    )
-    
+    long_document = len(invoice.line_items) > LONG_DOCUMENT_ROWS
+
     if has_line_item_discount:
-        line_items_data = [["Description", "Quantity", "Unit Price", "Discount %", "Total"]]
-        for item in invoice.line_items:
-            # Escape HTML special characters to prevent ReportLab parsing errors
-            safe_description = html.escape(item.description)
-            line_items_data.append([
-                Paragraph(safe_description, desc_style),
+        header = ["Description", "Quantity", "Unit Price", "Discount %", "Total"]
+        col_widths = [3*inch, 0.8*inch, 1.1*inch, 0.9*inch, 1.2*inch]
+        rows = [
+            [
+                _description_cell(res, item.description, col_widths[0], long_document),
                 str(int(item.quantity)),
                 f"€{item.unit_price:.2f}",
                 f"{item.discount}%" if item.discount > 0 else "-",
                 f"€{item.total:.2f}"
-            ])
-        line_items_table = Table(line_items_data, colWidths=[3*inch, 0.8*inch, 1.1*inch, 0.9*inch, 1.2*inch])
+            ]
+            for item in invoice.line_items
+        ]
     else:
-        line_items_data = [["Description", "Quantity", "Unit Price", "Total"]]
-        for item in invoice.line_items:
-            # Escape HTML special characters to prevent ReportLab parsing errors
-            safe_description = html.escape(item.description)
-            line_items_data.append([
-                Paragraph(safe_description, desc_style),
+        header = ["Description", "Quantity", "Unit Price", "Total"]
+        col_widths = [4*inch, 0.9*inch, 1.2*inch, 1.4*inch]
+        rows = [
+            [
+                _description_cell(res, item.description, col_widths[0], long_document),
                 str(int(item.quantity)),
                 f"€{item.unit_price:.2f}",
                 f"€{item.total:.2f}"
-            ])
-        line_items_table = Table(line_items_data, colWidths=[4*inch, 0.9*inch, 1.2*inch, 1.4*inch])
-    line_items_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1b7ca8')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    
-    elements.append(line_items_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
+            ]
+            for item in invoice.line_items
+        ]
+
+    body.append(LineItemTables(header, rows, col_widths, res.invoice_items_style))
+    body.append(Spacer(1, 0.3*inch))
+
     # Build totals section with discount support
     totals_data = [["Subtotal:", f"€{invoice.subtotal:.2f}"]]
-    
+
     # Add discount if present (overall discount only)
     if invoice.discount > 0:
         discount_amount = invoice.subtotal * (invoice.discount / 100)
@@ -198,143 +505,44 @@ def generate_invoice_pdf(invoice, db: Session) -> str:
         totals_data.append([f"Discount ({invoice.discount}%):", f"-€{discount_amount:.2f}"])
     else:
         subtotal_after_discount = invoice.subtotal
-    
+
     # Calculate VAT amount from percentage
     vat_percentage = invoice.tax or 0.0
     vat_amount = subtotal_after_discount * (vat_percentage / 100)
     totals_data.append([f"VAT ({vat_percentage}%):", f"€{vat_amount:.2f}"])
-    
+
     # Total
     total = subtotal_after_discount + vat_amount
     totals_data.append(["Total:", f"€{total:.2f}"])
-    
-    totals_table = Table(totals_data, colWidths=[5.5*inch, 1.5*inch])
-    totals_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('LINEABOVE', (0, -1), (-1, -1), 2, colors.black),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    
-    elements.append(totals_table)
-    
+
+    body.append(_totals_table(res, totals_data))
+
     if invoice.notes:
-        elements.append(Spacer(1, 0.3*inch))
-        elements.append(Paragraph(f"<b>Notes:</b> {invoice.notes}", styles['Normal']))
-    
-    # Add footer with separator line
-    elements.append(Spacer(1, 0.5*inch))
-    
-    # Footer separator line
-    footer_line_data = [["" for _ in range(1)]]
-    footer_line_table = Table(footer_line_data, colWidths=[7*inch])
-    footer_line_table.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (-1, 0), 1, colors.HexColor('#1b7ca8')),
-        ('TOPPADDING', (0, 0), (-1, -1), 0),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-    ]))
-    elements.append(footer_line_table)
-    
-    # Footer styles
-    footer_company_style = ParagraphStyle(
-        'FooterCompany',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#1b7ca8'),
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    footer_info_style = ParagraphStyle(
-        'FooterInfo',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.HexColor('#555555'),
-        alignment=TA_CENTER,
-        leading=12
-    )
-    
-    # Company name
-    elements.append(Paragraph("IT PAL TECHNOLOGY SOLUTIONS LTD", footer_company_style))
-    elements.append(Spacer(1, 0.05*inch))
-    
-    # Company details in organized lines
-    footer_line1 = "Reg. No.: HE482919 / T.I.C: 60254066D"
-    footer_line2 = "IBAN: LT41 3250 0726 5105 4093 &nbsp;&nbsp;|&nbsp;&nbsp; BIC: REVOLT21 &nbsp;&nbsp;|&nbsp;&nbsp; BANK: Revolut Bank UAB"
-    footer_line3 = "Tel: +357-97652017 &nbsp;&nbsp;|&nbsp;&nbsp; Email: finance@itpalsolutions.com &nbsp;&nbsp;|&nbsp;&nbsp; Website: www.itpalsolutions.com"
-    
-    elements.append(Paragraph(footer_line1, footer_info_style))
-    elements.append(Paragraph(footer_line2, footer_info_style))
-    elements.append(Paragraph(footer_line3, footer_info_style))
-    
-    doc.build(elements)
-    
-    pdf_url = upload_to_s3(filepath, filename)
-    
-    return pdf_url
+        body.append(Spacer(1, 0.3*inch))
+        body.append(Paragraph(f"<b>Notes:</b> {invoice.notes}", res.normal))
 
-def generate_quote_pdf(quote, db: Session) -> str:
-    os.makedirs("pdfs", exist_ok=True)
-    filename = f"quote_{quote.quote_number}.pdf"
-    filepath = os.path.join("pdfs", filename)
-    
-    doc = SimpleDocTemplate(filepath, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    logo_path = "static/logo.png"
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=2.5*inch, height=0.9*inch)
-        elements.append(logo)
-        elements.append(Spacer(1, 0.2*inch))
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1b7ca8'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
+    return title, body
+
+
+def quote_layout(quote, res: TemplateResources) -> tuple:
     # Change title based on status
     if quote.status.value == "draft":
-        title_text = "QUOTATION DRAFT"
-        elements.append(Paragraph(title_text, title_style))
+        title = _title(res, "QUOTATION DRAFT")
     elif quote.status.value == "cancelled" and quote.cancelled_at is not None:
         # Use red title for cancelled quotes (with verified metadata)
-        cancelled_title_style = ParagraphStyle(
-            'CancelledTitleStyle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.red,
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        elements.append(Paragraph("CANCELLED QUOTATION", cancelled_title_style))
+        title = _title(res, "CANCELLED QUOTATION", cancelled=True)
     else:
-        title_text = "QUOTATION"
-        elements.append(Paragraph(title_text, title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    
+        title = _title(res, "QUOTATION")
+
+    body = []
+
     info_data = [
         ["Quote Number:", quote.quote_number, "Issue Date:", quote.issue_date.strftime("%d-%m-%Y")],
         ["", "", "Valid Until:", quote.valid_until.strftime("%d-%m-%Y")]
     ]
-    
-    info_table = Table(info_data, colWidths=[1.5*inch, 2*inch, 1.5*inch, 2*inch])
-    info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    
-    elements.append(info_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
+    body.append(_info_table(res, info_data))
+    body.append(Spacer(1, 0.3*inch))
+
     # Build Quote For section with two columns - only show filled fields
     # Left column: Client name, Tel 1, Tel 2
     left_column = []
@@ -344,7 +552,7 @@ def generate_quote_pdf(quote, db: Session) -> str:
         left_column.append(f"Tel: {quote.telephone1}")
     if quote.telephone2:
         left_column.append(f"Tel 2: {quote.telephone2}")
-    
+
     # Right column: Company name, Email, Address
     right_column = []
     if quote.company_name:
@@ -353,196 +561,73 @@ def generate_quote_pdf(quote, db: Session) -> str:
         right_column.append(f"Email: {quote.client_email}")
     if quote.client_address:
         right_column.append(f"Address: {html.escape(quote.client_address)}")
-    
-    # Create two-column table for Quote For
-    quote_for_data = [["Quote For:", ""]]
-    max_rows = max(len(left_column), len(right_column))
-    for i in range(max_rows):
-        left_text = left_column[i] if i < len(left_column) else ""
-        right_text = right_column[i] if i < len(right_column) else ""
-        quote_for_data.append([left_text, right_text])
-    
-    client_table = Table(quote_for_data, colWidths=[3.5*inch, 3.5*inch])
-    client_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    
-    elements.append(client_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    line_items_data = [["Description", "Quantity", "Unit Price", "Total"]]
-    
-    for item in quote.line_items:
-        line_items_data.append([
+
+    body.append(_two_column_table(res, "Quote For:", left_column, right_column))
+    body.append(Spacer(1, 0.3*inch))
+
+    rows = [
+        [
             item.description,
             str(int(item.quantity)),
             f"€{item.unit_price:.2f}",
             f"€{item.total:.2f}"
-        ])
-    
-    line_items_table = Table(line_items_data, colWidths=[3.5*inch, 1*inch, 1.5*inch, 1.5*inch])
-    line_items_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1b7ca8')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    
-    elements.append(line_items_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
+        ]
+        for item in quote.line_items
+    ]
+    body.append(LineItemTables(
+        ["Description", "Quantity", "Unit Price", "Total"],
+        rows,
+        [3.5*inch, 1*inch, 1.5*inch, 1.5*inch],
+        res.quote_items_style
+    ))
+    body.append(Spacer(1, 0.3*inch))
+
     totals_data = [
         ["Subtotal:", f"€{quote.subtotal:.2f}"],
         ["VAT:", f"€{quote.tax:.2f}"],
         ["Total:", f"€{quote.total:.2f}"]
     ]
-    
-    totals_table = Table(totals_data, colWidths=[5.5*inch, 1.5*inch])
-    totals_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('LINEABOVE', (0, -1), (-1, -1), 2, colors.black),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    
-    elements.append(totals_table)
-    
+    body.append(_totals_table(res, totals_data))
+
     if quote.notes:
-        elements.append(Spacer(1, 0.3*inch))
-        elements.append(Paragraph(f"<b>Notes:</b> {quote.notes}", styles['Normal']))
-    
-    # Add footer with separator line
-    elements.append(Spacer(1, 0.5*inch))
-    
-    # Footer separator line
-    footer_line_data = [["" for _ in range(1)]]
-    footer_line_table = Table(footer_line_data, colWidths=[7*inch])
-    footer_line_table.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (-1, 0), 1, colors.HexColor('#1b7ca8')),
-        ('TOPPADDING', (0, 0), (-1, -1), 0),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-    ]))
-    elements.append(footer_line_table)
-    
-    # Footer styles
-    footer_company_style = ParagraphStyle(
-        'FooterCompany',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#1b7ca8'),
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    footer_info_style = ParagraphStyle(
-        'FooterInfo',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.HexColor('#555555'),
-        alignment=TA_CENTER,
-        leading=12
-    )
-    
-    # Company name
-    elements.append(Paragraph("IT PAL TECHNOLOGY SOLUTIONS LTD", footer_company_style))
-    elements.append(Spacer(1, 0.05*inch))
-    
-    # Company details in organized lines
-    footer_line1 = "Reg. No.: HE482919 / T.I.C: 60254066D"
-    footer_line2 = "IBAN: LT41 3250 0726 5105 4093 &nbsp;&nbsp;|&nbsp;&nbsp; BIC: REVOLT21 &nbsp;&nbsp;|&nbsp;&nbsp; BANK: Revolut Bank UAB"
-    footer_line3 = "Tel: +357-97652017 &nbsp;&nbsp;|&nbsp;&nbsp; Email: finance@itpalsolutions.com &nbsp;&nbsp;|&nbsp;&nbsp; Website: www.itpalsolutions.com"
-    
-    elements.append(Paragraph(footer_line1, footer_info_style))
-    elements.append(Paragraph(footer_line2, footer_info_style))
-    elements.append(Paragraph(footer_line3, footer_info_style))
-    
-    doc.build(elements)
-    
-    pdf_url = upload_to_s3(filepath, filename)
-    
-    return pdf_url
+        body.append(Spacer(1, 0.3*inch))
+        body.append(Paragraph(f"<b>Notes:</b> {quote.notes}", res.normal))
 
+    return title, body
 
-def generate_receipt_pdf(receipt, db: Session) -> str:
-    """Generate a PDF for a payment receipt."""
-    os.makedirs("pdfs", exist_ok=True)
-    filename = f"receipt_{receipt.receipt_number}.pdf"
-    filepath = os.path.join("pdfs", filename)
-    
-    doc = SimpleDocTemplate(filepath, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    logo_path = "static/logo.png"
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=2.5*inch, height=0.9*inch)
-        elements.append(logo)
-        elements.append(Spacer(1, 0.2*inch))
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1b7ca8'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
+
+PAYMENT_METHOD_LABELS = {
+    'cash': 'Cash',
+    'bank_transfer': 'Bank Transfer',
+    'card': 'Card',
+    'cheque': 'Cheque',
+    'other': 'Other'
+}
+
+def receipt_layout(receipt, res: TemplateResources, db: Session) -> tuple:
     if receipt.status.value == "draft":
-        title_text = "PAYMENT RECEIPT DRAFT"
-        elements.append(Paragraph(title_text, title_style))
+        title = _title(res, "PAYMENT RECEIPT DRAFT")
     elif receipt.status.value == "cancelled":
-        cancelled_title_style = ParagraphStyle(
-            'CancelledTitleStyle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.red,
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        elements.append(Paragraph("CANCELLED RECEIPT", cancelled_title_style))
+        title = _title(res, "CANCELLED RECEIPT", cancelled=True)
     else:
-        title_text = "PAYMENT RECEIPT"
-        elements.append(Paragraph(title_text, title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    
+        title = _title(res, "PAYMENT RECEIPT")
+
+    body = []
+
     receipt_date = receipt.receipt_date.strftime("%d-%m-%Y") if receipt.receipt_date else "N/A"
     info_data = [
         ["Receipt Number:", receipt.receipt_number, "Date:", receipt_date]
     ]
-    
-    payment_methods = {
-        'cash': 'Cash',
-        'bank_transfer': 'Bank Transfer',
-        'card': 'Card',
-        'cheque': 'Cheque',
-        'other': 'Other'
-    }
-    payment_method = payment_methods.get(receipt.payment_method, receipt.payment_method)
+
+    payment_method = PAYMENT_METHOD_LABELS.get(receipt.payment_method, receipt.payment_method)
     info_data.append(["Payment Method:", payment_method, "", ""])
-    
+
     if receipt.payment_reference:
         info_data.append(["Reference:", receipt.payment_reference, "", ""])
-    
-    info_table = Table(info_data, colWidths=[1.5*inch, 2*inch, 1.5*inch, 2*inch])
-    info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    
-    elements.append(info_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
+
+    body.append(_info_table(res, info_data))
+    body.append(Spacer(1, 0.3*inch))
+
     bill_to_fields = []
     if receipt.client_name:
         bill_to_fields.append(f"Client Name: {receipt.client_name}")
@@ -550,83 +635,34 @@ def generate_receipt_pdf(receipt, db: Session) -> str:
         bill_to_fields.append(f"Company Name: {receipt.company_name}")
     if receipt.telephone1:
         bill_to_fields.append(f"Tel: {receipt.telephone1}")
-    
+
     if bill_to_fields:
-        bill_to_header = ParagraphStyle(
-            'BillToHeader',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#1b7ca8'),
-            spaceAfter=10
-        )
-        elements.append(Paragraph("Received From:", bill_to_header))
+        body.append(Paragraph("Received From:", res.bill_to_header))
         for field in bill_to_fields:
-            elements.append(Paragraph(field, styles['Normal']))
-        elements.append(Spacer(1, 0.3*inch))
-    
-    amount_style = ParagraphStyle(
-        'AmountStyle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#155a7a'),
-        spaceAfter=20,
-        alignment=TA_CENTER
-    )
-    elements.append(Paragraph(f"Amount Received: EUR {receipt.amount:.2f}", amount_style))
-    elements.append(Spacer(1, 0.3*inch))
-    
+            body.append(Paragraph(field, res.normal))
+        body.append(Spacer(1, 0.3*inch))
+
+    body.append(Paragraph(f"Amount Received: EUR {receipt.amount:.2f}", res.amount))
+    body.append(Spacer(1, 0.3*inch))
+
     if receipt.invoice_id:
         from app.models.invoice import Invoice
         invoice = db.query(Invoice).filter(Invoice.id == receipt.invoice_id).first()
         if invoice:
-            elements.append(Paragraph(f"<b>For Invoice:</b> {invoice.invoice_number}", styles['Normal']))
-            elements.append(Spacer(1, 0.1*inch))
-    
+            body.append(Paragraph(f"<b>For Invoice:</b> {invoice.invoice_number}", res.normal))
+            body.append(Spacer(1, 0.1*inch))
+
     if receipt.notes:
-        elements.append(Paragraph(f"<b>Notes:</b> {html.escape(receipt.notes)}", styles['Normal']))
-    
-    elements.append(Spacer(1, 0.5*inch))
-    
-    footer_line_data = [["" for _ in range(1)]]
-    footer_line_table = Table(footer_line_data, colWidths=[7*inch])
-    footer_line_table.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (-1, 0), 1, colors.HexColor('#1b7ca8')),
-        ('TOPPADDING', (0, 0), (-1, -1), 0),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-    ]))
-    elements.append(footer_line_table)
-    
-    footer_company_style = ParagraphStyle(
-        'FooterCompany',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#1b7ca8'),
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    footer_info_style = ParagraphStyle(
-        'FooterInfo',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.HexColor('#555555'),
-        alignment=TA_CENTER,
-        leading=12
-    )
-    
-    elements.append(Paragraph("IT PAL TECHNOLOGY SOLUTIONS LTD", footer_company_style))
-    elements.append(Spacer(1, 0.05*inch))
-    
-    rcpt_footer1 = "Reg. No.: HE482919 / T.I.C: 60254066D"
-    rcpt_footer2 = "IBAN: LT41 3250 0726 5105 4093 &nbsp;&nbsp;|&nbsp;&nbsp; BIC: REVOLT21 &nbsp;&nbsp;|&nbsp;&nbsp; BANK: Revolut Bank UAB"
-    rcpt_footer3 = "Tel: +357-97652017 &nbsp;&nbsp;|&nbsp;&nbsp; Email: finance@itpalsolutions.com &nbsp;&nbsp;|&nbsp;&nbsp; Website: www.itpalsolutions.com"
-    
-    elements.append(Paragraph(rcpt_footer1, footer_info_style))
-    elements.append(Paragraph(rcpt_footer2, footer_info_style))
-    elements.append(Paragraph(rcpt_footer3, footer_info_style))
-    
-    doc.build(elements)
-    
-    pdf_url = upload_to_s3(filepath, filename)
-    
-    return pdf_url
+        body.append(Paragraph(f"<b>Notes:</b> {html.escape(receipt.notes)}", res.normal))
+
+    return title, body
+
+
+def build_invoice_pdf(invoice, db: Session) -> bytes:
+    return render_document_bytes(*invoice_layout(invoice, get_template_resources()))
+
+def build_quote_pdf(quote, db: Session) -> bytes:
+    return render_document_bytes(*quote_layout(quote, get_template_resources()))
+
+def build_receipt_pdf(receipt, db: Session) -> bytes:
+    return render_document_bytes(*receipt_layout(receipt, get_template_resources(), db))
@@ -0,0 +1,202 @@
+"""
+PDF storage backends.
+
+Rendered PDFs go to an S3-compatible bucket when one is configured, and to the
+local pdfs/ directory (served at /pdfs/) otherwise. The S3 backend holds one
+boto3 client for the whole process: its connection pool is reused by every
+upload and download, large files use threaded multipart transfer, and
+botocore retries transient failures with backoff. STORAGE_ENDPOINT_URL
+points the client at any S3 stand-in (MinIO, localstack) for offline runs.
+"""
+
+import os
+import tempfile
+from io import BytesIO
+from threading import Lock
+
+import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.config import settings
+
+LOCAL_ROOT = "pdfs"
+LOCAL_URL_PREFIX = "/pdfs/"
+
+# Files above the threshold are uploaded in parallel parts
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4,
+    use_threads=True
+)
+
+
+class StorageError(Exception):
+    pass
+
+
+def local_path(url: str) -> str:
+    """Filesystem path of a locally stored PDF, or None for remote URLs."""
+    if url and url.startswith(LOCAL_URL_PREFIX):
+        return os.path.join(LOCAL_ROOT, url[len(LOCAL_URL_PREFIX):])
+    return None
+
+
+class LocalStorage:
+    name = "local"
+
+    def put(self, key: str, data: bytes, content_type: str = "application/pdf") -> str:
+        os.makedirs(LOCAL_ROOT, exist_ok=True)
+        # Write next to the target and rename over it, so readers (and the /pdfs
+        # static mount) never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=LOCAL_ROOT, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, os.path.join(LOCAL_ROOT, key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return f"{LOCAL_URL_PREFIX}{key}"
+
+    def get(self, url: str) -> bytes:
+        path = local_path(url)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def delete(self, url: str):
+        path = local_path(url)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+    def close(self):
+        pass
+
+
+class S3Storage:
+    name = "s3"
+
+    def __init__(self, bucket: str, endpoint_url: str = None):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self._client = None
+        self._lock = Lock()
+
+    @property
+    def client(self):
+        # boto3 clients are thread-safe; build one and share its connection pool
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = boto3.session.Session().client(
+                        "s3",
+                        endpoint_url=self.endpoint_url or None,
+                        config=Config(
+                            max_pool_connections=settings.storage_max_connections,
+                            retries={"max_attempts": settings.storage_retries, "mode": "standard"}
+                        )
+                    )
+        return self._client
+
+    def url_for(self, key: str) -> str:
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+    def key_for(self, url: str) -> str:
+        prefix = self.url_for("")
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+    def _call(self, operation: str, call):
+        """Run an S3 call, already retried by botocore, and raise StorageError if it still fails."""
+        try:
+            return call()
+        except (ClientError, BotoCoreError, S3UploadFailedError) as e:
+            raise StorageError(f"S3 {operation} failed: {e}") from e
+
+    def put(self, key: str, data: bytes, content_type: str = "application/pdf") -> str:
+        self._call("upload", lambda: self.client.upload_fileobj(
+            BytesIO(data), self.bucket, key,
+            ExtraArgs={"ContentType": content_type},
+            Config=TRANSFER_CONFIG
+        ))
+        return self.url_for(key)
+
+    def get(self, url: str) -> bytes:
+        key = self.key_for(url)
+        if key is None:
+            return None
+        try:
+            return self._call("download", lambda: self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read())
+        except StorageError as e:
+            if isinstance(e.__cause__, ClientError):
+                code = e.__cause__.response.get("Error", {}).get("Code", "")
+                if code in ("NoSuchKey", "404"):
+                    return None
+            raise
+
+    def delete(self, url: str):
+        key = self.key_for(url)
+        if key is not None:
+            self._call("delete", lambda: self.client.delete_object(Bucket=self.bucket, Key=key))
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_storage = None
+_storage_lock = Lock()
+
+
+def get_storage():
+    """The configured backend, created once per process."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if settings.object_storage_bucket:
+                    _storage = S3Storage(settings.object_storage_bucket, settings.storage_endpoint_url)
+                else:
+                    _storage = LocalStorage()
+    return _storage
+
+
+def store_bytes(key: str, data: bytes, content_type: str = "application/pdf") -> str:
+    """Store data under key and return its URL. Raises StorageError when the upload fails."""
+    return get_storage().put(key, data, content_type)
+
+
+def load_bytes(url: str) -> bytes:
+    """Read back a stored file by URL. Returns None if it is gone."""
+    if local_path(url):
+        # Files written locally before a bucket was configured are still served
+        return LocalStorage().get(url)
+    return get_storage().get(url)
+
+
+def delete_bytes(url: str):
+    """Remove a stored file by URL; a file that is already gone is ignored."""
+    if local_path(url):
+        LocalStorage().delete(url)
+    else:
+        get_storage().delete(url)
+
+
+def close_storage():
+    """Release the client's connection pool."""
+    global _storage
+    with _storage_lock:
+        if _storage is not None:
+            _storage.close()
+            _storage = None
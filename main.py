@@ -5,7 +5,7 @@ from fastapi.responses import FileResponse, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 import os
 
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal
 from app.models.user import User
 from app.models.customer import Customer
 from app.models.invoice import Invoice, InvoiceLineItem
@@ -14,7 +14,19 @@ from app.models.email_log import EmailLog
 from app.models.project import Project, Milestone
 from app.models.receipt import PaymentReceipt
 from app.models.audit_log import AuditLog
-from app.routes import auth, invoices, quotes, users, customers, analytics, projects, receipts
+from app.models.revenue_rollup import RevenueRollup
+from app.models.document_sequence import DocumentSequence
+from app.models.pdf_job import PdfJob
+from app.models.pdf_cache import PdfCacheEntry, PdfCacheCounter
+from app.models.email_outbox import EmailOutbox
+from app.models.reminder_run import ReminderRun
+from app.routes import auth, invoices, quotes, users, customers, analytics, projects, receipts, dashboard, pdf_jobs, exports, reminders
+from app.services.pdf_jobs import resume_pdf_jobs, shutdown_pdf_workers
+from app.services.pdf_exports import shutdown_export_workers
+from app.services.rollups import backfill_rollups_if_empty
+from app.services.email_outbox import start_email_dispatcher, stop_email_dispatcher
+from app.utils.email_sender import close_email_transport
+from app.utils.storage import close_storage
 
 Base.metadata.create_all(bind=engine)
 
@@ -47,6 +59,28 @@ app.include_router(receipts.router, prefix="/api/receipts", tags=["Payment Recei
 app.include_router(customers.router, prefix="/api/customers", tags=["Customers"])
 app.include_router(projects.router, prefix="/api/projects", tags=["Projects"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(pdf_jobs.router, prefix="/api/pdf-jobs", tags=["PDF Jobs"])
+app.include_router(exports.router, prefix="/api/exports", tags=["Exports"])
+app.include_router(reminders.router, prefix="/api/reminders", tags=["Reminders"])
+
+@app.on_event("startup")
+def start_pdf_jobs():
+    db = SessionLocal()
+    try:
+        backfill_rollups_if_empty(db)
+    finally:
+        db.close()
+    resume_pdf_jobs()
+    start_email_dispatcher()
+
+@app.on_event("shutdown")
+def stop_pdf_jobs():
+    stop_email_dispatcher()
+    close_email_transport()
+    shutdown_pdf_workers()
+    shutdown_export_workers()
+    close_storage()
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.mount("/pdfs", StaticFiles(directory="pdfs"), name="pdfs")
@@ -0,0 +1,54 @@
+"""
+Migration script to add composite indexes backing the paginated, filterable
+document list endpoints:
+1. invoices: (user_id, status, id), (status, id), (customer_id, id), (project_id, id), (issue_date, id)
+2. quotes: (user_id, status, id), (status, id), (customer_id, id), (project_id, id), (issue_date, id)
+3. payment_receipts: (created_at, id), plus (status | customer_id | project_id | milestone_id, created_at, id)
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+INDEXES = [
+    ("ix_invoices_user_status_id", "invoices", "user_id, status, id"),
+    ("ix_invoices_status_id", "invoices", "status, id"),
+    ("ix_invoices_customer_id_id", "invoices", "customer_id, id"),
+    ("ix_invoices_project_id_id", "invoices", "project_id, id"),
+    ("ix_invoices_issue_date_id", "invoices", "issue_date, id"),
+    ("ix_quotes_user_status_id", "quotes", "user_id, status, id"),
+    ("ix_quotes_status_id", "quotes", "status, id"),
+    ("ix_quotes_customer_id_id", "quotes", "customer_id, id"),
+    ("ix_quotes_project_id_id", "quotes", "project_id, id"),
+    ("ix_quotes_issue_date_id", "quotes", "issue_date, id"),
+    ("ix_payment_receipts_created_at_id", "payment_receipts", "created_at, id"),
+    ("ix_payment_receipts_status_created_at_id", "payment_receipts", "status, created_at, id"),
+    ("ix_payment_receipts_customer_created_at_id", "payment_receipts", "customer_id, created_at, id"),
+    ("ix_payment_receipts_project_created_at_id", "payment_receipts", "project_id, created_at, id"),
+    ("ix_payment_receipts_milestone_created_at_id", "payment_receipts", "milestone_id, created_at, id"),
+]
+
+def run_migration():
+    engine = create_engine(DATABASE_URL)
+    
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            for index_name, table_name, columns in INDEXES:
+                print(f"Creating index {index_name} on {table_name}({columns})...")
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table_name} ({columns});"
+                ))
+            
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            print(f"Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    run_migration()
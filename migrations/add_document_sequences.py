@@ -0,0 +1,59 @@
+"""
+Create the document_sequences table and seed it from the numbers already in use,
+so the allocator continues each (doc type, year) sequence after existing data.
+
+Safe to re-run: a sequence is only ever moved forward.
+    python migrations/add_document_sequences.py
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import engine, SessionLocal
+from app.models.document_sequence import DocumentSequence
+from app.services.numbering import PREFIXES, NUMBER_COLUMNS
+
+def run_migration():
+    print("Creating document_sequences table...")
+    DocumentSequence.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        for doc_type, prefix in PREFIXES.items():
+            column = NUMBER_COLUMNS[doc_type]
+            highest = {}
+            for (number,) in db.query(column).filter(column.like(f"{prefix}-%")).yield_per(5000):
+                try:
+                    _, year, value = number.split("-")
+                    year, value = int(year), int(value)
+                except (ValueError, AttributeError):
+                    print(f"  Skipping unparseable {doc_type.value} number: {number}")
+                    continue
+                highest[year] = max(highest.get(year, 0), value)
+            
+            for year, value in sorted(highest.items()):
+                stmt = insert(DocumentSequence).values(
+                    doc_type=doc_type.value, year=year, last_value=value
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["doc_type", "year"],
+                    set_={"last_value": func.greatest(DocumentSequence.last_value, stmt.excluded.last_value)}
+                )
+                db.execute(stmt)
+                print(f"  {prefix}-{year}: continuing after {value:06d}")
+        
+        db.commit()
+        print("Document sequences seeded successfully!")
+    except Exception as e:
+        db.rollback()
+        print(f"Seeding document sequences failed: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_migration()
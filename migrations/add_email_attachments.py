@@ -0,0 +1,40 @@
+"""
+Migration script to add:
+1. attachment_url and attachment_name columns to email_outbox
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def run_migration():
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        conn.execute(text("BEGIN;"))
+        
+        try:
+            print("Adding attachment_url column to email_outbox...")
+            conn.execute(text("""
+                ALTER TABLE email_outbox ADD COLUMN IF NOT EXISTS attachment_url VARCHAR;
+            """))
+            
+            print("Adding attachment_name column to email_outbox...")
+            conn.execute(text("""
+                ALTER TABLE email_outbox ADD COLUMN IF NOT EXISTS attachment_name VARCHAR;
+            """))
+            
+            conn.execute(text("COMMIT;"))
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            conn.execute(text("ROLLBACK;"))
+            print(f"Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    run_migration()
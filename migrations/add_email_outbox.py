@@ -0,0 +1,88 @@
+"""
+Migration script to add:
+1. delivery_status and delivery_error columns to email_logs
+2. email_outbox table for the background email dispatcher
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def run_migration():
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        conn.execute(text("BEGIN;"))
+        
+        try:
+            print("Creating emaildeliverystatus enum...")
+            conn.execute(text("""
+                DO $$ BEGIN
+                    CREATE TYPE emaildeliverystatus AS ENUM ('queued', 'sent', 'failed');
+                EXCEPTION
+                    WHEN duplicate_object THEN null;
+                END $$;
+            """))
+            
+            print("Creating outboxstatus enum...")
+            conn.execute(text("""
+                DO $$ BEGIN
+                    CREATE TYPE outboxstatus AS ENUM ('pending', 'sending', 'sent', 'failed');
+                EXCEPTION
+                    WHEN duplicate_object THEN null;
+                END $$;
+            """))
+            
+            # Emails logged before the outbox existed were sent synchronously
+            print("Adding delivery_status column to email_logs...")
+            conn.execute(text("""
+                ALTER TABLE email_logs ADD COLUMN IF NOT EXISTS delivery_status emaildeliverystatus NOT NULL DEFAULT 'sent';
+            """))
+            
+            print("Adding delivery_error column to email_logs...")
+            conn.execute(text("""
+                ALTER TABLE email_logs ADD COLUMN IF NOT EXISTS delivery_error TEXT;
+            """))
+            
+            print("Creating email_outbox table...")
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS email_outbox (
+                    id SERIAL PRIMARY KEY,
+                    email_log_id INTEGER REFERENCES email_logs(id),
+                    sender_email VARCHAR NOT NULL,
+                    sender_name VARCHAR,
+                    recipient_email VARCHAR NOT NULL,
+                    recipient_name VARCHAR,
+                    subject VARCHAR NOT NULL,
+                    html_content TEXT NOT NULL,
+                    status outboxstatus NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    last_error TEXT,
+                    provider_message_id VARCHAR,
+                    created_at TIMESTAMP DEFAULT NOW(),
+                    claimed_at TIMESTAMP,
+                    sent_at TIMESTAMP
+                );
+            """))
+            
+            print("Creating indexes on email_outbox...")
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_email_outbox_id ON email_outbox(id);
+                CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next_attempt ON email_outbox(status, next_attempt_at);
+            """))
+            
+            conn.execute(text("COMMIT;"))
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            conn.execute(text("ROLLBACK;"))
+            print(f"Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,80 @@
+"""
+Migration script to add:
+1. reminder value to the emailtype enum
+2. reminder_runs table
+3. reminder_run_id column to email_outbox
+4. (status, due_date) index on invoices for the overdue scan
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def run_migration():
+    engine = create_engine(DATABASE_URL)
+    
+    # ALTER TYPE ... ADD VALUE and CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Adding reminder value to emailtype enum...")
+            conn.execute(text("ALTER TYPE emailtype ADD VALUE IF NOT EXISTS 'reminder';"))
+            
+            print("Creating reminderrunstatus enum...")
+            conn.execute(text("""
+                DO $$ BEGIN
+                    CREATE TYPE reminderrunstatus AS ENUM ('queued', 'running', 'completed', 'failed');
+                EXCEPTION
+                    WHEN duplicate_object THEN null;
+                END $$;
+            """))
+            
+            print("Creating reminder_runs table...")
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS reminder_runs (
+                    id SERIAL PRIMARY KEY,
+                    status reminderrunstatus NOT NULL DEFAULT 'queued',
+                    dry_run BOOLEAN NOT NULL DEFAULT FALSE,
+                    as_of TIMESTAMP NOT NULL,
+                    min_days_overdue INTEGER NOT NULL DEFAULT 0,
+                    message TEXT,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    rendered INTEGER NOT NULL DEFAULT 0,
+                    queued_emails INTEGER NOT NULL DEFAULT 0,
+                    skipped INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    preview JSON,
+                    errors JSON,
+                    error TEXT,
+                    requested_by INTEGER REFERENCES users(id),
+                    created_at TIMESTAMP DEFAULT NOW(),
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP
+                );
+            """))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_reminder_runs_id ON reminder_runs(id);"))
+            
+            print("Adding reminder_run_id column to email_outbox...")
+            conn.execute(text("""
+                ALTER TABLE email_outbox ADD COLUMN IF NOT EXISTS reminder_run_id INTEGER REFERENCES reminder_runs(id);
+            """))
+            conn.execute(text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_email_outbox_reminder_run_id ON email_outbox (reminder_run_id);"
+            ))
+            
+            print("Creating index ix_invoices_status_due_date on invoices(status, due_date)...")
+            conn.execute(text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_invoices_status_due_date ON invoices (status, due_date);"
+            ))
+            
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            print(f"Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    run_migration()
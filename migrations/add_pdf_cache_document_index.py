@@ -0,0 +1,33 @@
+"""
+Migration script to add:
+1. ix_pdf_cache_entries_document on pdf_cache_entries (document_type, document_id)
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def run_migration():
+    engine = create_engine(DATABASE_URL)
+    
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating index ix_pdf_cache_entries_document on pdf_cache_entries(document_type, document_id)...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pdf_cache_entries_document
+                ON pdf_cache_entries (document_type, document_id);
+            """))
+            
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            print(f"Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,35 @@
+"""
+Migration script to add:
+1. content_hash column to pdf_jobs
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def run_migration():
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        conn.execute(text("BEGIN;"))
+        
+        try:
+            print("Adding content_hash column to pdf_jobs...")
+            conn.execute(text("""
+                ALTER TABLE pdf_jobs ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+            """))
+            
+            conn.execute(text("COMMIT;"))
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            conn.execute(text("ROLLBACK;"))
+            print(f"Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    run_migration()
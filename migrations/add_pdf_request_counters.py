@@ -0,0 +1,40 @@
+"""
+Migration script to add:
+1. served_ready and rendered_on_request columns to pdf_cache_counters
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def run_migration():
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        conn.execute(text("BEGIN;"))
+        
+        try:
+            print("Adding served_ready column to pdf_cache_counters...")
+            conn.execute(text("""
+                ALTER TABLE pdf_cache_counters ADD COLUMN IF NOT EXISTS served_ready INTEGER NOT NULL DEFAULT 0;
+            """))
+            
+            print("Adding rendered_on_request column to pdf_cache_counters...")
+            conn.execute(text("""
+                ALTER TABLE pdf_cache_counters ADD COLUMN IF NOT EXISTS rendered_on_request INTEGER NOT NULL DEFAULT 0;
+            """))
+            
+            conn.execute(text("COMMIT;"))
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            conn.execute(text("ROLLBACK;"))
+            print(f"Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,37 @@
+"""
+Create the revenue_rollups table (if missing) and reconcile it against the
+invoices and payment_receipts tables.
+
+Safe to re-run at any time, e.g. after a manual data fix:
+    python migrations/rebuild_revenue_rollups.py [batch_size]
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine, SessionLocal
+from app.models.revenue_rollup import RevenueRollup
+from app.services.rollups import rebuild_rollups
+
+def run_migration(batch_size: int = 5000):
+    print("Creating revenue_rollups table...")
+    RevenueRollup.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        print(f"Reconciling revenue rollups in batches of {batch_size}...")
+        summary = rebuild_rollups(db, batch_size=batch_size)
+        print(
+            f"Rollups reconciled: {summary['created']} created, {summary['updated']} updated, "
+            f"{summary['deleted']} deleted, {summary['unchanged']} unchanged"
+        )
+    except Exception as e:
+        db.rollback()
+        print(f"Rollup rebuild failed: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_migration(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
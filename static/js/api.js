@@ -43,6 +43,46 @@ async function handleResponse(response) {
     return data;
 }
 
+function buildQuery(params = {}) {
+    const search = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+            search.append(key, value);
+        }
+    });
+    const query = search.toString();
+    return query ? `?${query}` : '';
+}
+
+// The server caps each wait at 5 seconds; keep polling for up to 5 minutes
+const PDF_JOB_WAIT_SECONDS = 5;
+const PDF_JOB_MAX_POLLS = 60;
+
+async function waitForPdfJob(jobId) {
+    for (let i = 0; i < PDF_JOB_MAX_POLLS; i++) {
+        const response = await fetch(`${API_BASE}/pdf-jobs/${jobId}?wait=${PDF_JOB_WAIT_SECONDS}`, {
+            headers: getHeaders(),
+        });
+        const job = await handleResponse(response);
+        if (job.status === 'completed') {
+            return job;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'PDF job failed');
+        }
+    }
+    throw new Error('PDF job is taking too long, please try again later');
+}
+
+// Endpoints that queue a background job answer 202 with a job_id; resolve to the finished job
+async function handlePdfJobResponse(response) {
+    const data = await handleResponse(response);
+    if (data.job_id) {
+        return waitForPdfJob(data.job_id);
+    }
+    return data;
+}
+
 const api = {
     async register(email, password, role = 'user') {
         const response = await fetch(`${API_BASE}/auth/register`, {
@@ -73,8 +113,16 @@ const api = {
         return handleResponse(response);
     },
     
-    async getInvoices() {
-        const response = await fetch(`${API_BASE}/invoices`, {
+    async getDashboardSummary(recent = 5) {
+        const response = await fetch(`${API_BASE}/dashboard/summary?recent=${recent}`, {
+            headers: getHeaders(),
+        });
+        return handleResponse(response);
+    },
+    
+    async getInvoices(params = {}) {
+        const query = buildQuery(params);
+        const response = await fetch(`${API_BASE}/invoices${query}`, {
             headers: getHeaders(),
         });
         return handleResponse(response);
@@ -138,7 +186,7 @@ const api = {
             method: 'POST',
             headers: getHeaders(),
         });
-        return handleResponse(response);
+        return handlePdfJobResponse(response);
     },
     
     async sendInvoiceEmail(id, recipientEmail, message, subject) {
@@ -147,11 +195,12 @@ const api = {
             headers: getHeaders(),
             body: JSON.stringify({ recipient_email: recipientEmail, subject: subject || 'Invoice', message }),
         });
-        return handleResponse(response);
+        return handlePdfJobResponse(response);
     },
     
-    async getQuotes() {
-        const response = await fetch(`${API_BASE}/quotes`, {
+    async getQuotes(params = {}) {
+        const query = buildQuery(params);
+        const response = await fetch(`${API_BASE}/quotes${query}`, {
             headers: getHeaders(),
         });
         return handleResponse(response);
@@ -215,7 +264,7 @@ const api = {
             method: 'POST',
             headers: getHeaders(),
         });
-        return handleResponse(response);
+        return handlePdfJobResponse(response);
     },
     
     async sendQuoteEmail(id, recipientEmail, message, subject) {
@@ -224,7 +273,15 @@ const api = {
             headers: getHeaders(),
             body: JSON.stringify({ recipient_email: recipientEmail, subject: subject || 'Quote', message }),
         });
-        return handleResponse(response);
+        return handlePdfJobResponse(response);
+    },
+    
+    async generateReceiptPDF(id) {
+        const response = await fetch(`${API_BASE}/receipts/${id}/generate-pdf`, {
+            method: 'POST',
+            headers: getHeaders(),
+        });
+        return handlePdfJobResponse(response);
     },
     
     async getCustomerEmailHistory(customerId) {
@@ -472,7 +472,13 @@ function renderEmailHistory() {
         
         const typeBadge = log.email_type === 'invoice' 
             ? '<span class="badge bg-primary">Invoice</span>'
-            : '<span class="badge bg-info">Quote</span>';
+            : log.email_type === 'reminder'
+                ? '<span class="badge bg-warning text-dark">Reminder</span>'
+                : '<span class="badge bg-info">Quote</span>';
+        
+        const deliveryBadge = log.delivery_status === 'failed'
+            ? ' <span class="badge bg-danger" title="' + (log.delivery_error || '').replace(/"/g, '&quot;') + '">Failed</span>'
+            : log.delivery_status === 'queued' ? ' <span class="badge bg-secondary">Queued</span>' : '';
         
         const documentNumber = log.document_number || '-';
         const amount = log.total_amount !== null ? `${log.total_amount.toFixed(2)}` : '-';
@@ -480,7 +486,7 @@ function renderEmailHistory() {
         return `
         <tr>
             <td>${formattedDate}<br><small class="text-muted">${formattedTime}</small></td>
-            <td>${typeBadge}</td>
+            <td>${typeBadge}${deliveryBadge}</td>
             <td><strong>${documentNumber}</strong></td>
             <td>${log.recipient_email}</td>
             <td><small>${log.subject ? (log.subject.length > 30 ? log.subject.substring(0, 30) + '...' : log.subject) : '-'}</small></td>
@@ -3,6 +3,9 @@ if (!checkAuth()) {
 }
 
 let invoices = [];
+let nextInvoiceCursor = null;
+let invoiceSearch = '';
+const INVOICE_PAGE_SIZE = 50;
 let currentInvoice = null;
 let editingInvoiceId = null;
 let projects = [];
@@ -21,13 +24,51 @@ function formatDate(dateString) {
 
 async function loadInvoices() {
     try {
-        invoices = await api.getInvoices();
+        const page = await api.getInvoices({ limit: INVOICE_PAGE_SIZE, q: invoiceSearch });
+        invoices = page.items;
+        nextInvoiceCursor = page.next_cursor;
         renderInvoices();
+        updateLoadMoreButton();
     } catch (error) {
         showError('Error loading invoices: ' + error.message);
     }
 }
 
+async function loadMoreInvoices() {
+    if (!nextInvoiceCursor) return;
+    
+    try {
+        const page = await api.getInvoices({ limit: INVOICE_PAGE_SIZE, cursor: nextInvoiceCursor, q: invoiceSearch });
+        invoices = invoices.concat(page.items);
+        nextInvoiceCursor = page.next_cursor;
+        renderInvoices();
+        updateLoadMoreButton();
+    } catch (error) {
+        showError('Error loading invoices: ' + error.message);
+    }
+}
+
+// Actions update the affected row in place, so pages added with "Load more" stay loaded
+function updateInvoiceInList(updated) {
+    const index = invoices.findIndex(inv => inv.id === updated.id);
+    if (index !== -1) {
+        invoices[index] = { ...invoices[index], ...updated };
+        renderInvoices();
+    }
+}
+
+function removeInvoiceFromList(invoiceId) {
+    invoices = invoices.filter(inv => inv.id !== invoiceId);
+    renderInvoices();
+}
+
+function updateLoadMoreButton() {
+    const button = document.getElementById('loadMoreInvoices');
+    if (button) {
+        button.style.display = nextInvoiceCursor ? 'inline-block' : 'none';
+    }
+}
+
 async function loadCustomers() {
     if (customersLoadPromise) return customersLoadPromise;
     
@@ -568,7 +609,12 @@ document.getElementById('createForm').addEventListener('submit', async (e) => {
         const modal = bootstrap.Modal.getInstance(document.getElementById('createModal'));
         modal.hide();
         
-        loadInvoices();
+        if (isEditing) {
+            updateInvoiceInList(invoice);
+        } else {
+            invoices.unshift(invoice);
+            renderInvoices();
+        }
         
         if (action === 'issued' && !isEditing) {
             setTimeout(() => generatePDF(invoice.id), 500);
@@ -599,9 +645,8 @@ async function generateOrPreviewPDF(invoiceId, action = 'preview') {
         showSuccess('Generating PDF...');
         const result = await api.generateInvoicePDF(invoiceId);
         
+        updateInvoiceInList({ id: invoiceId, pdf_url: result.pdf_url });
         showPDFPreview(result.pdf_url, invoice.invoice_number);
-        
-        loadInvoices();
     } catch (error) {
         showError('Error generating PDF: ' + error.message);
     }
@@ -638,9 +683,8 @@ async function openEmailModal(invoiceId) {
         );
         if (confirmed) {
             await generateOrPreviewPDF(invoiceId, 'generate');
-            await new Promise(resolve => setTimeout(resolve, 1000));
             currentInvoice = invoices.find(inv => inv.id === invoiceId);
-            if (!currentInvoice.pdf_url) {
+            if (!currentInvoice || !currentInvoice.pdf_url) {
                 showError('Failed to generate PDF');
                 return;
             }
@@ -685,13 +729,15 @@ document.getElementById('emailForm').addEventListener('submit', async (e) => {
     if (!confirmed) return;
     
     try {
-        await api.sendInvoiceEmail(currentInvoice.id, recipientEmail, message, subject);
+        const result = await api.sendInvoiceEmail(currentInvoice.id, recipientEmail, message, subject);
         showSuccess('Email sent successfully');
         
         const modal = bootstrap.Modal.getInstance(document.getElementById('emailModal'));
         modal.hide();
         
-        loadInvoices();
+        if (result.pdf_url) {
+            updateInvoiceInList({ id: currentInvoice.id, pdf_url: result.pdf_url });
+        }
     } catch (error) {
         showError('Error sending email: ' + error.message);
     }
@@ -818,7 +864,7 @@ async function deleteInvoice(invoiceId) {
     try {
         await api.deleteInvoice(invoiceId);
         showSuccess('Invoice deleted successfully');
-        loadInvoices();
+        removeInvoiceFromList(invoiceId);
     } catch (error) {
         showError('Error deleting invoice: ' + error.message);
     }
@@ -876,13 +922,13 @@ document.getElementById('confirmCancelBtn').addEventListener('click', async func
     }
     
     try {
-        await api.cancelInvoice(invoiceId, reason);
+        const invoice = await api.cancelInvoice(invoiceId, reason);
         showSuccess('Invoice cancelled successfully');
         
         const modal = bootstrap.Modal.getInstance(document.getElementById('cancelModal'));
         modal.hide();
         
-        loadInvoices();
+        updateInvoiceInList(invoice);
     } catch (error) {
         showError('Error cancelling invoice: ' + error.message);
     }
@@ -969,9 +1015,9 @@ async function markAsIssued(invoiceId) {
     if (!confirmed) return;
     
     try {
-        await api.issueInvoice(invoiceId);
+        const issued = await api.issueInvoice(invoiceId);
         showSuccess('Invoice marked as issued successfully');
-        loadInvoices();
+        updateInvoiceInList(issued);
     } catch (error) {
         showError('Error marking invoice as issued: ' + error.message);
     }
@@ -986,23 +1032,14 @@ async function markAsIssuedFromModal() {
     await markAsIssued(editingInvoiceId);
 }
 
-// Search functionality
+// Search runs on the server so it covers every invoice, not just the loaded pages
+let searchTimeout;
 document.getElementById('searchInput').addEventListener('input', (e) => {
-    const searchTerm = e.target.value.toLowerCase().trim();
-    
-    if (!searchTerm) {
-        renderInvoices(invoices);
-        return;
-    }
-    
-    const filteredInvoices = invoices.filter(invoice => {
-        return invoice.invoice_number.toLowerCase().includes(searchTerm) ||
-               (invoice.client_name && invoice.client_name.toLowerCase().includes(searchTerm)) ||
-               (invoice.company_name && invoice.company_name.toLowerCase().includes(searchTerm)) ||
-               (invoice.telephone1 && invoice.telephone1.includes(searchTerm));
-    });
-    
-    renderInvoices(filteredInvoices);
+    clearTimeout(searchTimeout);
+    searchTimeout = setTimeout(() => {
+        invoiceSearch = e.target.value.trim();
+        loadInvoices();
+    }, 300);
 });
 
 async function loadProjects() {
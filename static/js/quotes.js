@@ -3,6 +3,9 @@ if (!checkAuth()) {
 }
 
 let quotes = [];
+let nextQuoteCursor = null;
+let quoteSearch = '';
+const QUOTE_PAGE_SIZE = 50;
 let currentQuote = null;
 let editingQuoteId = null;
 let customers = [];
@@ -19,13 +22,51 @@ function formatDate(dateString) {
 
 async function loadQuotes() {
     try {
-        quotes = await api.getQuotes();
+        const page = await api.getQuotes({ limit: QUOTE_PAGE_SIZE, q: quoteSearch });
+        quotes = page.items;
+        nextQuoteCursor = page.next_cursor;
         renderQuotes();
+        updateLoadMoreButton();
     } catch (error) {
         showError('Error loading quotes: ' + error.message);
     }
 }
 
+async function loadMoreQuotes() {
+    if (!nextQuoteCursor) return;
+    
+    try {
+        const page = await api.getQuotes({ limit: QUOTE_PAGE_SIZE, cursor: nextQuoteCursor, q: quoteSearch });
+        quotes = quotes.concat(page.items);
+        nextQuoteCursor = page.next_cursor;
+        renderQuotes();
+        updateLoadMoreButton();
+    } catch (error) {
+        showError('Error loading quotes: ' + error.message);
+    }
+}
+
+// Actions update the affected row in place, so pages added with "Load more" stay loaded
+function updateQuoteInList(updated) {
+    const index = quotes.findIndex(q => q.id === updated.id);
+    if (index !== -1) {
+        quotes[index] = { ...quotes[index], ...updated };
+        renderQuotes();
+    }
+}
+
+function removeQuoteFromList(quoteId) {
+    quotes = quotes.filter(q => q.id !== quoteId);
+    renderQuotes();
+}
+
+function updateLoadMoreButton() {
+    const button = document.getElementById('loadMoreQuotes');
+    if (button) {
+        button.style.display = nextQuoteCursor ? 'inline-block' : 'none';
+    }
+}
+
 async function loadCustomers() {
     if (customersLoadPromise) return customersLoadPromise;
     
@@ -537,18 +578,25 @@ document.getElementById('createForm').addEventListener('submit', async (e) => {
     };
     
     try {
-        if (editingQuoteId) {
-            await api.updateQuote(editingQuoteId, data);
+        const isEditing = editingQuoteId !== null;
+        let quote;
+        if (isEditing) {
+            quote = await api.updateQuote(editingQuoteId, data);
             showSuccess('Quote updated successfully');
         } else {
-            await api.createQuote(data);
+            quote = await api.createQuote(data);
             showSuccess('Quote created successfully');
         }
         
         const modal = bootstrap.Modal.getInstance(document.getElementById('createModal'));
         modal.hide();
         
-        loadQuotes();
+        if (isEditing) {
+            updateQuoteInList(quote);
+        } else {
+            quotes.unshift(quote);
+            renderQuotes();
+        }
     } catch (error) {
         showError('Error ' + (editingQuoteId ? 'updating' : 'creating') + ' quote: ' + error.message);
     }
@@ -566,7 +614,7 @@ async function convertToInvoice(quoteId) {
     try {
         const result = await api.convertQuoteToInvoice(quoteId);
         showSuccess('Quote converted to invoice successfully');
-        loadQuotes();
+        updateQuoteInList({ id: quoteId, status: 'invoiced' });
         
         setTimeout(() => {
             window.location.href = '/invoices';
@@ -597,9 +645,8 @@ async function generateOrPreviewPDF(quoteId, action = 'preview') {
         showSuccess('Generating PDF...');
         const result = await api.generateQuotePDF(quoteId);
         
+        updateQuoteInList({ id: quoteId, pdf_url: result.pdf_url });
         showPDFPreview(result.pdf_url, quote.quote_number);
-        
-        loadQuotes();
     } catch (error) {
         showError('Error generating PDF: ' + error.message);
     }
@@ -636,9 +683,8 @@ async function openEmailModal(quoteId) {
         );
         if (confirmed) {
             await generateOrPreviewPDF(quoteId, 'generate');
-            await new Promise(resolve => setTimeout(resolve, 1000));
             currentQuote = quotes.find(q => q.id === quoteId);
-            if (!currentQuote.pdf_url) {
+            if (!currentQuote || !currentQuote.pdf_url) {
                 showError('Failed to generate PDF');
                 return;
             }
@@ -685,13 +731,15 @@ document.getElementById('emailForm').addEventListener('submit', async (e) => {
     if (!confirmed) return;
     
     try {
-        await api.sendQuoteEmail(currentQuote.id, recipientEmail, message, subject);
+        const result = await api.sendQuoteEmail(currentQuote.id, recipientEmail, message, subject);
         showSuccess('Email sent successfully');
         
         const modal = bootstrap.Modal.getInstance(document.getElementById('emailModal'));
         modal.hide();
         
-        loadQuotes();
+        if (result.pdf_url) {
+            updateQuoteInList({ id: currentQuote.id, pdf_url: result.pdf_url });
+        }
     } catch (error) {
         showError('Error sending email: ' + error.message);
     }
@@ -699,12 +747,20 @@ document.getElementById('emailForm').addEventListener('submit', async (e) => {
 
 async function editQuote(quoteId) {
     editingQuoteId = quoteId;
-    const quote = quotes.find(q => q.id === quoteId);
-    if (!quote) {
+    if (!quotes.find(q => q.id === quoteId)) {
         showError('Quote not found');
         return;
     }
     
+    // The list is loaded without line items; fetch the full quote for editing
+    let quote;
+    try {
+        quote = await api.getQuote(quoteId);
+    } catch (error) {
+        showError('Error loading quote: ' + error.message);
+        return;
+    }
+    
     if (quote.status !== 'draft') {
         showError('Only draft quotes can be edited');
         return;
@@ -789,7 +845,7 @@ async function deleteQuote(quoteId) {
     try {
         await api.deleteQuote(quoteId);
         showSuccess('Quote deleted successfully');
-        loadQuotes();
+        removeQuoteFromList(quoteId);
     } catch (error) {
         showError('Error deleting quote: ' + error.message);
     }
@@ -847,13 +903,13 @@ document.getElementById('confirmCancelBtn').addEventListener('click', async func
     }
     
     try {
-        await api.cancelQuote(quoteId, reason);
+        const cancelled = await api.cancelQuote(quoteId, reason);
         showSuccess('Quote cancelled successfully');
         
         const modal = bootstrap.Modal.getInstance(document.getElementById('cancelModal'));
         modal.hide();
         
-        loadQuotes();
+        updateQuoteInList(cancelled);
     } catch (error) {
         showError('Error cancelling quote: ' + error.message);
     }
@@ -879,12 +935,12 @@ async function markAsIssued(quoteId) {
     if (!confirmed) return;
     
     try {
-        await api.updateQuote(quoteId, { 
+        const issued = await api.updateQuote(quoteId, { 
             status: 'issued',
             telephone1: quote.telephone1
         });
         showSuccess('Quote marked as issued successfully');
-        loadQuotes();
+        updateQuoteInList(issued);
     } catch (error) {
         showError('Error marking quote as issued: ' + error.message);
     }
@@ -945,23 +1001,14 @@ function showSuccess(message) {
     toast.show();
 }
 
-// Search functionality
+// Search runs on the server so it covers every quote, not just the loaded pages
+let searchTimeout;
 document.getElementById('searchInput').addEventListener('input', (e) => {
-    const searchTerm = e.target.value.toLowerCase().trim();
-    
-    if (!searchTerm) {
-        renderQuotes(quotes);
-        return;
-    }
-    
-    const filteredQuotes = quotes.filter(quote => {
-        return quote.quote_number.toLowerCase().includes(searchTerm) ||
-               (quote.client_name && quote.client_name.toLowerCase().includes(searchTerm)) ||
-               (quote.company_name && quote.company_name.toLowerCase().includes(searchTerm)) ||
-               (quote.telephone1 && quote.telephone1.includes(searchTerm));
-    });
-    
-    renderQuotes(filteredQuotes);
+    clearTimeout(searchTimeout);
+    searchTimeout = setTimeout(() => {
+        quoteSearch = e.target.value.trim();
+        loadQuotes();
+    }, 300);
 });
 
 loadQuotes();
@@ -2,11 +2,12 @@ let allReceipts = [];
 let allCustomers = [];
 let allInvoices = [];
 let allProjects = [];
+let nextReceiptCursor = null;
+const RECEIPT_PAGE_SIZE = 100;
 
 document.addEventListener('DOMContentLoaded', function() {
     loadReceipts();
     loadCustomers();
-    loadInvoices();
     loadProjects();
     
     document.getElementById('searchInput').addEventListener('input', filterReceipts);
@@ -18,19 +19,50 @@ document.addEventListener('DOMContentLoaded', function() {
 
 async function loadReceipts() {
     try {
-        const response = await fetch('/api/receipts/', {
-            headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-        });
-        
-        if (!response.ok) throw new Error('Failed to load receipts');
-        
-        allReceipts = await response.json();
-        displayReceipts(allReceipts);
+        const page = await fetchReceiptsPage(null);
+        allReceipts = page.items;
+        nextReceiptCursor = page.next_cursor;
+        filterReceipts();
+        updateLoadMoreButton();
     } catch (error) {
         showError(error.message);
     }
 }
 
+async function loadMoreReceipts() {
+    if (!nextReceiptCursor) return;
+    
+    try {
+        const page = await fetchReceiptsPage(nextReceiptCursor);
+        allReceipts = allReceipts.concat(page.items);
+        nextReceiptCursor = page.next_cursor;
+        filterReceipts();
+        updateLoadMoreButton();
+    } catch (error) {
+        showError(error.message);
+    }
+}
+
+async function fetchReceiptsPage(cursor) {
+    const params = new URLSearchParams({ limit: RECEIPT_PAGE_SIZE });
+    if (cursor) params.append('cursor', cursor);
+    
+    const response = await fetch(`/api/receipts/?${params.toString()}`, {
+        headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
+    });
+    
+    if (!response.ok) throw new Error('Failed to load receipts');
+    
+    return response.json();
+}
+
+function updateLoadMoreButton() {
+    const button = document.getElementById('loadMoreReceipts');
+    if (button) {
+        button.style.display = nextReceiptCursor ? 'inline-block' : 'none';
+    }
+}
+
 async function loadCustomers() {
     try {
         const response = await fetch('/api/customers', {
@@ -46,15 +78,33 @@ async function loadCustomers() {
     }
 }
 
-async function loadInvoices() {
+async function loadInvoices(customer) {
+    allInvoices = [];
+    if (!customer) return;
+    
     try {
-        const response = await fetch('/api/invoices', {
-            headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-        });
-        
-        if (!response.ok) throw new Error('Failed to load invoices');
-        
-        allInvoices = await response.json();
+        let cursor = null;
+        do {
+            // Issued invoices linked to the customer by id or phone that have no receipt yet
+            const params = new URLSearchParams({
+                customer_id: customer.id,
+                status_filter: 'issued',
+                without_receipt: true,
+                limit: 200
+            });
+            if (customer.telephone1) params.append('telephone1', customer.telephone1);
+            if (cursor) params.append('cursor', cursor);
+            
+            const response = await fetch(`/api/invoices?${params.toString()}`, {
+                headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
+            });
+            
+            if (!response.ok) throw new Error('Failed to load invoices');
+            
+            const page = await response.json();
+            allInvoices = allInvoices.concat(page.items);
+            cursor = page.next_cursor;
+        } while (cursor);
     } catch (error) {
         console.error('Error loading invoices:', error);
     }
@@ -93,7 +143,7 @@ function populateCustomerDropdown() {
     }
 }
 
-function selectCustomer() {
+async function selectCustomer() {
     const customerId = document.getElementById('createCustomerId').value;
     const previewDiv = document.getElementById('customerPreview');
     
@@ -114,8 +164,8 @@ function selectCustomer() {
     document.getElementById('previewPhone').textContent = customer.telephone1 || 'No phone';
     previewDiv.style.display = 'block';
     
-    filterInvoicesByCustomer(customerId);
     filterProjectsByCustomer(customerId);
+    await filterInvoicesByCustomer(customerId);
 }
 
 function openAddCustomerModal() {
@@ -284,26 +334,16 @@ async function saveNewCustomer() {
     }
 }
 
-function filterInvoicesByCustomer(customerId) {
+async function filterInvoicesByCustomer(customerId) {
     const select = document.getElementById('createInvoiceId');
     select.innerHTML = '<option value="">No Invoice Link</option>';
     
     const customer = allCustomers.find(c => c.id == customerId);
     if (!customer) return;
     
-    const invoiceIdsWithReceipts = new Set(
-        allReceipts
-            .filter(r => r.invoice_id && r.status === 'issued')
-            .map(r => r.invoice_id)
-    );
-    
-    const customerInvoices = allInvoices.filter(inv => 
-        (inv.telephone1 === customer.telephone1 || inv.customer_id == customerId) &&
-        inv.status === 'issued' &&
-        !invoiceIdsWithReceipts.has(inv.id)
-    );
+    await loadInvoices(customer);
     
-    customerInvoices.forEach(invoice => {
+    allInvoices.forEach(invoice => {
         const option = document.createElement('option');
         option.value = invoice.id;
         option.textContent = `${invoice.invoice_number} - ${formatCurrency(invoice.total)}`;
@@ -529,17 +569,7 @@ async function issueReceipt(receiptId) {
 
 async function generateReceiptPDF(receiptId) {
     try {
-        const response = await fetch(`/api/receipts/${receiptId}/generate-pdf`, {
-            method: 'POST',
-            headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-        });
-        
-        if (!response.ok) {
-            const error = await response.json();
-            throw new Error(error.detail || 'Failed to generate PDF');
-        }
-        
-        const result = await response.json();
+        const result = await api.generateReceiptPDF(receiptId);
         
         document.getElementById('pdfFrame').src = result.pdf_url;
         new bootstrap.Modal(document.getElementById('pdfModal')).show();
@@ -565,7 +595,6 @@ async function editReceipt(receiptId) {
     editingReceiptId = receiptId;
     
     await loadCustomers();
-    await loadInvoices();
     await loadProjects();
     
     document.querySelector('#createModal .modal-title').innerHTML = '<i class="bi bi-pencil"></i> Edit Receipt';
@@ -573,7 +602,7 @@ async function editReceipt(receiptId) {
     
     if (receipt.customer_id) {
         document.getElementById('createCustomerId').value = receipt.customer_id;
-        selectCustomer();
+        await selectCustomer();
     }
     
     document.getElementById('createAmount').value = receipt.amount;
@@ -0,0 +1,112 @@
+"""
+Shared fixtures.
+
+Database tests run against the Postgres named by TEST_DATABASE_URL (its
+tables are created on first use and truncated after each test) and are
+skipped when it is not set. Benchmarks are marked with @pytest.mark.benchmark
+and only run with RUN_BENCHMARKS=1.
+"""
+
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    # app.database reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("EMAIL_TRANSPORT", "fake")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: timing benchmark, run with RUN_BENCHMARKS=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv("RUN_BENCHMARKS") == "1":
+        return
+    skip = pytest.mark.skip(reason="set RUN_BENCHMARKS=1 to run benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("set TEST_DATABASE_URL to run database tests")
+    from app.database import Base, engine
+    from app.models import (  # noqa: F401
+        user, customer, invoice, quote, email_log, project, receipt, audit_log, revenue_rollup,
+        document_sequence, pdf_job, pdf_cache, email_outbox, reminder_run
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    from sqlalchemy import text
+    from app.database import Base, SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        tables = ", ".join(Base.metadata.tables)
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+@pytest.fixture
+def user(db):
+    from app.models.user import User
+    from app.auth import get_password_hash
+
+    user = User(username="tester", email="tester@example.com",
+                hashed_password=get_password_hash("secret"), role="admin")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def make_invoice():
+    """Factory for invoice-like objects with the given number of line items, for the PDF layouts."""
+    def build(lines: int) -> SimpleNamespace:
+        line_items = [
+            SimpleNamespace(
+                description=f"Consulting services, item {i}" + ("\nwith a second line" if i % 7 == 0 else ""),
+                quantity=1,
+                unit_price=10.0,
+                discount=0,
+                total=10.0
+            )
+            for i in range(lines)
+        ]
+        return SimpleNamespace(
+            status=SimpleNamespace(value="issued"),
+            invoice_number="INV-2026-000001",
+            issue_date=datetime(2026, 1, 15),
+            cancelled_at=None,
+            source_quote_number=None,
+            client_name="Test Client",
+            company_name=None,
+            client_email=None,
+            telephone1=None,
+            telephone2=None,
+            client_reg_no=None,
+            client_tax_id=None,
+            client_address=None,
+            line_items=line_items,
+            subtotal=10.0 * lines,
+            discount=0,
+            tax=19.0,
+            notes=None
+        )
+
+    return build
@@ -0,0 +1,70 @@
+import os
+import statistics
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app.routes.analytics import get_analytics
+from app.services.rollups import rebuild_rollups
+
+
+# Drafts are a small working set; issued invoices accumulate
+DRAFTS = 200
+
+
+def seed_invoices(db, user_id: int, start: int, end: int):
+    """Insert invoices start..end-1 spread over the last five years; the first DRAFTS are drafts."""
+    db.execute(text("""
+        INSERT INTO invoices (invoice_number, user_id, status, context_type, issue_date, issued_at, created_at, total)
+        SELECT
+            'BENCH-' || n,
+            :user_id,
+            CAST(CASE WHEN n < :drafts THEN 'draft' ELSE 'issued' END AS invoicestatus),
+            'none',
+            ts, CASE WHEN n < :drafts THEN NULL ELSE ts END, ts,
+            100.0
+        FROM generate_series(:start, :end - 1) AS n,
+             LATERAL (SELECT now() - (n % 1825) * interval '1 day' AS ts) AS t
+    """), {"user_id": user_id, "start": start, "end": end, "drafts": DRAFTS})
+    db.commit()
+    rebuild_rollups(db)
+
+
+def test_analytics_match_the_invoices(db, user):
+    seed_invoices(db, user.id, 0, 2_000)
+
+    result = get_analytics(current_user=user, db=db)
+
+    assert result.total_issued_invoices == 1_800
+    assert result.total_issued_amount == pytest.approx(180_000.0)
+    assert result.total_draft_invoices == 200
+    assert result.total_draft_amount == pytest.approx(20_000.0)
+    assert sum(year.count for year in result.yearly_data) == 1_800
+    assert result.current_year == date.today().year
+
+
+@pytest.mark.benchmark
+def test_analytics_latency_is_flat_in_the_number_of_invoices(db, user):
+    sizes = [int(size) for size in os.getenv("BENCH_INVOICE_SIZES", "10000,100000,1000000").split(",")]
+
+    def latency() -> float:
+        samples = []
+        for _ in range(7):
+            start = time.perf_counter()
+            get_analytics(current_user=user, db=db)
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples)
+
+    seeded, latencies = 0, {}
+    for size in sizes:
+        seed_invoices(db, user.id, seeded, size)
+        db.execute(text("ANALYZE invoices"))
+        seeded = size
+        latencies[size] = latency()
+        print(f"\n{size:>9,} invoices: {latencies[size] * 1000:.1f} ms")
+
+    # Issued totals come from the rollups and drafts from an index range
+    # scan, so neither grows with the number of issued invoices
+    assert latencies[sizes[-1]] < latencies[sizes[0]] * 3 + 0.05
@@ -0,0 +1,85 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.database import SessionLocal
+from app.models.audit_log import AuditLog
+from app.models.invoice import Invoice
+from app.routes import invoices
+from app.schemas import InvoiceCreate, LineItemCreate
+from app.services.audit import log_action
+
+THREADS = 8
+CREATES_PER_THREAD = 50
+CREATES = THREADS * CREATES_PER_THREAD
+
+
+@contextmanager
+def count_commits(engine):
+    commits = []
+
+    def commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", commit)
+    try:
+        yield commits
+    finally:
+        event.remove(engine, "commit", commit)
+
+
+def invoice_data() -> InvoiceCreate:
+    return InvoiceCreate(
+        client_name="Acme",
+        line_items=[LineItemCreate(description="Consulting", quantity=2, unit_price=50.0)]
+    )
+
+
+def committing_log_action(db, **kwargs):
+    # Before: the change and its audit entry were committed in two transactions
+    db.commit()
+    entry = log_action(db, **kwargs)
+    db.commit()
+    return entry
+
+
+def creates_per_second(user) -> float:
+    def create_invoices(_):
+        session = SessionLocal()
+        try:
+            for _ in range(CREATES_PER_THREAD):
+                invoices.create_invoice(invoice_data(), current_user=user, db=session)
+        finally:
+            session.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(create_invoices, range(THREADS)))
+    return CREATES / (time.perf_counter() - start)
+
+
+def test_create_invoice_commits_audit_entry_in_one_transaction(engine, db, user):
+    with count_commits(engine) as commits:
+        invoice = invoices.create_invoice(invoice_data(), current_user=user, db=db)
+
+    assert len(commits) == 1
+    entry = db.query(AuditLog).filter(AuditLog.entity_type == "invoice").one()
+    assert (entry.action, entry.entity_id, entry.entity_number) == ("create", invoice.id, invoice.invoice_number)
+
+
+@pytest.mark.benchmark
+def test_shared_transaction_audit_create_throughput(engine, db, user, monkeypatch):
+    with monkeypatch.context() as patch, count_commits(engine) as before_commits:
+        patch.setattr(invoices, "log_action", committing_log_action)
+        before = creates_per_second(user)
+    with count_commits(engine) as after_commits:
+        after = creates_per_second(user)
+    print(f"\ninvoice creates/s: separate audit commit {before:.0f}, shared transaction {after:.0f}")
+
+    # Timings depend on the disk's fsync cost; the commit count per create does not
+    assert len(before_commits) == 2 * CREATES
+    assert len(after_commits) == CREATES
+    assert db.query(Invoice).count() == db.query(AuditLog).count() == 2 * CREATES
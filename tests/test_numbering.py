@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Barrier
+
+from app.database import SessionLocal
+from app.models.invoice import Invoice
+from app.services.numbering import generate_invoice_number
+
+THREADS = 16
+INVOICES_PER_THREAD = 25
+
+
+def test_concurrent_invoice_creates_get_unique_gap_free_numbers(db, user):
+    start = Barrier(THREADS)
+
+    def create_invoices(worker: int) -> list:
+        start.wait()
+        numbers = []
+        session = SessionLocal()
+        try:
+            for i in range(INVOICES_PER_THREAD):
+                number = generate_invoice_number(session)
+                session.add(Invoice(invoice_number=number, user_id=user.id, total=1.0))
+                # Rolled-back creates hand their number to the next caller
+                if (worker + i) % 5 == 0:
+                    session.rollback()
+                    continue
+                session.commit()
+                numbers.append(number)
+        finally:
+            session.close()
+        return numbers
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        numbers = [number for batch in pool.map(create_invoices, range(THREADS)) for number in batch]
+
+    stored = [number for (number,) in db.query(Invoice.invoice_number).all()]
+    assert len(numbers) == len(set(numbers)) == len(stored)
+    assert sorted(stored) == sorted(numbers)
+
+    year = datetime.utcnow().year
+    assert sorted(numbers) == [f"INV-{year}-{n:06d}" for n in range(1, len(numbers) + 1)]
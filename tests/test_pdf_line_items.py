@@ -0,0 +1,64 @@
+import time
+
+import pytest
+from reportlab.platypus import Table
+
+from app.utils.pdf_generator import LineItemTables, build_invoice_pdf, get_template_resources
+
+COL_WIDTHS = [4*72, 0.9*72, 1.2*72, 1.4*72]
+HEADER = ["Description", "Quantity", "Unit Price", "Total"]
+
+
+def split_pages(flowable: LineItemTables, first_page: float, page: float) -> list:
+    """The tables the flowable is cut into, given the space on each page."""
+    tables, space = [], first_page
+    while True:
+        _, height = flowable.wrap(sum(COL_WIDTHS), space)
+        if height <= space:
+            return tables + [flowable]
+        parts = flowable.split(sum(COL_WIDTHS), space)
+        if parts:
+            table, flowable = parts
+            tables.append(table)
+        space = page
+
+
+def test_each_page_gets_a_header_and_fits_the_frame():
+    rows = [[f"Item {i}", "1", "€10.00", "€10.00"] for i in range(300)]
+    tables = split_pages(
+        LineItemTables(HEADER, rows, COL_WIDTHS, get_template_resources().invoice_items_style),
+        first_page=250, page=648
+    )
+
+    assert len(tables) > 2
+    drawn = []
+    for table, space in zip(tables, [250] + [648] * len(tables)):
+        if isinstance(table, LineItemTables):
+            table = table._table(table.start, len(table.rows))
+        assert isinstance(table, Table)
+        _, height = table.wrap(sum(COL_WIDTHS), space)
+        assert height <= space
+        assert table._cellvalues[0] == HEADER
+        drawn.extend(row[0] for row in table._cellvalues[1:])
+    assert drawn == [row[0] for row in rows]
+
+
+def test_long_invoice_renders(make_invoice):
+    data = build_invoice_pdf(make_invoice(120), db=None)
+    assert data.startswith(b"%PDF")
+
+
+@pytest.mark.benchmark
+def test_render_time_grows_linearly_with_line_count(make_invoice):
+    def render_seconds(lines: int) -> float:
+        invoice = make_invoice(lines)
+        start = time.perf_counter()
+        build_invoice_pdf(invoice, db=None)
+        return time.perf_counter() - start
+
+    render_seconds(100)  # warm up fonts and template resources
+    small = render_seconds(1_000)
+    large = render_seconds(10_000)
+    print(f"\n1,000 lines: {small:.2f}s  10,000 lines: {large:.2f}s  ratio {large / small:.1f}")
+    # Quadratic re-splitting would make this ratio close to 100
+    assert large / small < 20
@@ -0,0 +1,34 @@
+import statistics
+import time
+
+import pytest
+
+from app.utils.pdf_generator import TemplateResources, get_template_resources, invoice_layout, render_document_bytes
+
+RENDERS = 30
+
+
+def per_render_seconds(render) -> float:
+    render()
+    samples = []
+    for _ in range(RENDERS):
+        start = time.perf_counter()
+        render()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def test_template_resources_are_built_once_per_process():
+    assert get_template_resources() is get_template_resources()
+
+
+@pytest.mark.benchmark
+def test_shared_template_resources_speed_up_renders(make_invoice):
+    invoice = make_invoice(10)
+
+    # Before: styles, logo and footer rebuilt for every document
+    rebuilt = per_render_seconds(lambda: render_document_bytes(*invoice_layout(invoice, TemplateResources())))
+    shared = per_render_seconds(lambda: render_document_bytes(*invoice_layout(invoice, get_template_resources())))
+    print(f"\nper render: rebuilt resources {rebuilt * 1000:.1f} ms, shared resources {shared * 1000:.1f} ms")
+
+    assert shared < rebuilt
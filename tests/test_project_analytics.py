@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.models.customer import Customer
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.project import Project, ProjectStatus, Milestone, MilestoneType
+from app.routes.analytics import get_project_analytics
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_projects(db, user, count: int):
+    customer = Customer(display_name="Acme", name="Acme", company_name="Acme Ltd")
+    db.add(customer)
+    db.flush()
+    for i in range(count):
+        project = Project(
+            project_code=f"PRJ-2026-{i:06d}", customer_id=customer.id, user_id=user.id,
+            title=f"Project {i}", status=ProjectStatus.active if i % 3 else ProjectStatus.closed,
+            total_budget=1_000.0
+        )
+        db.add(project)
+        db.flush()
+        for no in (1, 2):
+            milestone = Milestone(
+                project_id=project.id, milestone_type=MilestoneType.progress, milestone_no=no,
+                label=f"Stage {no}", expected_amount=100.0
+            )
+            db.add(milestone)
+            db.flush()
+            # Stage 1 is invoiced in full, stage 2 only partly; drafts do not count
+            for status, total in ((InvoiceStatus.issued, 100.0 if no == 1 else 40.0), (InvoiceStatus.draft, 500.0)):
+                db.add(Invoice(
+                    invoice_number=f"INV-{i}-{no}-{status.value}", user_id=user.id, customer_id=customer.id,
+                    project_id=project.id, milestone_id=milestone.id, status=status, total=total + i
+                ))
+    db.commit()
+
+
+@pytest.mark.parametrize("projects", [3, 30])
+def test_project_analytics_query_count_does_not_grow_with_projects(engine, db, user, projects):
+    seed_projects(db, user, projects)
+
+    with count_queries(engine) as statements:
+        result = get_project_analytics(current_user=user, db=db)
+
+    # Totals, top projects and milestone progress
+    assert len(statements) == 3
+    assert result.total_projects == projects
+    assert result.closed_projects == len(range(0, projects, 3))
+    assert len(result.top_projects) == min(projects, 10)
+    assert [p.project_code for p in result.top_projects][0] == f"PRJ-2026-{projects - 1:06d}"
+    top = result.top_projects[0]
+    assert top.invoice_count == 2
+    assert top.invoiced_total == pytest.approx(140.0 + 2 * (projects - 1))
+    assert len(result.milestone_progress) == 2 * projects
+    assert {m.status for m in result.milestone_progress if m.milestone_no == 2} == {"partial"}
+    assert result.milestone_progress[0].status == "completed"
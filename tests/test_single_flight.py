@@ -0,0 +1,69 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.pdf_cache import SingleFlight
+
+CONCURRENT_REQUESTS = 50
+
+
+def test_concurrent_requests_render_once():
+    flight = SingleFlight()
+    calls = []
+    start = threading.Barrier(CONCURRENT_REQUESTS)
+
+    def render():
+        calls.append(1)
+        # Stay in flight long enough for every caller to join
+        time.sleep(0.2)
+        return "https://storage.example/invoice.pdf"
+
+    def request(_):
+        start.wait()
+        return flight.do(("url", "digest"), render)
+
+    with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as pool:
+        results = list(pool.map(request, range(CONCURRENT_REQUESTS)))
+
+    assert len(calls) == 1
+    assert {url for url, _ in results} == {"https://storage.example/invoice.pdf"}
+    assert sum(1 for _, shared in results if not shared) == 1
+
+
+def test_url_and_bytes_keys_do_not_share_results():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def render_url():
+        release.wait()
+        return "https://storage.example/invoice.pdf"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        url_call = pool.submit(flight.do, ("url", "digest"), render_url)
+        time.sleep(0.05)
+        data, shared = flight.do(("bytes", "digest"), lambda: b"%PDF-1.4")
+        release.set()
+        url, _ = url_call.result()
+
+    assert (data, shared) == (b"%PDF-1.4", False)
+    assert url == "https://storage.example/invoice.pdf"
+
+
+def test_errors_reach_every_waiter_and_clear_the_key():
+    flight = SingleFlight()
+    start = threading.Barrier(10)
+
+    def render():
+        time.sleep(0.1)
+        raise RuntimeError("render failed")
+
+    def request(_):
+        start.wait()
+        try:
+            flight.do("key", render)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        assert set(pool.map(request, range(10))) == {"render failed"}
+    assert flight.do("key", lambda: "ok") == ("ok", False)